@@ -1,2 +1,8 @@
 # src/FMUiL/__init__.py
+from importlib.metadata import version, PackageNotFoundError
 
+try:
+    __version__ = version("FMUiL")
+except PackageNotFoundError:
+    # running from a source checkout without installing
+    __version__ = "0+unknown"
@@ -1,10 +1,25 @@
 import typer
 import asyncio
+import json
 import os
+import time
 from pathlib import Path
-from .handlers.simulation_handler import SimulationHandler
+from typing import Annotated
+from . import __version__
+from .logger.results_index import ResultsIndex, DEFAULT_INDEX, parse_since
+from .distributed.protocol import DEFAULT_WORKER_PORT, TOKEN_ENV, parse_address
+
+# the simulation modules (asyncua, fmpy, numpy) are imported by the commands that need them
 
 app = typer.Typer(help="Run FMUiL experiments and simulations.")
+results_app = typer.Typer(help="Search the finished experiments of all runs.")
+app.add_typer(results_app, name="results")
+
+# options shared by several commands
+ProfileMemoryOption = Annotated[bool, typer.Option(
+    "--profile-memory",
+    help="Record memory per experiment phase and flag leaks, written to MemoryProfile.json in the log folder.",
+)]
 
 # -----------------------------
 # Global options
@@ -41,7 +56,7 @@ def main(
 
     # Print version if requested
     if version:
-        typer.echo("FMUiL version 0.1.0")
+        typer.echo(f"FMUiL version {__version__}")
 
     # Print folder if requested
     if show_folder:
@@ -55,11 +70,40 @@ def main(
 # -----------------------------
 # Utility function: run experiments
 # -----------------------------
-async def run_experiments(experiment_configs: list[str], port: int = 7500):
-    experiments = SimulationHandler(experiment_configs=experiment_configs, base_port=port)
+async def run_experiments(experiment_configs: list[str], port: int = 7500, force: bool = False, telemetry: str | None = None,
+                          profile_memory: bool = False):
+    from .handlers.simulation_handler import SimulationHandler
+    experiments = SimulationHandler(experiment_configs=experiment_configs, base_port=port, force=force, telemetry=telemetry,
+                                    profile_memory=profile_memory)
     await experiments.main_experiment_loop()
 
 
+async def resume_experiments(log_folder: str, port: int | None = None, profile_memory: bool = False):
+    from .handlers.simulation_handler import SimulationHandler
+    experiments = SimulationHandler.from_log_folder(log_folder=log_folder, base_port=port, profile_memory=profile_memory)
+    await experiments.main_experiment_loop()
+
+
+async def run_distributed(experiment_configs: list[str], workers: list[str], token: str | None = None):
+    from .distributed import Coordinator
+    coordinator = Coordinator(workers=workers, token=token)
+    jobs = await coordinator.run(experiment_configs)
+    failed = [job for job in jobs if job.status != "completed"]
+    typer.echo(f"{len(jobs) - len(failed)}/{len(jobs)} experiments completed, logs in {coordinator.log_folder}")
+    for job in failed:
+        typer.echo(f"Failed: {job.experiment_config} ({job.error})")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def experiment_files(experiments_dir: Path) -> list[str]:
+    return [
+        os.path.join(experiments_dir, f)
+        for f in os.listdir(experiments_dir)
+        if os.path.isfile(os.path.join(experiments_dir, f))
+    ]
+
+
 # -----------------------------
 # Command: folder
 # -----------------------------
@@ -73,27 +117,174 @@ def folder(ctx: typer.Context):
 # Command: run-all
 # -----------------------------
 @app.command(help="Run all experiments in the folder")
-def run_all(ctx: typer.Context, port: int = typer.Option(7500, "--port", "-p", help="Base port for OPC UA servers.")):
-    experiments_dir: Path = ctx.obj["experiments_dir"]
-
-    experiment_configs = [
-        os.path.join(experiments_dir, f)
-        for f in os.listdir(experiments_dir)
-        if os.path.isfile(os.path.join(experiments_dir, f))
-    ]
+def run_all(
+    ctx: typer.Context,
+    port: int = typer.Option(7500, "--port", "-p", help="Base port for OPC UA servers."),
+    workers: str = typer.Option(None, "--workers", "-w", help="Comma separated worker addresses (host:port) to dispatch the experiments to. Runs locally if not set."),
+    token: str = typer.Option(None, "--token", envvar=TOKEN_ENV, help="Shared token of the workers."),
+    force: bool = typer.Option(False, "--force", "-f", help="Run unchanged experiments again instead of reusing their stored results."),
+    telemetry: str = typer.Option(None, "--telemetry", "-t", help="Stream logged values and step metrics on a local socket ('unix:/path.sock' or 'host:port')."),
+    profile_memory: ProfileMemoryOption = False,
+):
+    experiment_configs = experiment_files(ctx.obj["experiments_dir"])
 
-    asyncio.run(run_experiments(experiment_configs, port))
+    if workers:
+        asyncio.run(run_distributed(experiment_configs, workers.split(","), token))
+    else:
+        asyncio.run(run_experiments(experiment_configs, port, force, telemetry, profile_memory))
 
 
 # -----------------------------
 # Command: run
 # -----------------------------
 @app.command(help="Run a specific experiment by name (e.g. 'FMUiL run tank.yaml')")
-def run(ctx: typer.Context, experiment_name: str, port: int = typer.Option(7500, "--port", "-p", help="Base port for OPC UA servers.")):
+def run(
+    ctx: typer.Context,
+    experiment_name: str,
+    port: int = typer.Option(7500, "--port", "-p", help="Base port for OPC UA servers."),
+    force: bool = typer.Option(False, "--force", "-f", help="Run the experiment again even if it is unchanged."),
+    telemetry: str = typer.Option(None, "--telemetry", "-t", help="Stream logged values and step metrics on a local socket ('unix:/path.sock' or 'host:port')."),
+    profile_memory: ProfileMemoryOption = False,
+):
     experiments_dir: Path = ctx.obj["experiments_dir"]
     experiment_config = os.path.join(experiments_dir, experiment_name)
 
-    asyncio.run(run_experiments([experiment_config], port))
+    asyncio.run(run_experiments([experiment_config], port, force, telemetry, profile_memory))
+
+
+# -----------------------------
+# Command: resume
+# -----------------------------
+@app.command(help="Resume an interrupted run from its log folder (e.g. 'FMUiL resume logs/2025_01_01_12_00_00')")
+def resume(
+    log_folder: str,
+    port: int = typer.Option(None, "--port", "-p", help="Base port for OPC UA servers. Defaults to the port of the original run."),
+    profile_memory: ProfileMemoryOption = False,
+):
+    asyncio.run(resume_experiments(log_folder, port, profile_memory))
+
+
+# -----------------------------
+# Command: worker
+# -----------------------------
+@app.command(help="Run experiments dispatched by 'FMUiL run-all --workers' (e.g. 'FMUiL worker --listen 0.0.0.0:8750 --token secret')")
+def worker(
+    listen: str = typer.Option(f"127.0.0.1:{DEFAULT_WORKER_PORT}", "--listen", "-l", help="Address the worker listens on (host:port), 0.0.0.0 for all interfaces."),
+    token: str = typer.Option(None, "--token", envvar=TOKEN_ENV, help="Shared token the coordinator has to send, a random one is printed if not set."),
+    capacity: int = typer.Option(os.cpu_count() or 1, "--capacity", "-c", min=1, help="Number of experiments run at the same time."),
+    port: int = typer.Option(7500, "--port", "-p", help="Base port for OPC UA servers, every slot uses the next 100 ports."),
+    work_dir: str = typer.Option(".fmuil_worker", "--work-dir", help="Folder for cached FMUs and running jobs."),
+):
+    from .distributed import Worker
+    host, listen_port = parse_address(listen)
+    asyncio.run(Worker(host=host, port=listen_port, capacity=capacity, base_port=port, work_dir=work_dir, token=token).serve_forever())
+
+
+# -----------------------------
+# Command: standin
+# -----------------------------
+@app.command(help="Serve an external server config in place of the real server for load and latency tests (e.g. 'FMUiL standin servers/plc.yaml --generate 5000 --latency 0.005')")
+def standin(
+    server_config: str,
+    port: int = typer.Option(None, "--port", "-p", help="Port to serve on, the port of the config url if not set."),
+    generate: int = typer.Option(0, "--generate", "-g", min=0, help="Additional generated variables in the object 'generated'."),
+    latency: float = typer.Option(0.0, "--latency", min=0.0, help="Seconds before a read or write of a served variable is answered."),
+    jitter: float = typer.Option(0.0, "--jitter", min=0.0, help="Uniform jitter in seconds around the latency."),
+    drop_rate: float = typer.Option(0.0, "--drop-rate", min=0.0, max=1.0, help="Share of the reads and writes that are dropped."),
+    drop_mode: str = typer.Option("timeout", "--drop-mode", help="'timeout' holds a dropped response for --drop-delay seconds, 'fault' answers with BadTimeout."),
+    drop_delay: float = typer.Option(10.0, "--drop-delay", min=0.0, help="Seconds a dropped response is held in 'timeout' mode."),
+    update_interval: float = typer.Option(None, "--update-interval", min=0.0, help="Seconds between server-side updates of the generated variables, static if not set."),
+    record: str = typer.Option(None, "--record", "-r", help="CSV file of the received writes."),
+    record_reads: bool = typer.Option(False, "--record-reads", help="Record the reads as well."),
+    export: str = typer.Option(None, "--export", "-e", help="Write the served config with the generated variables to this YAML file, for use in external_servers."),
+    seed: int = typer.Option(None, "--seed", help="Seed of the jitter and the dropped requests."),
+):
+    import yaml
+    from .handlers.config_handler import ExternalServerHandler
+    from .communications.standin_server import StandInServer
+    try:
+        server = StandInServer(
+            ExternalServerHandler(server_config).dump_dict(), port=port, generate=generate, latency=latency, jitter=jitter,
+            drop_rate=drop_rate, drop_mode=drop_mode, drop_delay=drop_delay, update_interval=update_interval,
+            record=record, record_reads=record_reads, seed=seed,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    if export:
+        with open(export, "w") as file:
+            yaml.safe_dump(server.export_config(), file, sort_keys=False)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+# -----------------------------
+# Command: validate
+# -----------------------------
+@app.command(help="Check experiments without starting servers or FMUs (e.g. 'FMUiL validate tank.yaml'), all experiments in the folder if none are given")
+def validate(
+    ctx: typer.Context,
+    experiment_names: list[str] = typer.Argument(None, help="Experiment files in the experiments folder."),
+    model_cache: str = typer.Option(None, "--model-cache", help="Folder for the cached FMU model descriptions, .fmuil_cache/model_descriptions if not set."),
+):
+    from .handlers.config_validator import ConfigValidator, ModelDescriptionCache
+    experiments_dir: Path = ctx.obj["experiments_dir"]
+    if experiment_names:
+        experiment_configs = [os.path.join(experiments_dir, name) for name in experiment_names]
+    else:
+        experiment_configs = experiment_files(experiments_dir)
+
+    validator = ConfigValidator(ModelDescriptionCache(model_cache) if model_cache else None)
+    invalid = 0
+    for experiment_config in experiment_configs:
+        problems = validator.validate(experiment_config)
+        if not problems:
+            typer.echo(f"OK      {experiment_config}")
+            continue
+        invalid += 1
+        typer.echo(f"INVALID {experiment_config}")
+        for problem in problems:
+            typer.echo(f"    {problem}")
+    typer.echo(f"{len(experiment_configs) - invalid}/{len(experiment_configs)} experiment(s) valid")
+    if invalid:
+        raise typer.Exit(code=1)
+
+
+# -----------------------------
+# Command: results query
+# -----------------------------
+def format_run(run: dict) -> str:
+    started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started_at"]))
+    result  = "passed" if run["passed"] else "FAILED"
+    stopped = run["stop_reason"] if run["stop_time"] is None else f"{run['stop_reason']} at t={run['stop_time']:g}"
+    line = f"{started}  {run['experiment_name']}  {result}  ({stopped}{', reused' if run['reused'] else ''})"
+    if "criterion" in run:
+        first_failure = "" if run["first_failure"] is None else f", first failure at t={run['first_failure']:g}"
+        line += f"\n    {run['criterion']}: failed {run['failed']}/{run['evaluations']}{first_failure}"
+    return f"{line}\n    {run['folder']}"
+
+@results_app.command("query", help="List indexed experiments, newest first (e.g. 'FMUiL results query --criterion eval_1 --failed --since 7d')")
+def results_query(
+    experiment: str = typer.Option(None, "--experiment", "-e", help="Experiment name."),
+    criterion: str = typer.Option(None, "--criterion", "-c", help="Evaluation criterion, --failed/--passed then apply to it."),
+    failed: bool = typer.Option(None, "--failed/--passed", help="Only failed or only passed experiments (or criterion)."),
+    since: str = typer.Option(None, "--since", "-s", help="Started within a duration (30m, 12h, 7d, 2w) or after an ISO date."),
+    limit: int = typer.Option(50, "--limit", "-n", min=1, help="Maximum number of results."),
+    as_json: bool = typer.Option(False, "--json", help="Print the results as JSON."),
+    index: str = typer.Option(DEFAULT_INDEX, "--index", help="Results index file."),
+):
+    try:
+        since_time = parse_since(since) if since else None
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--since")
+    runs = ResultsIndex(index).query(experiment=experiment, criterion=criterion, failed=failed, since=since_time, limit=limit)
+    if as_json:
+        typer.echo(json.dumps(runs, indent=2))
+        return
+    for run in runs:
+        typer.echo(format_run(run))
+    typer.echo(f"{len(runs)} result(s)")
 
 
 # -----------------------------
@@ -1,5 +1,17 @@
-from .clients import client_manager
-from .servers import server_manager
-from .server_setup import InternalServerSetup
+from FMUiL.utils.lazy import lazy_exports
 
-__all__ = ["client_manager", "server_manager", "InternalServerSetup"]
\ No newline at end of file
+_EXPORTS = {
+    "client_manager":        ".clients",
+    "ClientConnectionError": ".clients",
+    "ConnectionFailure":     ".clients",
+    "ConnectionPool":        ".connection_pool",
+    "PublicationPolicy":     ".publication",
+    "server_manager":        ".servers",
+    "InternalServerSetup":   ".server_setup",
+    "EnsembleServerSetup":   ".ensemble_setup",
+    "StandInServer":         ".standin_server",
+    "SignalBus":             ".signal_bus",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
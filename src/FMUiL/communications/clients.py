@@ -1,68 +1,153 @@
 from asyncua import Client, ua
+from FMUiL.handlers.execution_plan import SERVER_OBJECT, RESET_METHOD, UPDATE_BULK_METHOD
+from dataclasses import dataclass
 import logging
 import asyncio
-import sys
+
+@dataclass(frozen=True)
+class ConnectionFailure:
+    """A client that could not connect to its server"""
+    server_name: str
+    url: str
+    attempts: int
+    error: str
+
+class ClientConnectionError(Exception):
+    """Raised when one or more clients fail to connect, holds all of the failures"""
+    def __init__(self, failures: list[ConnectionFailure]) -> None:
+        self.failures = failures
+        details = "; ".join(
+            f"{f.server_name} at {f.url} after {f.attempts} attempt(s): {f.error}" for f in failures
+        )
+        super().__init__(f"Failed to connect to {len(failures)} server(s): {details}")
 
 class client_manager:
+    connect_timeout  = 5.0  # seconds per connection attempt
+    connect_attempts = 3
+    connect_backoff  = 0.5  # seconds, doubled after every failed attempt
+
     @classmethod
-    async def create(cls, internal_servers, external_servers, node_ids):
+    async def create(cls, internal_servers, external_servers, node_ids, connection_pool: "ConnectionPool | None" = None):
         self = cls()
         
         self.internal_servers = internal_servers
         self.external_servers = external_servers
         self.node_ids = node_ids
+        self.connection_pool = connection_pool # external clients are borrowed from the pool if given
         
         self.internal_clients     = {} 
         self.external_clients   = {}
+        self.variant_types      = {} # cached variant types of external variables
         
-        await self.create_internal_clients()
-        await self.create_external_clients()
+        results = await asyncio.gather(
+            self.create_internal_clients(),
+            self.create_external_clients(),
+            return_exceptions=True,
+        )
+        failures = [f for result in results if isinstance(result, ClientConnectionError) for f in result.failures]
+        if failures:
+            await self.close()
+            raise ClientConnectionError(failures)
+        for result in results:
+            if isinstance(result, BaseException):
+                await self.close()
+                raise result
         
         return self
-    
-
-    async def create_internal_clients(self) -> None:
-        for server_name in self.internal_servers:
-            server = self.internal_servers[server_name]
-            client = Client(url=server.url)
 
-            # This should never fail, since we are creating the servers ourselves
+    @classmethod
+    async def connect_client(cls, server_name: str, url: str) -> Client | ConnectionFailure:
+        """
+        Connects to a server with a bounded timeout, retries with exponential backoff
+        """
+        error = None
+        for attempt in range(1, cls.connect_attempts + 1):
+            client = Client(url=url)
             try:
-                await client.connect()
-                self.internal_clients[server_name] = client
-                logging.info(f"Connected to server {server_name} at {server.url}")
+                await asyncio.wait_for(client.connect(), timeout=cls.connect_timeout)
+                logging.info(f"Connected to server {server_name} at {url}")
+                return client
             except Exception as e:
-                logging.error(f"Failed to connect to server {server_name} at {server.url}: {e}")
+                error = str(e) or type(e).__name__
+                logging.warning(f"Connection attempt {attempt} to server {server_name} at {url} failed: {error}")
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+            if attempt < cls.connect_attempts:
+                await asyncio.sleep(cls.connect_backoff * 2 ** (attempt - 1))
+        return ConnectionFailure(server_name=server_name, url=url, attempts=cls.connect_attempts, error=error)
+
+    async def _connect_all(self, urls: dict[str, str], clients: dict[str, Client]) -> None:
+        names = list(urls)
+        results = await asyncio.gather(*(self.connect_client(name, urls[name]) for name in names))
+        failures = []
+        for name, result in zip(names, results):
+            if isinstance(result, ConnectionFailure):
+                logging.error(f"Failed to connect to server {name} at {result.url}: {result.error}")
+                failures.append(result)
+            else:
+                clients[name] = result
+        if failures:
+            raise ClientConnectionError(failures)
+
+    async def create_internal_clients(self) -> None:
+        # This should never fail, since we are creating the servers ourselves
+        urls = {server_name: server.url for server_name, server in self.internal_servers.items()}
+        await self._connect_all(urls, self.internal_clients)
         
     async def create_external_clients(self) -> None:
-        # TODO: REMOVE SYSTEM NODE ID INITIALIZATION FROM HERE, SEPARATE THE FUNCTIONALITY
+        # This can fail, since we are connecting to an user defined server
+        if self.connection_pool is not None:
+            await self.acquire_external_clients()
+            return
         for server in self.external_servers:
-            server_url = self.external_servers[server]["url"]
-            print(f"TRYING TO CONNECT TO {server_url} ")
-            client = Client(url=server_url)
+            self.node_ids[server] = self.resolve_external_node_ids(server)
+            self.variant_types[server] = {}
+        urls = {server: self.external_servers[server]["url"] for server in self.external_servers}
+        await self._connect_all(urls, self.external_clients)
 
-            # This can fail, since we are connecting to an user defined server
-            try:
-                await client.connect()
-                self.external_clients[server] = client
-                self.node_ids[server] = {}
-                for obj in self.external_servers[server]["objects"]:
-                    for var in self.external_servers[server]["objects"][obj]:
-                        var_data = self.external_servers[server]["objects"][obj][var]
-                        keys = var_data.keys()
-                        if "name" in keys and var_data["name"] is not None:
-                            self.node_ids[server][var] = ua.NodeId(self.external_servers[server]["objects"][obj][var]["name"])
-                        elif("id" in keys and "ns" in keys):
-                            id = self.external_servers[server]["objects"][obj][var]["id"]
-                            ns = self.external_servers[server]["objects"][obj][var]["ns"]                            
-                            self.node_ids[server][var] = ua.NodeId(Identifier= id, NamespaceIndex= ns)
-                        else:
-                            raise Exception(f"server {server} with object {obj} found no acceptable id namespace or name for variable {var}")
-                        
-            # In the future this could be changed to move to the next experiment if an expection happens
-            except Exception as e:
-                logging.error(f"Failed to connect to server {server} at {server_url}: {e}")
-                sys.exit(1)
+    async def acquire_external_clients(self) -> None:
+        """
+        Borrows the external clients and their resolved node ids from the connection pool
+        """
+        names = list(self.external_servers)
+        results = await asyncio.gather(*(
+            self.connection_pool.acquire(
+                server_name      = name,
+                server_config    = self.external_servers[name],
+                connect          = self.connect_client,
+                resolve_node_ids = self.resolve_external_node_ids,
+            ) for name in names
+        ))
+        failures = []
+        for name, result in zip(names, results):
+            if isinstance(result, ConnectionFailure):
+                logging.error(f"Failed to connect to server {name} at {result.url}: {result.error}")
+                failures.append(result)
+                continue
+            self.external_clients[name] = result.client
+            self.node_ids[name]         = result.node_ids
+            self.variant_types[name]    = result.variant_types
+        if failures:
+            raise ClientConnectionError(failures)
+
+    def resolve_external_node_ids(self, server: str) -> dict[str, ua.NodeId]:
+        """
+        Builds the node ids of the variables defined in an external server description
+        """
+        node_ids = {}
+        for obj in self.external_servers[server]["objects"]:
+            for var in self.external_servers[server]["objects"][obj]:
+                var_data = self.external_servers[server]["objects"][obj][var]
+                keys = var_data.keys()
+                if "name" in keys and var_data["name"] is not None:
+                    node_ids[var] = ua.NodeId(var_data["name"])
+                elif("id" in keys and "ns" in keys):
+                    node_ids[var] = ua.NodeId(Identifier= var_data["id"], NamespaceIndex= var_data["ns"])
+                else:
+                    raise ValueError(f"server {server} with object {obj} found no acceptable id namespace or name for variable {var}")
+        return node_ids
 
     def get_client(self, client_name)->Client:
         if client_name in self.internal_clients.keys():     return self.internal_clients[client_name]
@@ -75,8 +160,8 @@ class client_manager:
             
     async def reset_system(self) -> None:
         for client_name in self.internal_clients:
-            object_node = self.internal_clients[client_name].get_node(ua.NodeId(1, 1))
-            await object_node.call_method(ua.NodeId(1, 4))
+            object_node = self.internal_clients[client_name].get_node(SERVER_OBJECT)
+            await object_node.call_method(RESET_METHOD)
 
     async def initialize_system_variables(self, experiment:dict) -> None:
         """
@@ -85,24 +170,35 @@ class client_manager:
         """
         initial_system_state = experiment["initial_system_state"]
         for server in initial_system_state:
-            for variable in initial_system_state[server]:
-                object_node = self.internal_clients[server].get_node(ua.NodeId(1, 1))
-                update_values = {
-                    "variable": variable,
-                    "value": float(initial_system_state[server][variable])
-                }
-                await object_node.call_method(ua.NodeId(1, 3), str(update_values)) 
+            client = self.internal_clients[server]
+            internal_server = self.internal_servers[server]
+            variables, values = [], []
+            for variable, value in initial_system_state[server].items():
+                # server only variables (timestep) are written directly to their nodes
+                if variable in internal_server.opc_server_only_variables:
+                    node = client.get_node(internal_server.server_variable_ids[variable])
+                    await node.write_value(float(value))
+                else:
+                    variables.append(variable)
+                    # ensembles take a list with one value per instance
+                    values.append(value if isinstance(value, list) else float(value))
+
+            # the whole initial state of the fmu is applied with a single call
+            layout = internal_server.bulk_layout(variables)
+            object_node = client.get_node(SERVER_OBJECT)
+            await object_node.call_method(UPDATE_BULK_METHOD, *internal_server.bulk_arguments(layout, values))
 
     async def close(self) -> None:
         """ 
         disconnects all clients to enable the setup of new ones
         releases ports
         """
-        if(len(self.external_clients)):
+        # pooled clients stay connected for the next experiment
+        if(len(self.external_clients) and self.connection_pool is None):
             await asyncio.gather(
                 *(c.disconnect() for c in self.external_clients.values()),
             )
-            self.external_clients.clear()
+        self.external_clients.clear()
         
         if(len(self.internal_clients)):    
             await asyncio.gather(
@@ -0,0 +1,84 @@
+from asyncua import Client
+from dataclasses import dataclass, field
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PooledConnection:
+    """An open client to an external server and the resolved node ids for the config of one server"""
+    client: Client
+    config_key: str
+    node_ids: dict = field(default_factory=dict)
+    variant_types: dict = field(default_factory=dict) # cached variant types, filled on first write
+
+class ConnectionPool:
+    """
+    Keeps external server clients open across experiments, one client per endpoint url.
+    - sessions are kept alive by the asyncua client watchdog
+    - the connection is health checked before it is handed out again
+    - node ids and variant types are kept per server name, configs sharing an endpoint
+      do not overwrite each other, they are resolved again only when the config changes
+    """
+    def __init__(self) -> None:
+        self.clients: dict[str, Client] = {}                 # keyed by url
+        self.connections: dict[str, PooledConnection] = {}   # keyed by server name
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def _config_key(server_config: dict) -> str:
+        return json.dumps(server_config, sort_keys=True, default=str)
+
+    async def _is_healthy(self, client: Client) -> bool:
+        try:
+            await client.check_connection()
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection to {client.server_url.geturl()} is broken: {e}")
+            return False
+
+    async def acquire(self, server_name: str, server_config: dict, connect, resolve_node_ids):
+        """
+        Returns an open PooledConnection for the server config, or the ConnectionFailure of connect.
+
+        connect(server_name, url) opens a new client,
+        resolve_node_ids(server_name) builds the node ids of the config
+        """
+        url = server_config["url"]
+        async with self._locks.setdefault(url, asyncio.Lock()):
+            client = self.clients.get(url)
+            if client is not None and not await self._is_healthy(client):
+                await self._disconnect(client)
+                del self.clients[url]
+                client = None
+
+            if client is None:
+                client = await connect(server_name, url)
+                if not isinstance(client, Client):
+                    return client
+                self.clients[url] = client
+            else:
+                logger.info(f"Reusing pooled connection to {server_name} at {url}")
+
+            config_key = self._config_key(server_config)
+            connection = self.connections.get(server_name)
+            if connection is None or connection.config_key != config_key:
+                connection = PooledConnection(client=client, config_key=config_key, node_ids=resolve_node_ids(server_name))
+                self.connections[server_name] = connection
+            connection.client = client
+            return connection
+
+    async def _disconnect(self, client: Client) -> None:
+        try:
+            await client.disconnect()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Disconnects all pooled clients"""
+        if len(self.clients):
+            await asyncio.gather(*(self._disconnect(client) for client in self.clients.values()))
+            self.clients.clear()
+        self.connections.clear()
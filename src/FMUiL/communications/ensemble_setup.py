@@ -0,0 +1,101 @@
+from asyncua import ua
+from asyncua.common.methods import uamethod
+import numpy as np
+
+from FMUiL.communications.server_setup import InternalServerSetup, BULK_TYPES, BULK_VARIANTS
+
+class EnsembleServerSetup(InternalServerSetup):
+    """
+    Serves the instances of an FMU ensemble (see EnsembleSlave) from one server.
+
+    Every published variable is an array node with one value per instance and a
+    single simulate call steps all instances. Inputs and parameters take either one
+    value for all instances or one value per instance. Routing over the signal bus
+    and running ahead are not used for ensembles, their values pass the coordinator.
+    """
+    @property
+    def instances(self) -> int:
+        return self.fmu.instances
+
+    def node_value(self, value) -> list[float]:
+        return [float(v) for v in np.broadcast_to(np.asarray(value, dtype=float), (self.instances,))]
+
+    def _update_published_outputs(self) -> None:
+        super()._update_published_outputs()
+        self.last_published = np.full((len(self.published_outputs[0]), self.instances), np.nan)
+
+    async def publish_outputs(self, force: bool = False, fmu_outputs: np.ndarray | None = None):
+        """
+        Writes the outputs of which any instance changed by more than the deadband,
+        fmu_outputs are (outputs, instances) arrays
+        """
+        names, value_references = self.published_outputs
+        if not names:
+            return
+        if fmu_outputs is None:
+            fmu_outputs = self.fmu.fmu.getReal(value_references)
+        absolute, relative = self.output_deadbands
+        threshold = np.maximum(absolute[:, None], relative[:, None] * np.abs(self.last_published))
+        changed = np.isnan(self.last_published) | (np.abs(fmu_outputs - self.last_published) > threshold)
+        rows = np.arange(len(names)) if force else np.flatnonzero(changed.any(axis=1))
+        for index in rows:
+            node = self.server.get_node(self.server_variable_ids[names[index]])
+            await node.set_value(self.node_value(fmu_outputs[index]))
+            self.last_published[index] = fmu_outputs[index]
+
+    def set_fmu_values(self, fmi_type: str, value_references: list[int], values: list) -> None:
+        # the ensemble converts the values, see EnsembleSlave
+        if fmi_type == "Real":
+            self.fmu.fmu.setReal(value_references, values)
+        elif fmi_type in ("Integer", "Enumeration"):
+            self.fmu.fmu.setInteger(value_references, values)
+        elif fmi_type == "Boolean":
+            self.fmu.fmu.setBoolean(value_references, values)
+        else:
+            raise TypeError(f"FMI type '{fmi_type}' cannot be updated.")
+
+    def bulk_arguments(self, layout: dict[str, tuple[list[int], list[int]]], values: list) -> list[ua.Variant]:
+        """
+        Method arguments of update_bulk, every variable gets one value per instance
+        (scalars are repeated), grouped by variable
+        """
+        arguments = []
+        for fmi_type in BULK_TYPES:
+            value_references, positions = layout[fmi_type]
+            typed_values = [value for i in positions for value in self.node_value(values[i])]
+            if fmi_type == "Integer":
+                typed_values = [int(round(value)) for value in typed_values]
+            elif fmi_type == "Boolean":
+                typed_values = [bool(value) for value in typed_values]
+            arguments.append(ua.Variant(value_references, ua.VariantType.UInt32))
+            arguments.append(ua.Variant(typed_values, BULK_VARIANTS[fmi_type]))
+        return arguments
+
+    @uamethod
+    async def update_bulk(self, parent=None, real_references=None, real_values=None,
+                          integer_references=None, integer_values=None,
+                          boolean_references=None, boolean_values=None):
+        """
+        InternalServerSetup.update_bulk with one value per instance for every reference,
+        use bulk_arguments to build the arguments
+        """
+        updates = {
+            "Real": (real_references or [], real_values or []),
+            "Integer": (integer_references or [], integer_values or []),
+            "Boolean": (boolean_references or [], boolean_values or []),
+        }
+        for fmi_type, (value_references, values) in updates.items():
+            if not value_references:
+                continue
+            if len(values) != len(value_references) * self.instances:
+                raise ValueError(
+                    f"update_bulk got {len(values)} {fmi_type} values for {len(value_references)} references of {self.instances} instances"
+                )
+            rows = np.asarray(values, dtype=float).reshape(len(value_references), self.instances)
+            self.set_fmu_values(fmi_type, list(value_references), list(rows))
+            names = self.fmu.settable_names[fmi_type]
+            for value_reference, row in zip(value_references, rows):
+                for name in names[value_reference]: # aliases share the value reference
+                    node_id = self.server_variable_ids.get(name)
+                    if node_id is not None: # unpublished variables have no node
+                        await self.server.get_node(node_id).set_value(self.node_value(row))
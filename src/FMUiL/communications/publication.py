@@ -0,0 +1,77 @@
+import re
+
+# "FMU.variable" references inside condition strings
+REFERENCE_PATTERN = re.compile(r"([A-Za-z_]\w*)\.([A-Za-z_]\w*)")
+
+class PublicationPolicy:
+    """
+    Decides which FMU variables are materialized as OPC UA nodes and refreshed every step.
+
+    By default only variables referenced by the experiment (system_loop, logging,
+    evaluation, start_evaluating_conditions and initial_system_state) are published.
+    The experiment can override this per FMU with the "publish" section, either
+    with a list of variable names (added to the referenced ones) or "all".
+    Unpublished variables can be created later with InternalServerSetup.publish_variables.
+
+    Published outputs are only written when they change by more than their deadband,
+    given per output ("FMU.variable") or per FMU ("FMU") in the "deadbands" section.
+    Outputs the experiment itself reads (referenced) have no deadband, so logged and
+    evaluated values stay exact. Deadbands only thin out the values seen by other clients.
+    """
+    def __init__(self, referenced: dict[str, set[str]], explicit: dict[str, list[str] | str] | None = None,
+                 deadbands: dict[str, dict] | None = None) -> None:
+        self.referenced = referenced
+        self.explicit   = explicit or {}
+        self.deadbands  = deadbands or {}
+
+    @classmethod
+    def from_experiment_config(cls, experiment_config: dict) -> "PublicationPolicy":
+        experiment = experiment_config["experiment"]
+        referenced: dict[str, set[str]] = {}
+
+        def add(system: str, variable: str) -> None:
+            referenced.setdefault(system, set()).add(variable)
+
+        def add_endpoint(endpoint: str) -> None:
+            system, _, variable = endpoint.partition(".")
+            if system and variable:
+                add(system, variable)
+
+        for edge in experiment.get("system_loop") or []:
+            add_endpoint(edge["from"])
+            add_endpoint(edge["to"])
+
+        for endpoint in experiment.get("logging") or []:
+            add_endpoint(endpoint)
+
+        for criterion in (experiment.get("evaluation") or {}).values():
+            condition = criterion["condition"] if isinstance(criterion, dict) else criterion
+            for system, variable in REFERENCE_PATTERN.findall(condition):
+                add(system, variable)
+
+        for condition in (experiment.get("start_evaluating_conditions") or {}).values():
+            for system, variable in REFERENCE_PATTERN.findall(condition):
+                add(system, variable)
+
+        for system, state in (experiment.get("initial_system_state") or {}).items():
+            for variable in state:
+                add(system, variable)
+
+        return cls(referenced=referenced, explicit=experiment.get("publish"), deadbands=experiment.get("deadbands"))
+
+    def published(self, fmu_name: str, variables) -> list[str]:
+        """Returns the variables of the FMU that are published, in their original order"""
+        explicit = self.explicit.get(fmu_name)
+        if explicit == "all":
+            return list(variables)
+        selected = self.referenced.get(fmu_name, set()) | set(explicit or [])
+        return [variable for variable in variables if variable in selected]
+
+    def deadband(self, fmu_name: str, variable: str) -> tuple[float, float]:
+        """Returns the (absolute, relative) deadband of an output, (0, 0) publishes every change"""
+        if variable in self.referenced.get(fmu_name, ()):
+            return 0.0, 0.0 # read by the coordinator
+        deadband = self.deadbands.get(f"{fmu_name}.{variable}", self.deadbands.get(fmu_name))
+        if deadband is None:
+            return 0.0, 0.0
+        return float(deadband.get("absolute", 0.0)), float(deadband.get("relative", 0.0))
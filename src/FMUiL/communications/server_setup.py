@@ -1,10 +1,14 @@
 from asyncua import Server, ua
 import asyncio
 import datetime
+from collections import deque
 from asyncua.common.methods import uamethod
+import ast
 import logging
+import numpy as np
 import time
 from decimal import Decimal, getcontext, ROUND_HALF_UP
+from FMUiL.handlers.execution_plan import SERVER_OBJECT, SIMULATE_METHOD, UPDATE_METHOD, RESET_METHOD, UPDATE_BULK_METHOD, PUBLISH_METHOD
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +16,13 @@ getcontext().prec = 4
 PRECISION_STR = "0.0001"
 COMPARISON_PRECISION = Decimal("0.0001")
 
+# FMI types accepted by the bulk update, in the order of the method arguments
+BULK_TYPES = ("Real", "Integer", "Boolean")
+BULK_VARIANTS = {"Real": ua.VariantType.Double, "Integer": ua.VariantType.Int32, "Boolean": ua.VariantType.Boolean}
+
 class InternalServerSetup:
+    instances = 1 # FMU instances behind the server, see EnsembleServerSetup
+
     def __init__(self) -> None:
         self.server_started = asyncio.Event()
         self.server = None
@@ -23,8 +33,21 @@ class InternalServerSetup:
         self.fmu_time    = Decimal("0.0")
         self.server_time = Decimal("0.0")
         self.server_variable_ids = {}
+        self.publication_policy = None # PublicationPolicy, None publishes every variable
+        self.object_node = None
+        self.published_outputs = ([], []) # (names, value references) refreshed every step
+        self.last_published = np.empty(0)     # last value written to each published output node
+        self.output_deadbands = (np.empty(0), np.empty(0)) # (absolute, relative) per published output
+        self.run_ahead_steps = None  # free-running FMUs are simulated ahead in batches, see enable_run_ahead
+        self.run_ahead_until = None  # no need to simulate past the stop time
+        self.output_buffer   = deque() # (time, all outputs, bus outputs) computed ahead
+        self.published_positions = np.empty(0, dtype=int) # positions of the published outputs in fmu_outputs
         self.opc_server_only_variables = ["timestep"] # variables reserved only for the server not fmu
         self.last_simulation_timestamp = 0.0
+        self.signal_bus  = None # shared memory bus for routed signals, see attach_signal_bus
+        self.bus_outputs = ([], []) # (value references, bus slots) written after each step
+        self.bus_inputs  = []       # (variable, bus slot) read after each step barrier
+        self.sensitivity = None     # SensitivityAnalysis of the experiment, see enable_sensitivity
         
         # reserved variables have a namespace=2 
         self.reserved_variable_ids = {
@@ -45,15 +68,49 @@ class InternalServerSetup:
         await node_to.write_value(value)    
     
     @classmethod
-    async def async_server_init(cls, fmu:str, port:int):
+    async def async_server_init(cls, fmu:str, port:int, publication_policy=None, ensemble: dict[str, int] | None = None):
         from FMUiL.handlers import FmuHandler
+        # loading and instantiating is blocking, run it in a thread so FMUs load in parallel
+        model = await asyncio.to_thread(FmuHandler, fmu_file=fmu, ensemble=ensemble)
+        setup = cls
+        if model.instances > 1:
+            from FMUiL.communications.ensemble_setup import EnsembleServerSetup
+            setup = EnsembleServerSetup
+        return await setup.async_model_init(model=model, port=port, publication_policy=publication_policy)
+
+    @classmethod
+    async def async_replay_init(cls, name: str, source: dict, port: int, timestep: float, publication_policy=None):
+        """
+        Serves a system replayed from a recorded log instead of an FMU
+        """
+        from FMUiL.handlers import ReplayHandler
+        model = await asyncio.to_thread(ReplayHandler, name=name, source=source)
+        self = await cls.async_model_init(model=model, port=port, publication_policy=publication_policy)
+        try:
+            await self.write_value(variable="timestep", value=float(source.get("timestep") or timestep))
+        except BaseException:
+            model.close()
+            raise
+        return self
+
+    @classmethod
+    async def async_model_init(cls, model, port:int, publication_policy=None):
         self = cls()
-        self.fmu:FmuHandler = FmuHandler(fmu_file=fmu)
+        self.publication_policy = publication_policy
+        self.fmu = model
         self.url = self.construct_server_url(port)
-        await self.setup_sequence()
-        self.idx = int(await self.server.register_namespace(self.url))
+        try:
+            await self.setup_sequence()
+            self.idx = int(await self.server.register_namespace(self.url))
+        except BaseException:
+            model.close() # nobody else holds the model yet
+            raise
         return self
     
+    def node_value(self, value):
+        # value of a variable node, ensembles hold one value per instance
+        return float(value)
+
     def construct_server_url(self, port):
         return f"opc.tcp://localhost:{port}/{self.fmu.fmu_name}/"
 
@@ -73,19 +130,62 @@ class InternalServerSetup:
                 variable = await obj.add_variable(nodeid=self.reserved_variable_ids[var], bname=var, val=0.0)
                 self.server_variable_ids[var] = self.reserved_variable_ids[var]
             else:
-                variable = await obj.add_variable(nodeid=ua.NodeId(var), bname=var, val=0.0)
+                variable = await obj.add_variable(nodeid=ua.NodeId(var), bname=var, val=self.node_value(0.0))
                 self.server_variable_ids[var] = ua.NodeId(var)
             await variable.set_writable()
 
+    def _published(self, variables) -> list[str]:
+        if self.publication_policy is None:
+            return list(variables)
+        return self.publication_policy.published(self.fmu.fmu_name, variables)
+
     # TODO: improve set writable 
     async def setup_server_variables(self):
-        obj = await self.server.nodes.objects.add_object(bname = self.fmu.fmu_name, nodeid= ua.NodeId(Identifier=1, NamespaceIndex=1)) 
-        self.server_variable_ids[self.fmu.fmu_name] = ua.NodeId(Identifier=1, NamespaceIndex=1)
+        obj = await self.server.nodes.objects.add_object(bname = self.fmu.fmu_name, nodeid= SERVER_OBJECT) 
+        self.object_node = obj
+        self.server_variable_ids[self.fmu.fmu_name] = SERVER_OBJECT
         await self.set_variables_writable(variables=self.reserved_variable_ids, obj= obj)
-        await self.set_variables_writable(variables=self.fmu.fmu_inputs, obj= obj)
-        await self.set_variables_writable(variables=self.fmu.fmu_outputs, obj= obj)
-        await self.set_variables_writable(variables=self.fmu.fmu_parameters, obj= obj)
+        # only the published variables become nodes, see PublicationPolicy
+        await self.set_variables_writable(variables=self._published(self.fmu.fmu_inputs), obj= obj)
+        await self.set_variables_writable(variables=self._published(self.fmu.fmu_outputs), obj= obj)
+        await self.set_variables_writable(variables=self._published(self.fmu.fmu_parameters), obj= obj)
+        self._update_published_outputs()
         await self.setup_standard_methods(obj= obj)
+
+    def _update_published_outputs(self) -> None:
+        names = [output for output in self.fmu.fmu_outputs if output in self.server_variable_ids]
+        self.published_outputs = (names, [int(self.fmu.fmu_outputs[output]["id"]) for output in names])
+        positions = {output: position for position, output in enumerate(self.fmu.fmu_outputs)}
+        self.published_positions = np.array([positions[output] for output in names], dtype=int)
+        deadbands = [
+            self.publication_policy.deadband(self.fmu.fmu_name, output) if self.publication_policy else (0.0, 0.0)
+            for output in names
+        ]
+        self.output_deadbands = (
+            np.array([absolute for absolute, _ in deadbands], dtype=float),
+            np.array([relative for _, relative in deadbands], dtype=float),
+        )
+        self.last_published = np.full(len(names), np.nan)
+
+    async def publish_variables(self, variables: list[str]) -> None:
+        """
+        Creates nodes for FMU variables that were not published at startup (lazy publication)
+        """
+        new_variables = [variable for variable in variables if variable not in self.server_variable_ids]
+        unknown = [variable for variable in new_variables if variable not in self.fmu.fmu_variables]
+        if unknown:
+            raise KeyError(f"Variables {unknown} not found in FMU {self.fmu.fmu_name}.")
+        await self.set_variables_writable(variables=new_variables, obj=self.object_node)
+        self._update_published_outputs()
+        for variable in new_variables:
+            fmu_variable = self.fmu.fmu_variables[variable]
+            if fmu_variable["type"] in ("Real", "Integer", "Enumeration", "Boolean") and variable not in self.fmu.fmu_outputs:
+                value = self.get_fmu_values(fmu_variable["type"], [fmu_variable["id"]])[0]
+                await self.server.get_node(self.server_variable_ids[variable]).set_value(self.node_value(value))
+        if new_variables and self.output_buffer:
+            await self.publish_outputs(fmu_outputs=self.output_buffer[0][1][self.published_positions])
+        elif new_variables:
+            await self.publish_outputs()
     
     #######################################################
     ####### STANDARD METHODS FOR ALL OF OJBECTS ###########
@@ -94,38 +194,72 @@ class InternalServerSetup:
     async def setup_standard_methods(self, obj):
         ######### simulation #########
         await obj.add_method(
-            ua.NodeId(1, 2),   
+            SIMULATE_METHOD,
             "simulate",          
             self.simulate_fmu,           
         )
 
         ######### value update for fmu and opc #########
         await obj.add_method(
-            ua.NodeId(1, 3),   
+            UPDATE_METHOD,
             "update",          
             self.update_value_opc_and_fmu,           
         )
 
         ######### resetting (not used) #########
         await obj.add_method(
-            ua.NodeId(1, 4),   
+            RESET_METHOD,
             "reset_fmu",          
             self.reset_fmu,           
         )
 
+        ######### lazy publication of unpublished variables #########
+        await obj.add_method(
+            PUBLISH_METHOD,
+            "publish",          
+            self.publish,           
+        )
+
+        ######### typed bulk update for fmu and opc #########
+        await obj.add_method(
+            UPDATE_BULK_METHOD,
+            "update_bulk",          
+            self.update_bulk,           
+        )
+
     async def single_simulation_loop(self):
         time_step = Decimal(await self.get_value(variable="timestep")).quantize(Decimal(PRECISION_STR))
+        if self.sensitivity is not None:
+            self.sensitivity.step_copies(current_time=self.fmu_time, step_size=time_step)
         self.fmu.fmu.doStep(
             currentCommunicationPoint=self.fmu_time,
             communicationStepSize=time_step
             )
         self.fmu_time += time_step
-    
-        for output in self.fmu.fmu_outputs:
-            output_id = int(self.fmu.fmu_outputs[output]["id"])
-            fmu_output = self.fmu.fmu.getReal([output_id])
-            node = self.server.get_node(self.server_variable_ids[output])
-            await node.set_value(float(fmu_output[0]))
+        if self.sensitivity is not None:
+            self.sensitivity.update()
+        await self.publish_outputs()
+
+    async def publish_outputs(self, force: bool = False, fmu_outputs: np.ndarray | None = None):
+        """
+        Writes the published outputs that changed by more than their deadband
+        (any change when the deadband is zero) to the address space.
+        fmu_outputs are given when publishing values computed ahead.
+        """
+        names, value_references = self.published_outputs
+        if not names:
+            return
+        if fmu_outputs is None:
+            fmu_outputs = np.asarray(self.fmu.fmu.getReal(value_references), dtype=float)
+        absolute, relative = self.output_deadbands
+        threshold = np.maximum(absolute, relative * np.abs(self.last_published))
+        changed = np.isnan(self.last_published) | (np.abs(fmu_outputs - self.last_published) > threshold)
+        if force:
+            changed[:] = True
+        for index in np.flatnonzero(changed):
+            node = self.server.get_node(self.server_variable_ids[names[index]])
+            await node.set_value(float(fmu_outputs[index]))
+        self.last_published[changed] = fmu_outputs[changed]
 
     @uamethod
     async def simulate_fmu(self, parent=None, value: str = None):
@@ -138,11 +272,10 @@ class InternalServerSetup:
             # Step FMU until it catches up to system time
             while self.fmu_time < self.server_time:              
                 await self.single_simulation_loop()
-<<<<<<< HEAD
-                
-=======
 
->>>>>>> fe3b160d5840369dbf9434ae92b0c57ca18eb401
+            self.write_bus_outputs()
+            await self.publish_sensitivities()
+
             # Measure wall-clock time and compare if the simulation takes longer || THIS IS NOT TESTED FUNCTIONALITY
             elapsed_wall_time = time.perf_counter() - start_wall_time
             simulated_time_advanced = float(system_timestep)
@@ -161,31 +294,118 @@ class InternalServerSetup:
         variable = value["variable"]
         new_value = float(value["value"])
 
-        # Update OPC server
-        node = self.server.get_node(self.server_variable_ids[variable])
-        await node.set_value(new_value)
+        # Update OPC server (if the variable is published)
+        if variable in self.server_variable_ids:
+            node = self.server.get_node(self.server_variable_ids[variable])
+            await node.set_value(self.node_value(new_value))
+
+        # Update FMU
+        self.set_fmu_value(variable, new_value)
 
+    def _settable_variable(self, variable: str) -> dict:
         # Only allow updating inputs or parameters (not outputs, do we need it?)
         if variable in self.fmu.fmu_inputs:
-            var_id = self.fmu.fmu_inputs[variable]["id"]
+            return self.fmu.fmu_inputs[variable]
 
         elif variable in self.fmu.fmu_parameters:
-            var_id = self.fmu.fmu_parameters[variable]["id"]
-
+            return self.fmu.fmu_parameters[variable]
+
+        raise KeyError(f"Variable '{variable}' not found in FMU inputs or parameters.")
+
+    def set_fmu_value(self, variable: str, value: float) -> None:
+        fmu_variable = self._settable_variable(variable)
+        self.set_fmu_values(fmu_variable["type"], [fmu_variable["id"]], [value])
+
+    def get_fmu_values(self, fmi_type: str, value_references: list[int]) -> list:
+        if fmi_type == "Real":
+            return self.fmu.fmu.getReal(value_references)
+        elif fmi_type in ("Integer", "Enumeration"):
+            return self.fmu.fmu.getInteger(value_references)
+        elif fmi_type == "Boolean":
+            return self.fmu.fmu.getBoolean(value_references)
+        raise TypeError(f"FMI type '{fmi_type}' cannot be read.")
+
+    def set_fmu_values(self, fmi_type: str, value_references: list[int], values: list) -> None:
+        if fmi_type == "Real":
+            self.fmu.fmu.setReal(value_references, [float(v) for v in values])
+        elif fmi_type in ("Integer", "Enumeration"):
+            self.fmu.fmu.setInteger(value_references, [int(round(v)) for v in values])
+        elif fmi_type == "Boolean":
+            self.fmu.fmu.setBoolean(value_references, [bool(v) for v in values])
         else:
-            raise KeyError(f"Variable '{variable}' not found in FMU inputs or parameters.")
-
-        # Update FMU
-        self.fmu.fmu.setReal([var_id], [new_value])
+            raise TypeError(f"FMI type '{fmi_type}' cannot be updated.")
+
+    def bulk_layout(self, variables: list[str]) -> dict[str, tuple[list[int], list[int]]]:
+        """
+        Groups variables for update_bulk by FMI type:
+        type -> (value references, positions of the values in the variables list)
+        """
+        layout = {fmi_type: ([], []) for fmi_type in BULK_TYPES}
+        for position, variable in enumerate(variables):
+            fmu_variable = self._settable_variable(variable)
+            fmi_type = "Integer" if fmu_variable["type"] == "Enumeration" else fmu_variable["type"]
+            if fmi_type not in layout:
+                raise TypeError(f"Variable '{variable}' of FMI type '{fmi_type}' cannot be updated.")
+            layout[fmi_type][0].append(fmu_variable["id"])
+            layout[fmi_type][1].append(position)
+        return layout
+
+    @staticmethod
+    def bulk_arguments(layout: dict[str, tuple[list[int], list[int]]], values: list) -> list[ua.Variant]:
+        """
+        Method arguments of update_bulk for the values ordered as in the layout variables
+        """
+        arguments = []
+        for fmi_type in BULK_TYPES:
+            value_references, positions = layout[fmi_type]
+            if fmi_type == "Real":
+                typed_values = [float(values[i]) for i in positions]
+            elif fmi_type == "Integer":
+                typed_values = [int(round(values[i])) for i in positions]
+            else:
+                typed_values = [bool(values[i]) for i in positions]
+            arguments.append(ua.Variant(value_references, ua.VariantType.UInt32))
+            arguments.append(ua.Variant(typed_values, BULK_VARIANTS[fmi_type]))
+        return arguments
     
     async def update_opc(self, parent, value):
         node = self.server.get_node(self.server_variable_ids[value["variable"]])
         await node.set_value(float(value["value"]))
         # logger.info(f"\n\n\n\n server {self.fmu.fmu_name} WAS UPDATED")
 
+    @uamethod
+    async def update_bulk(self, parent=None, real_references=None, real_values=None,
+                          integer_references=None, integer_values=None,
+                          boolean_references=None, boolean_values=None):
+        """
+        Applies all pending inputs/parameters with one call, grouped by FMI type.
+        Use bulk_layout and bulk_arguments to build the arguments.
+        """
+        updates = {
+            "Real": (real_references or [], real_values or []),
+            "Integer": (integer_references or [], integer_values or []),
+            "Boolean": (boolean_references or [], boolean_values or []),
+        }
+        for fmi_type, (value_references, values) in updates.items():
+            if not value_references:
+                continue
+            if len(value_references) != len(values):
+                raise ValueError(f"update_bulk got {len(value_references)} {fmi_type} references for {len(values)} values")
+            self.set_fmu_values(fmi_type, list(value_references), list(values))
+            names = self.fmu.settable_names[fmi_type]
+            for value_reference, value in zip(value_references, values):
+                for name in names[value_reference]: # aliases share the value reference
+                    node_id = self.server_variable_ids.get(name)
+                    if node_id is not None: # unpublished variables have no node
+                        await self.server.get_node(node_id).set_value(float(value))
+
+    @uamethod
+    async def publish(self, parent=None, variables=None):
+        await self.publish_variables(list(variables or []))
+
     @uamethod
     async def update_value_opc_and_fmu(self, parent= None, value= None):        
-        value = eval(value)
+        value = ast.literal_eval(value) # only literals, the string is sent by the client
         if value["variable"] in self.opc_server_only_variables:
             await self.update_opc(parent= parent, value= value)
         else:
@@ -197,12 +417,206 @@ class InternalServerSetup:
         self.server_time = 0
         
         self.fmu_time = 0
+        self.last_published[:] = np.nan # publish everything after the reset
+        self.output_buffer.clear()
+        self.disable_sensitivity() # the perturbed states belong to the old run
         self.fmu.fmu.reset()
         self.fmu.fmu.instantiate()
         self.fmu.fmu.enterInitializationMode()
         self.fmu.fmu.exitInitializationMode()
         logger.info(f"fmu {self.fmu.fmu_name} was resetted")
 
+    #######################################################
+    ######## DIRECT ROUTING BETWEEN INTERNAL SERVERS ######
+    #######################################################
+
+    def attach_signal_bus(self, bus, outputs: list[tuple[str, int]], inputs: list[tuple[str, int]]) -> None:
+        """
+        Connects the server to the signal bus:
+        outputs = (own variable, slot) written after every step,
+        inputs  = (own input or parameter, slot) read after every step barrier.
+        The values are exchanged without the coordinator.
+        """
+        for variable, _ in outputs:
+            if variable not in self.fmu.fmu_variables:
+                raise KeyError(f"Variable '{variable}' not found in FMU {self.fmu.fmu_name}.")
+        for variable, _ in inputs:
+            if variable not in self.fmu.fmu_inputs and variable not in self.fmu.fmu_parameters:
+                raise KeyError(f"Variable '{variable}' not found in FMU {self.fmu.fmu_name} inputs or parameters.")
+        self.signal_bus  = bus
+        self.bus_outputs = (
+            [self.fmu.fmu_variables[variable]["id"] for variable, _ in outputs],
+            [slot for _, slot in outputs],
+        )
+        self.bus_inputs  = list(inputs)
+
+    def write_bus_outputs(self, values=None) -> None:
+        value_references, slots = self.bus_outputs
+        if slots:
+            self.signal_bus.write(slots, self.fmu.fmu.getReal(value_references) if values is None else values)
+
+    async def read_bus_inputs(self) -> None:
+        if not self.bus_inputs:
+            return
+        values = self.signal_bus.read([slot for _, slot in self.bus_inputs])
+        for (variable, _), value in zip(self.bus_inputs, values):
+            value = float(value)
+            self.set_fmu_value(variable, value)
+            node_id = self.server_variable_ids.get(variable)
+            if node_id is not None: # the FMU always gets the value, the node only if it is served
+                await self.server.get_node(node_id).set_value(value)
+
+    #######################################################
+    ######## RUN AHEAD FOR FREE-RUNNING (OPEN LOOP) FMUS ##
+    #######################################################
+
+    def enable_run_ahead(self, batch_steps: int, stop_time: float) -> None:
+        """
+        For FMUs without connected inputs: the FMU is simulated batch_steps communication
+        steps ahead at once and the outputs of every communication point are buffered.
+        The coordinator advances the server in-process with advance(), without a simulate call.
+        """
+        self.run_ahead_steps = batch_steps
+        self.run_ahead_until = Decimal(str(stop_time))
+        self.output_buffer.clear()
+
+    def disable_run_ahead(self) -> None:
+        self.run_ahead_steps = None
+        self.output_buffer.clear()
+
+    def _snapshot_outputs(self) -> tuple[Decimal, np.ndarray, np.ndarray]:
+        # all outputs are kept, so variables published later can still be served from the buffer
+        output_references = [int(output["id"]) for output in self.fmu.fmu_outputs.values()]
+        bus_references, _ = self.bus_outputs
+        outputs = np.asarray(self.fmu.fmu.getReal(output_references), dtype=float) if output_references else np.empty(0)
+        bus = np.asarray(self.fmu.fmu.getReal(bus_references), dtype=float) if bus_references else np.empty(0)
+        return self.fmu_time, outputs, bus
+
+    async def run_batch(self, system_timestep: Decimal) -> None:
+        """
+        Simulates the FMU up to batch_steps communication steps ahead of the last buffered point
+        """
+        time_step = Decimal(await self.get_value(variable="timestep")).quantize(Decimal(PRECISION_STR))
+        horizon = self.output_buffer[-1][0] if self.output_buffer else self.server_time - system_timestep
+        for _ in range(self.run_ahead_steps):
+            horizon += system_timestep
+            while self.fmu_time < horizon:
+                self.fmu.fmu.doStep(
+                    currentCommunicationPoint=self.fmu_time,
+                    communicationStepSize=time_step
+                    )
+                self.fmu_time += time_step
+            self.output_buffer.append(self._snapshot_outputs())
+            if horizon >= self.run_ahead_until:
+                break
+
+    async def advance(self, value: str) -> None:
+        """
+        Advances a free-running server by one communication step using the buffered outputs
+        """
+        system_timestep = Decimal(value).quantize(Decimal(PRECISION_STR), rounding=ROUND_HALF_UP)
+        self.server_time += system_timestep
+        while not self.output_buffer or self.output_buffer[-1][0] < self.server_time:
+            await self.run_batch(system_timestep)
+
+        # the latest buffered point at or before the server time, older points are dropped
+        while len(self.output_buffer) > 1 and self.output_buffer[1][0] <= self.server_time:
+            self.output_buffer.popleft()
+        _, outputs, bus = self.output_buffer[0]
+        await self.publish_outputs(fmu_outputs=outputs[self.published_positions])
+        self.write_bus_outputs(values=bus)
+
+    #######################################################
+    ############## SENSITIVITIES (in-process) #############
+    #######################################################
+
+    async def enable_sensitivity(self, settings: dict) -> None:
+        """
+        Computes the sensitivities of settings (see SensitivityConfig) after every step
+        from the current state, served as the variables d(output)/d(variable)
+        """
+        from FMUiL.handlers.sensitivity import SensitivityAnalysis
+        self.disable_sensitivity()
+        self.sensitivity = SensitivityAnalysis(
+            self.fmu,
+            outputs         = settings["outputs"],
+            with_respect_to = settings["with_respect_to"],
+            method          = settings["method"],
+            relative_step   = settings["relative_step"],
+            central         = settings["central"],
+        )
+        new_variables = [name for name in self.sensitivity.names if name not in self.server_variable_ids]
+        await self.set_variables_writable(variables=new_variables, obj=self.object_node)
+        self.sensitivity.start()
+        self.sensitivity.update()
+        await self.publish_sensitivities()
+
+    def disable_sensitivity(self) -> None:
+        if self.sensitivity is not None:
+            self.sensitivity.close()
+            self.sensitivity = None
+
+    async def publish_sensitivities(self) -> None:
+        if self.sensitivity is None:
+            return
+        for name, value in zip(self.sensitivity.names, self.sensitivity.values):
+            await self.server.get_node(self.server_variable_ids[name]).set_value(self.node_value(value))
+
+    #######################################################
+    ############## CHECKPOINTING (in-process) #############
+    #######################################################
+
+    def supports_checkpoints(self) -> bool:
+        co_simulation = self.fmu.model_description.coSimulation
+        return bool(co_simulation.canGetAndSetFMUstate and co_simulation.canSerializeFMUstate)
+
+    def get_checkpoint_state(self) -> dict:
+        """
+        Serializes the FMU state together with the server clocks
+        """
+        state = self.fmu.fmu.getFMUstate()
+        try:
+            serialized_state = self.fmu.fmu.serializeFMUstate(state)
+        finally:
+            self.fmu.fmu.freeFMUstate(state)
+        return {
+            "fmu_state": serialized_state,
+            "fmu_time": str(self.fmu_time),
+            "server_time": str(self.server_time),
+            "output_buffer": [(str(time), outputs.tolist(), bus.tolist()) for time, outputs, bus in self.output_buffer],
+            "sensitivity": self.sensitivity.get_state() if self.sensitivity is not None else None,
+        }
+
+    async def restore_checkpoint_state(self, checkpoint: dict) -> None:
+        """
+        Restores a state created by get_checkpoint_state and refreshes the outputs
+        """
+        state = self.fmu.fmu.deSerializeFMUstate(checkpoint["fmu_state"])
+        try:
+            self.fmu.fmu.setFMUstate(state)
+        finally:
+            self.fmu.fmu.freeFMUstate(state)
+        self.fmu_time    = Decimal(checkpoint["fmu_time"])
+        self.server_time = Decimal(checkpoint["server_time"])
+        await self.write_value(variable="server_time", value=float(self.server_time))
+        self.output_buffer = deque(
+            (Decimal(time), np.asarray(outputs, dtype=float), np.asarray(bus, dtype=float))
+            for time, outputs, bus in checkpoint["output_buffer"]
+        )
+        if self.sensitivity is not None:
+            # the perturbed copies continue from the checkpoint as well
+            if checkpoint.get("sensitivity") is None:
+                raise ValueError(f"The checkpoint of {self.fmu.fmu_name} has no sensitivity states")
+            self.sensitivity.set_state(checkpoint["sensitivity"])
+            self.sensitivity.update()
+            await self.publish_sensitivities()
+        if self.output_buffer:
+            # the FMU itself is ahead, publish the buffered values of the server time
+            await self.publish_outputs(force=True, fmu_outputs=self.output_buffer[0][1][self.published_positions])
+        else:
+            await self.publish_outputs(force=True)
+        logger.info(f"fmu {self.fmu.fmu_name} was restored to t={self.fmu_time}")
+
     def get_server_description(self):
         return {self.fmu.fmu_name: self.server_variables}
 
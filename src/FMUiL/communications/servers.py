@@ -1,4 +1,5 @@
 from FMUiL.communications.server_setup import InternalServerSetup
+from FMUiL.communications.publication import PublicationPolicy
 from pathlib import Path
 import asyncio
 
@@ -9,6 +10,10 @@ class server_manager:
         self = cls()
         self.remote_servers = self.construct_remote_servers(experiment_config["external_servers"])
         self.fmu_files = experiment_config["fmu_files"]
+        self.replay_sources = experiment_config.get("replay") or {}
+        self.timestep = experiment_config["experiment"]["timestep"]
+        self.ensemble = experiment_config["experiment"].get("ensemble") # instances by FMU name
+        self.publication_policy = PublicationPolicy.from_experiment_config(experiment_config)
         self._tasks: list[asyncio.Task] = []
         self.internal_servers: dict[str, InternalServerSetup] = {}
         self.base_port = port
@@ -31,17 +36,51 @@ class server_manager:
         return server_dict
 
     async def initialize_fmu_opc_servers(self) -> None:
-        for fmu_file in self.fmu_files:            
-            self.base_port+=1
-            server =  await InternalServerSetup.async_server_init(
-                fmu=fmu_file, 
-                port=self.base_port
-            )
-            server_task = asyncio.create_task(server.main_loop())
-            await server.server_started.wait()
-            server.server_started.clear()
-            self.internal_servers[server.fmu.fmu_name] = server
-            self._tasks.append(server_task)
+        """
+        Loads the FMUs and replayed systems and starts their servers concurrently,
+        startup takes roughly as long as the slowest FMU
+        """
+        ports = iter(range(self.base_port + 1, self.base_port + 1 + len(self.fmu_files) + len(self.replay_sources)))
+        self.base_port += len(self.fmu_files) + len(self.replay_sources)
+        server_inits = [
+            InternalServerSetup.async_server_init(fmu=fmu_file, port=next(ports), publication_policy=self.publication_policy,
+                                                  ensemble=self.ensemble)
+            for fmu_file in self.fmu_files
+        ]
+        server_inits += [
+            InternalServerSetup.async_replay_init(name=name, source=source, port=next(ports), timestep=self.timestep,
+                                                  publication_policy=self.publication_policy)
+            for name, source in self.replay_sources.items()
+        ]
+        results = await asyncio.gather(
+            *(self.start_opc_server(server_init) for server_init in server_inits),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for result in results:
+            if not isinstance(result, BaseException):
+                self.internal_servers[result.fmu.fmu_name] = result
+        if errors:
+            await self.close()
+            raise errors[0]
+
+    async def start_opc_server(self, server_init) -> InternalServerSetup:
+        server = await server_init
+        server_task = asyncio.create_task(server.main_loop())
+        self._tasks.append(server_task)
+        started = asyncio.create_task(server.server_started.wait())
+        try:
+            await asyncio.wait({started, server_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not started.done():
+                # the server stopped before it started, e.g. the port is already in use
+                started.cancel()
+                server_task.result()
+        except BaseException:
+            # close() only knows the started servers, free the FMU of this one here
+            server.fmu.close()
+            raise
+        server.server_started.clear()
+        return server
         
     async def close(self) -> None:
         """Stop all servers and free the ports."""
@@ -50,4 +89,6 @@ class server_manager:
         for t in self._tasks:                # background loops
             t.cancel()
         await asyncio.gather(*self._tasks, return_exceptions=True)
+        for srv in self.internal_servers.values():
+            srv.fmu.close()                  # FMU instances and extracted files
         self.internal_servers.clear()
\ No newline at end of file
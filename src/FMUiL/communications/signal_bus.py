@@ -0,0 +1,65 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+HEADER_BYTES = 8 # int64 step counter in front of the buffers
+
+class SignalBus:
+    """
+    Double-buffered, typed array in shared memory that holds every routed signal.
+
+    During step k the servers write their outputs into the back buffer ((k+1) % 2)
+    while values for step k are read from the front buffer (k % 2). After every
+    server has stepped (the step barrier) the bus is advanced and the servers read
+    their inputs from the new front buffer. Workers in other processes attach to
+    the same memory by name with SignalBus.attach.
+    """
+    def __init__(self, signals: list[str], dtype=np.float64, name: str | None = None, create: bool = True) -> None:
+        self.signals = list(signals)
+        self.slots   = {signal: slot for slot, signal in enumerate(self.signals)}
+        self.dtype   = np.dtype(dtype)
+        size = HEADER_BYTES + 2 * max(len(self.signals), 1) * self.dtype.itemsize
+        self.owner = create
+        self.shm   = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self._step    = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf[:HEADER_BYTES])
+        self._buffers = np.ndarray((2, max(len(self.signals), 1)), dtype=self.dtype, buffer=self.shm.buf[HEADER_BYTES:size])
+        if create:
+            self._step[0] = 0
+            self._buffers[:] = 0
+
+    @classmethod
+    def attach(cls, name: str, signals: list[str], dtype=np.float64) -> "SignalBus":
+        return cls(signals=signals, dtype=dtype, name=name, create=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def step(self) -> int:
+        return int(self._step[0])
+
+    def slot(self, signal: str) -> int:
+        return self.slots[signal]
+
+    def write(self, slots: list[int], values) -> None:
+        """Writes the values produced by the current step into the back buffer"""
+        self._buffers[(self.step + 1) % 2, slots] = values
+
+    def read(self, slots: list[int]) -> np.ndarray:
+        """Reads values of the current communication point from the front buffer"""
+        return self._buffers[self.step % 2, slots]
+
+    def advance(self) -> None:
+        """Swaps the buffers, call once all writers of the step are done"""
+        self._step[0] += 1
+
+    def reset(self) -> None:
+        self._step[0] = 0
+        self._buffers[:] = 0
+
+    def close(self) -> None:
+        # views into the shared memory must be released before closing it
+        del self._step, self._buffers
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,230 @@
+from asyncua import Server, ua
+from asyncua.common.callback import CallbackType
+import asyncio
+import csv
+import logging
+import math
+import random
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+GENERATED_OBJECT = "generated"
+RECORD_HEADER = ["wall_time", "service", "object", "variable", "value", "status"]
+
+class StandInServer:
+    """
+    Serves the variables of an external server config (see ExternalServerConfig) in
+    place of the real server, for load and latency tests of the external read/write path.
+
+    - generate: additional Double variables var_00000, var_00001, ... in the object
+      "generated" with numeric ids from 1 in namespace (also used for the objects), see export_config
+    - latency, jitter: every read or write of a served variable is answered after
+      latency ± a uniformly drawn jitter (seconds). Requests of one connection are
+      processed in order, so a delayed request also delays the following ones
+    - drop_rate: share of those requests that are dropped. drop_mode "timeout" holds the
+      response for drop_delay seconds (longer than the client request timeout), "fault"
+      answers at once with BadTimeout
+    - update_interval: seconds between server-side updates of the generated variables
+      (a sine per variable), static if not set
+    - record: CSV file of the received writes (and reads with record_reads), buffered
+      and flushed every flush_rows rows
+    """
+    def __init__(self, server_config: dict, port: int | None = None, generate: int = 0, namespace: int = 2,
+                 latency: float = 0.0, jitter: float = 0.0, drop_rate: float = 0.0, drop_mode: str = "timeout",
+                 drop_delay: float = 10.0, update_interval: float | None = None, record: str | None = None,
+                 record_reads: bool = False, flush_rows: int = 1000, seed: int | None = None) -> None:
+        if drop_mode not in ("timeout", "fault"):
+            raise ValueError(f"drop_mode must be 'timeout' or 'fault', not '{drop_mode}'")
+        if not 0.0 <= drop_rate <= 1.0:
+            raise ValueError("drop_rate must be between 0 and 1")
+        self.server_config = server_config
+        self.url = self._with_port(server_config["url"], port)
+        self.generate = generate
+        self.namespace = namespace
+        self.latency    = latency
+        self.jitter     = jitter
+        self.drop_rate  = drop_rate
+        self.drop_mode  = drop_mode
+        self.drop_delay = drop_delay
+        self.update_interval = update_interval
+        self.record       = record
+        self.record_reads = record_reads
+        self.flush_rows   = flush_rows
+        self.random = random.Random(seed)
+
+        self.server = None
+        self.variables: dict[ua.NodeId, tuple[str, str]] = {} # node id → (object, variable)
+        self.generated_nodes = []
+        self.counts = {"reads": 0, "writes": 0, "delayed": 0, "dropped": 0}
+        self._rows: list[list] = []
+        self._record_file = None
+        self._record_writer = None
+        self._update_task = None
+
+    @staticmethod
+    def _with_port(url: str, port: int | None) -> str:
+        if port is None:
+            return url
+        parts = urlsplit(url)
+        return urlunsplit(parts._replace(netloc=f"{parts.hostname}:{port}"))
+
+    @staticmethod
+    def node_id(variable: dict) -> ua.NodeId:
+        # resolved as by client_manager.resolve_external_node_ids
+        if variable.get("name") is not None:
+            return ua.NodeId(variable["name"])
+        return ua.NodeId(Identifier=variable["id"], NamespaceIndex=variable["ns"])
+
+    def generated_name(self, index: int) -> str:
+        return f"var_{index:0{max(5, len(str(self.generate - 1)))}d}"
+
+    ########### SETUP ###########
+    async def start(self) -> None:
+        self.server = Server()
+        await self.server.init()
+        parts = urlsplit(self.url)
+        self.server.set_endpoint(urlunsplit(parts._replace(netloc=f"0.0.0.0:{parts.port}")))
+        self.server.set_server_name("FMUiL stand-in server")
+
+        objects = {name: dict(variables) for name, variables in self.server_config["objects"].items()}
+        namespaces = {self.node_id(variable).NamespaceIndex for variables in objects.values() for variable in variables.values()}
+        await self._register_namespaces(max(namespaces | {self.namespace}))
+
+        for object_name, variables in objects.items():
+            obj = await self._add_object(object_name)
+            for variable_name, variable in variables.items():
+                await self._add_variable(obj, object_name, variable_name, self.node_id(variable))
+
+        if self.generate:
+            obj = await self._add_object(GENERATED_OBJECT)
+            for index in range(self.generate):
+                node_id = ua.NodeId(Identifier=index + 1, NamespaceIndex=self.namespace)
+                node = await self._add_variable(obj, GENERATED_OBJECT, self.generated_name(index), node_id)
+                self.generated_nodes.append(node.nodeid)
+
+        if self.record:
+            self._record_file = open(self.record, "w", newline="")
+            self._record_writer = csv.writer(self._record_file)
+            self._record_writer.writerow(RECORD_HEADER)
+
+        self.server.subscribe_server_callback(CallbackType.PreRead, self._before_request)
+        self.server.subscribe_server_callback(CallbackType.PreWrite, self._before_request)
+        self.server.subscribe_server_callback(CallbackType.PostWrite, self._after_write)
+        if self.record_reads:
+            self.server.subscribe_server_callback(CallbackType.PostRead, self._after_read)
+
+        await self.server.start()
+        if self.update_interval and self.generated_nodes:
+            self._update_task = asyncio.create_task(self._update_generated())
+        print(f"Stand-in server at {self.url}: {len(self.variables)} variables")
+
+    async def _register_namespaces(self, highest: int) -> None:
+        # configured node ids may use any namespace index, the array is filled up to it
+        while len(await self.server.get_namespace_array()) <= highest:
+            index = len(await self.server.get_namespace_array())
+            await self.server.register_namespace(f"urn:fmuil:standin:{index}")
+
+    async def _add_object(self, object_name: str):
+        # string ids, numeric ids of the namespace are left to the variables
+        return await self.server.nodes.objects.add_object(ua.NodeId(f"standin.{object_name}", self.namespace), object_name)
+
+    async def _add_variable(self, obj, object_name: str, variable_name: str, node_id: ua.NodeId):
+        if node_id in self.variables:
+            raise ValueError(f"Node id {node_id} of {object_name}.{variable_name} is used more than once")
+        node = await obj.add_variable(nodeid=node_id, bname=ua.QualifiedName(variable_name, self.namespace), val=0.0)
+        await node.set_writable()
+        self.variables[node_id] = (object_name, variable_name)
+        return node
+
+    async def stop(self) -> None:
+        if self._update_task is not None:
+            self._update_task.cancel()
+        if self.server is not None:
+            await self.server.stop()
+        if self._record_file is not None:
+            self.flush()
+            self._record_file.close()
+            self._record_file = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            while True:
+                await asyncio.sleep(1)
+        finally:
+            await self.stop()
+            print(f"Stand-in server stopped: {self.counts}")
+
+    async def __aenter__(self) -> "StandInServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def export_config(self) -> dict:
+        """The served external server config including the generated variables, for experiments"""
+        objects = {name: dict(variables) for name, variables in self.server_config["objects"].items()}
+        if self.generate:
+            objects[GENERATED_OBJECT] = {
+                self.generated_name(index): {"ns": self.namespace, "id": index + 1} for index in range(self.generate)
+            }
+        return {"url": self.url, "objects": objects}
+
+    ########### FAULT INJECTION ###########
+    def _served(self, nodes) -> bool:
+        return any(item.NodeId in self.variables for item in nodes)
+
+    async def _before_request(self, event, dispatcher) -> None:
+        params = event.request_params
+        nodes = params.NodesToRead if isinstance(params, ua.ReadParameters) else params.NodesToWrite
+        if not self._served(nodes):
+            return # session setup, browsing, namespace reads
+        self.counts["reads" if isinstance(params, ua.ReadParameters) else "writes"] += 1
+        if self.drop_rate and self.random.random() < self.drop_rate:
+            self.counts["dropped"] += 1
+            if self.drop_mode == "fault":
+                raise ua.uaerrors.BadTimeout()
+            await asyncio.sleep(self.drop_delay)
+            return
+        delay = self.latency + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            self.counts["delayed"] += 1
+            await asyncio.sleep(delay)
+
+    ########### RECORDING ###########
+    def _record(self, service: str, node_id: ua.NodeId, value, status) -> None:
+        if self._record_writer is None:
+            return
+        object_name, variable_name = self.variables[node_id]
+        self._rows.append([f"{time.time():.6f}", service, object_name, variable_name, value, status])
+        if len(self._rows) >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._record_writer is not None and self._rows:
+            self._record_writer.writerows(self._rows)
+            self._record_file.flush()
+        self._rows.clear()
+
+    async def _after_write(self, event, dispatcher) -> None:
+        for item, status in zip(event.request_params.NodesToWrite, event.response_params or []):
+            if item.NodeId in self.variables:
+                self._record("write", item.NodeId, item.Value.Value.Value, status.name)
+
+    async def _after_read(self, event, dispatcher) -> None:
+        for item, result in zip(event.request_params.NodesToRead, event.response_params or []):
+            if item.NodeId in self.variables and item.AttributeId == ua.AttributeIds.Value:
+                value = result.Value.Value if result.Value is not None else None
+                self._record("read", item.NodeId, value, result.StatusCode.name)
+
+    async def _update_generated(self) -> None:
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(self.update_interval)
+            elapsed = time.monotonic() - started
+            for index, node_id in enumerate(self.generated_nodes):
+                value = math.sin(elapsed + index * 0.01)
+                await self.server.write_attribute_value(node_id, ua.DataValue(ua.Variant(value, ua.VariantType.Double)))
@@ -0,0 +1,10 @@
+from FMUiL.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "Coordinator": ".coordinator",
+    "Job":         ".coordinator",
+    "Worker":      ".worker",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,231 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import zipfile
+import yaml
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from time import strftime, gmtime
+
+from .protocol import (
+    HEARTBEAT_INTERVAL, STREAM_LIMIT, TOKEN_ENV, ProtocolError,
+    send_message, read_message, expect_message, file_hash, parse_address,
+)
+from .worker import OUTPUT_LOG
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_SUMMARY = "dispatch.json"
+
+@dataclass
+class Job:
+    """One experiment file dispatched to a worker"""
+    job_id: str
+    experiment_config: str
+    status: str = "pending" # pending, running, completed, failed
+    attempts: int = 0
+    worker: str | None = None
+    returncode: int | None = None
+    error: str | None = None
+
+class Coordinator:
+    """
+    Dispatches experiment files to workers ("fmuil run-all --workers").
+
+    - every worker is asked for its capacity and gets that many jobs at a time
+    - FMUs, external server descriptions and replayed logs are sent by content hash, only when
+      the worker does not have them cached
+    - the logs of every job are collected into one log folder
+    - jobs of a worker that fails or stops sending heartbeats are dispatched again
+      to the remaining workers, at most max_attempts times
+    A job whose experiment fails (non-zero return code) is not dispatched again.
+    """
+    connect_timeout = 5.0
+    max_attempts    = 3
+
+    def __init__(self, workers: list[str], log_folder: str | None = None, token: str | None = None) -> None:
+        if not workers:
+            raise ValueError("At least one worker address is required")
+        self.token = token or os.environ.get(TOKEN_ENV)
+        if not self.token:
+            raise ValueError(f"A worker token is required, pass --token or set {TOKEN_ENV}")
+        self.workers    = [address.strip() for address in workers if address.strip()]
+        self.log_folder = log_folder or self.generate_log()
+        self.dead_workers: set[str] = set()
+        self.jobs:  list[Job] = []
+        self.queue: asyncio.Queue[Job] = asyncio.Queue()
+        self.finished = asyncio.Event()
+        self.files:    dict[str, str] = {}   # content hash → local path
+        self.payloads: dict[str, tuple] = {} # job id → (experiment, files)
+
+    @staticmethod
+    def generate_log() -> str:
+        timestamp = strftime("%Y_%m_%d_%H_%M_%S", gmtime())
+        folder_path = os.path.join("logs", timestamp)
+        os.makedirs(folder_path, exist_ok=True)
+        return folder_path
+
+    ########### Jobs ###########
+    def prepare_job(self, index: int, experiment_config: str) -> tuple[Job, dict, dict]:
+        """Returns the job, the experiment with its files replaced by hashes and the {hash: suffix} of the files"""
+        with open(experiment_config, encoding="utf-8") as file:
+            config = yaml.safe_load(file)
+        files = {}
+        for key in ("fmu_files", "external_servers"):
+            hashes = []
+            for file_path in config.get(key) or []:
+                digest = file_hash(file_path)
+                self.files[digest] = file_path
+                files[digest] = Path(file_path).suffix
+                hashes.append(digest)
+            config[key] = hashes
+        for source in (config.get("replay") or {}).values():
+            digest = file_hash(source["file"])
+            self.files[digest] = source["file"]
+            files[digest] = Path(source["file"]).suffix
+            source["file"] = digest
+        job = Job(job_id=f"{index:03d}_{Path(experiment_config).stem}", experiment_config=experiment_config)
+        return job, config, files
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        if all(j.status in ("completed", "failed") for j in self.jobs):
+            self.finished.set()
+
+    def _requeue(self, job: Job, error: str) -> None:
+        job.error = error
+        if job.attempts >= self.max_attempts:
+            logger.error(f"Job {job.job_id} failed on {job.attempts} workers, giving up")
+            self._finish(job, "failed")
+        else:
+            job.status = "pending"
+            self.queue.put_nowait(job)
+
+    async def _next_job(self) -> Job | None:
+        # None once every job is done
+        get = asyncio.ensure_future(self.queue.get())
+        finished = asyncio.ensure_future(self.finished.wait())
+        await asyncio.wait((get, finished), return_when=asyncio.FIRST_COMPLETED)
+        finished.cancel()
+        if get.done():
+            return get.result()
+        get.cancel()
+        return None
+
+    ########### Run ###########
+    async def run(self, experiment_configs: list[str]) -> list[Job]:
+        for index, experiment_config in enumerate(experiment_configs):
+            job, config, files = self.prepare_job(index, experiment_config)
+            self.payloads[job.job_id] = (config, files)
+            self.jobs.append(job)
+            self.queue.put_nowait(job)
+        if not self.jobs:
+            return self.jobs
+
+        await asyncio.gather(*(self.serve_worker(address) for address in self.workers))
+
+        # every worker is gone, the remaining jobs cannot run
+        for job in self.jobs:
+            if job.status not in ("completed", "failed"):
+                job.error = job.error or "No workers left"
+                job.status = "failed"
+        self.write_summary()
+        return self.jobs
+
+    async def serve_worker(self, address: str) -> None:
+        try:
+            reader, writer = await self._connect(address)
+            try:
+                await send_message(writer, {"type": "hello", "token": self.token})
+                info, _ = await expect_message(reader, "info", timeout=self.connect_timeout)
+            finally:
+                writer.close()
+        except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ProtocolError) as e:
+            logger.error(f"Worker {address} is not available: {e}")
+            print(f"Worker {address} is not available: {e}")
+            self.dead_workers.add(address)
+            return
+        print(f"Worker {address} ready, capacity {info['capacity']}")
+        await asyncio.gather(*(self.serve_slot(address) for _ in range(max(int(info["capacity"]), 1))))
+
+    async def serve_slot(self, address: str) -> None:
+        while address not in self.dead_workers:
+            job = await self._next_job()
+            if job is None:
+                return
+            if address in self.dead_workers:
+                self.queue.put_nowait(job)
+                return
+            try:
+                await self.dispatch(address, job)
+            except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ProtocolError) as e:
+                message = f"{type(e).__name__}: {e}"
+                logger.error(f"Worker {address} failed while running {job.job_id}: {message}")
+                print(f"Worker {address} failed, dispatching {job.job_id} again")
+                self.dead_workers.add(address)
+                self._requeue(job, message)
+                return
+
+    async def _connect(self, address: str):
+        host, port = parse_address(address)
+        return await asyncio.wait_for(asyncio.open_connection(host, port, limit=STREAM_LIMIT), self.connect_timeout)
+
+    async def dispatch(self, address: str, job: Job) -> None:
+        config, files = self.payloads[job.job_id]
+        reader, writer = await self._connect(address)
+        try:
+            job.attempts += 1
+            job.worker = address
+            job.status = "running"
+            print(f"Dispatching {job.job_id} to {address} (attempt {job.attempts})")
+            await send_message(writer, {"type": "run", "token": self.token, "job_id": job.job_id, "config": config, "files": files})
+
+            # FMUs by content hash, only the ones the worker does not have yet
+            missing, _ = await expect_message(reader, "missing", timeout=self.connect_timeout)
+            for digest in missing["hashes"]:
+                with open(self.files[digest], "rb") as file:
+                    await send_message(writer, {"type": "file", "hash": digest}, file.read())
+
+            # a silent worker is considered failed
+            while True:
+                message, payload = await read_message(reader, timeout=3 * HEARTBEAT_INTERVAL)
+                if message.get("type") == "heartbeat":
+                    continue
+                if message.get("type") == "error":
+                    # rejected by the worker, another worker would reject it too
+                    job.error = message.get("message")
+                    self._finish(job, "failed")
+                    return
+                if message.get("type") != "result":
+                    raise ProtocolError(f"Unexpected message '{message.get('type')}'")
+                break
+
+            self.collect_logs(job, payload)
+            job.returncode = message["returncode"]
+            job.error = None if job.returncode == 0 else f"Experiment exited with code {job.returncode}"
+            print(f"Job {job.job_id} on {address}: {'completed' if job.returncode == 0 else 'failed'}")
+            self._finish(job, "completed" if job.returncode == 0 else "failed")
+        finally:
+            writer.close()
+
+    ########### Results ###########
+    def collect_logs(self, job: Job, payload: bytes) -> None:
+        """Extracts the experiment logs of the job into the log folder, the console output to worker_output/"""
+        root = os.path.realpath(self.log_folder)
+        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+            for member in archive.namelist():
+                if member == OUTPUT_LOG:
+                    target = os.path.join(root, "worker_output", f"{job.job_id}.log")
+                else:
+                    target = os.path.realpath(os.path.join(root, member))
+                    if not target.startswith(root + os.sep):
+                        raise ProtocolError(f"Log path outside the log folder: {member}")
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as file:
+                    file.write(archive.read(member))
+
+    def write_summary(self) -> None:
+        with open(os.path.join(self.log_folder, DISPATCH_SUMMARY), "w") as file:
+            json.dump([asdict(job) for job in self.jobs], file, indent=2)
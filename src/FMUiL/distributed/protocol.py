@@ -0,0 +1,53 @@
+import asyncio
+import json
+import re
+
+from FMUiL.utils.hashing import content_hash, file_hash
+
+DEFAULT_WORKER_PORT = 8750
+HEARTBEAT_INTERVAL  = 5.0     # seconds between heartbeats of a running job
+STREAM_LIMIT        = 2 ** 20 # longest message header in bytes
+TOKEN_ENV     = "FMUIL_WORKER_TOKEN"              # shared token of the coordinator and its workers
+FILE_SUFFIXES = (".fmu", ".yaml", ".yml", ".csv") # FMUs, external server descriptions, replayed logs
+HASH_PATTERN  = re.compile(r"[0-9a-f]{64}")       # content_hash
+
+class ProtocolError(Exception):
+    """The peer sent an unexpected or malformed message"""
+
+async def send_message(writer: asyncio.StreamWriter, message: dict, payload: bytes = b"") -> None:
+    """
+    A message is a JSON header on one line, followed by "payload" raw bytes
+    (FMU files, zipped logs)
+    """
+    header = dict(message, payload=len(payload))
+    writer.write(json.dumps(header).encode() + b"\n")
+    if payload:
+        writer.write(payload)
+    await writer.drain()
+
+async def read_message(reader: asyncio.StreamReader, timeout: float | None = None) -> tuple[dict, bytes]:
+    line = await asyncio.wait_for(reader.readline(), timeout)
+    if not line:
+        raise ConnectionError("Connection closed by peer")
+    try:
+        header = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ProtocolError(f"Malformed message header: {e}")
+    size = header.pop("payload", 0)
+    payload = await asyncio.wait_for(reader.readexactly(size), timeout) if size else b""
+    return header, payload
+
+async def expect_message(reader: asyncio.StreamReader, message_type: str, timeout: float | None = None) -> tuple[dict, bytes]:
+    message, payload = await read_message(reader, timeout)
+    if message.get("type") == "error":
+        raise ProtocolError(message.get("message", "error"))
+    if message.get("type") != message_type:
+        raise ProtocolError(f"Expected '{message_type}' message, got '{message.get('type')}'")
+    return message, payload
+
+def parse_address(address: str) -> tuple[str, int]:
+    """'host:port' or 'host' (default worker port)"""
+    host, _, port = address.strip().rpartition(":")
+    if not host:
+        return port, DEFAULT_WORKER_PORT
+    return host, int(port)
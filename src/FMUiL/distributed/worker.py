@@ -0,0 +1,186 @@
+import asyncio
+import hmac
+import io
+import logging
+import os
+import secrets
+import shutil
+import sys
+import zipfile
+import yaml
+
+from FMUiL.handlers.checkpoint_handler import _atomic_write, CHECKPOINT_FILE, RUN_MANIFEST
+from .protocol import (
+    HEARTBEAT_INTERVAL, STREAM_LIMIT, FILE_SUFFIXES, HASH_PATTERN, ProtocolError,
+    send_message, read_message, expect_message, content_hash,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_LOG = "output.log"
+
+class Worker:
+    """
+    Runs experiments dispatched by a Coordinator ("fmuil worker").
+
+    Every job runs "fmuil run" in its own process and job folder, with its own
+    range of OPC UA ports (base_port + slot * port_stride), at most capacity at a time.
+    FMUs and external server descriptions are cached by content hash, so they are
+    only transferred once. The job logs are zipped and sent back to the coordinator.
+
+    Jobs run native FMU code, so every request has to carry the shared token. A random
+    token is generated (and printed) when none is given.
+    """
+    port_stride = 100 # OPC UA ports reserved for every job slot
+
+    def __init__(self, host: str, port: int, capacity: int, base_port: int, work_dir: str, token: str | None = None) -> None:
+        self.generated_token = not token
+        self.token     = token or secrets.token_urlsafe(24)
+        self.host      = host
+        self.port      = port
+        self.capacity  = capacity
+        self.base_port = base_port
+        self.work_dir  = os.path.abspath(work_dir)
+        self.file_dir  = os.path.join(self.work_dir, "files")
+        self.job_dir   = os.path.join(self.work_dir, "jobs")
+        self.slots: asyncio.Queue[int] = asyncio.Queue()
+        self.running = 0
+
+    async def serve_forever(self) -> None:
+        os.makedirs(self.file_dir, exist_ok=True)
+        os.makedirs(self.job_dir, exist_ok=True)
+        for slot in range(self.capacity):
+            self.slots.put_nowait(slot)
+
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port, limit=STREAM_LIMIT)
+        print(f"Worker listening on {self.host}:{self.port}, capacity {self.capacity}, "
+              f"OPC UA ports {self.base_port}-{self.base_port + self.capacity * self.port_stride - 1}")
+        if self.generated_token:
+            print(f"Worker token: {self.token}")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            message, _ = await read_message(reader)
+            if not hmac.compare_digest(str(message.get("token", "")).encode(), self.token.encode()):
+                raise ProtocolError("Invalid worker token")
+            if message.get("type") == "hello":
+                await send_message(writer, {"type": "info", "capacity": self.capacity, "running": self.running})
+            elif message.get("type") == "run":
+                await self.run_job(message, reader, writer)
+            else:
+                raise ProtocolError(f"Unknown message type '{message.get('type')}'")
+        except ProtocolError as e:
+            logger.error(f"Rejected request: {e}")
+            await send_message(writer, {"type": "error", "message": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.warning(f"Coordinator disconnected: {e}")
+        finally:
+            writer.close()
+
+    ########### Files ###########
+    def cached_file(self, file_hash: str, suffix: str) -> str:
+        # both come from the coordinator, they must not reach outside the file folder
+        if not isinstance(file_hash, str) or not HASH_PATTERN.fullmatch(file_hash):
+            raise ProtocolError(f"Invalid file hash {file_hash!r}")
+        if suffix not in FILE_SUFFIXES:
+            raise ProtocolError(f"Unsupported file type {suffix!r} of {file_hash}, expected one of {list(FILE_SUFFIXES)}")
+        return os.path.join(self.file_dir, f"{file_hash}{suffix}")
+
+    def job_file(self, file_hash: str, files: dict[str, str]) -> str:
+        if file_hash not in files:
+            raise ProtocolError(f"File {file_hash!r} of the experiment was not sent")
+        return self.cached_file(file_hash, files[file_hash])
+
+    async def receive_files(self, files: dict[str, str], reader, writer) -> None:
+        """Asks for the files that are not cached yet and stores them under their hash"""
+        missing = [h for h, suffix in files.items() if not os.path.exists(self.cached_file(h, suffix))]
+        await send_message(writer, {"type": "missing", "hashes": missing})
+        for _ in missing:
+            message, payload = await expect_message(reader, "file")
+            file_hash = message["hash"]
+            if file_hash not in files or content_hash(payload) != file_hash:
+                raise ProtocolError(f"File content does not match its hash {file_hash}")
+            _atomic_write(self.cached_file(file_hash, files[file_hash]), payload)
+
+    def localize(self, config: dict, files: dict[str, str]) -> dict:
+        """Replaces the file hashes of the experiment with the cached files"""
+        config = dict(config)
+        for key in ("fmu_files", "external_servers"):
+            config[key] = [self.job_file(h, files) for h in config.get(key) or []]
+        config["replay"] = {
+            name: {**source, "file": self.job_file(source["file"], files)}
+            for name, source in (config.get("replay") or {}).items()
+        } or None
+        return config
+
+    ########### Jobs ###########
+    async def run_job(self, message: dict, reader, writer) -> None:
+        job_id = message["job_id"]
+        files  = message["files"]
+        await self.receive_files(files, reader, writer)
+
+        slot = await self._wait_for_slot(writer)
+        self.running += 1
+        job_dir = os.path.join(self.job_dir, f"slot_{slot}") # the job id is only used in messages
+        shutil.rmtree(job_dir, ignore_errors=True)
+        os.makedirs(job_dir)
+        try:
+            with open(os.path.join(job_dir, "experiment.yaml"), "w", encoding="utf-8") as file:
+                yaml.safe_dump(self.localize(message["config"], files), file, sort_keys=False)
+
+            port = self.base_port + slot * self.port_stride
+            print(f"Running job {job_id} in slot {slot} (ports from {port})")
+            returncode = await self._run_process(job_dir, port, writer)
+            await send_message(writer, {"type": "result", "job_id": job_id, "returncode": returncode}, self.pack_logs(job_dir))
+            print(f"Finished job {job_id} with return code {returncode}")
+        finally:
+            self.running -= 1
+            self.slots.put_nowait(slot)
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    async def _wait_for_slot(self, writer) -> int:
+        # keeps the coordinator informed while all slots are busy
+        while True:
+            try:
+                return await asyncio.wait_for(self.slots.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                await send_message(writer, {"type": "heartbeat", "state": "queued"})
+
+    async def _run_process(self, job_dir: str, port: int, writer) -> int:
+        with open(os.path.join(job_dir, OUTPUT_LOG), "wb") as output:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "FMUiL.cli", "-d", ".", "run", "experiment.yaml", "--port", str(port),
+                cwd=job_dir, stdout=output, stderr=asyncio.subprocess.STDOUT,
+            )
+            try:
+                while True:
+                    try:
+                        return await asyncio.wait_for(asyncio.shield(process.wait()), HEARTBEAT_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await send_message(writer, {"type": "heartbeat", "state": "running"})
+            finally:
+                # the coordinator went away, it re-dispatches the job elsewhere
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+    def pack_logs(self, job_dir: str) -> bytes:
+        """
+        Zips the experiment log folders of the job and its console output,
+        paths are relative to the run log folder
+        """
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.write(os.path.join(job_dir, OUTPUT_LOG), OUTPUT_LOG)
+            logs = os.path.join(job_dir, "logs")
+            for run_folder in os.listdir(logs) if os.path.isdir(logs) else []:
+                run_path = os.path.join(logs, run_folder)
+                for root, _, file_names in os.walk(run_path):
+                    for file_name in file_names:
+                        if file_name in (RUN_MANIFEST, CHECKPOINT_FILE):
+                            continue
+                        file_path = os.path.join(root, file_name)
+                        archive.write(file_path, os.path.relpath(file_path, run_path))
+        return buffer.getvalue()
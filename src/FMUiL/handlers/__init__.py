@@ -1,5 +1,25 @@
-from .simulation_handler import SimulationHandler, Connection
-from .fmu_handler import FmuHandler
-from .config_handler import ExperimentHandler, ExternalServerHandler
+from FMUiL.utils.lazy import lazy_exports
 
-__all__ = ["FmuHandler", "ExperimentHandler", "ExternalServerHandler", "SimulationHandler", "Connection"]
\ No newline at end of file
+_EXPORTS = {
+    "SimulationHandler":     ".simulation_handler",
+    "Connection":            ".simulation_handler",
+    "FmuHandler":            ".fmu_handler",
+    "EnsembleSlave":         ".fmu_handler",
+    "ReplayHandler":         ".replay_handler",
+    "TraceReader":           ".replay_handler",
+    "ExperimentHandler":     ".config_handler",
+    "ExternalServerHandler": ".config_handler",
+    "ConfigValidator":       ".config_validator",
+    "ModelDescriptionCache": ".config_validator",
+    "CheckpointHandler":     ".checkpoint_handler",
+    "RunManifest":           ".checkpoint_handler",
+    "ExecutionPlan":         ".execution_plan",
+    "StepSizeController":    ".step_controller",
+    "EarlyExitMonitor":      ".early_exit",
+    "MonteCarloRunner":      ".monte_carlo",
+    "MonteCarloStatistics":  ".monte_carlo",
+    "SensitivityAnalysis":   ".sensitivity",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,101 @@
+import base64
+import json
+import os
+import tempfile
+
+CHECKPOINT_FILE    = "checkpoint.json"
+CHECKPOINT_VERSION = 1 # bump when the stored fields change
+RUN_MANIFEST       = "run.json"
+
+def _atomic_write(file_path: str, data: bytes) -> None:
+    """
+    Writes to a temporary file in the same folder and swaps it in place,
+    so a crash never leaves a half written file behind
+    """
+    folder = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _encode_bytes(value):
+    # serialized FMU states are the only binary data of a checkpoint
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Cannot store {type(value).__name__} in a checkpoint")
+
+def _decode_bytes(value: dict):
+    if value.keys() == {"__bytes__"}:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+class CheckpointHandler:
+    """
+    Stores the latest checkpoint of a single experiment as versioned JSON (plain data only):
+    - serialized FMU states and server clocks
+    - coordinator simulation time
+    - byte offsets of the experiment log files
+    - state of the step controller, early exit, history and statistics
+    """
+    def __init__(self, experiment_folder: str) -> None:
+        self.file_path = os.path.join(experiment_folder, CHECKPOINT_FILE)
+
+    def save(self, checkpoint: dict) -> None:
+        data = json.dumps({"version": CHECKPOINT_VERSION, **checkpoint}, default=_encode_bytes)
+        _atomic_write(self.file_path, data.encode("utf-8"))
+
+    def load(self) -> dict | None:
+        if not os.path.exists(self.file_path):
+            return None
+        with open(self.file_path, encoding="utf-8") as file:
+            checkpoint = json.load(file, object_hook=_decode_bytes)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Checkpoint {self.file_path} has version {checkpoint.get('version')}, "
+                f"this version of FMUiL resumes version {CHECKPOINT_VERSION}"
+            )
+        return checkpoint
+
+    def clear(self) -> None:
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+class RunManifest:
+    """
+    Describes a whole run (all experiment files) inside its log folder,
+    used by "fmuil resume" to continue where the run stopped
+    """
+    def __init__(self, log_folder: str) -> None:
+        self.file_path = os.path.join(log_folder, RUN_MANIFEST)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.file_path)
+
+    def create(self, experiment_configs: list[str], base_port: int) -> None:
+        self._write({
+            "experiment_configs": list(experiment_configs),
+            "base_port": base_port,
+            "completed": [],
+        })
+
+    def load(self) -> dict:
+        if not self.exists():
+            raise FileNotFoundError(f"No run manifest found: {self.file_path}")
+        with open(self.file_path) as file:
+            return json.load(file)
+
+    def mark_completed(self, experiment_config: str) -> None:
+        manifest = self.load()
+        if experiment_config not in manifest["completed"]:
+            manifest["completed"].append(experiment_config)
+        self._write(manifest)
+
+    def _write(self, manifest: dict) -> None:
+        _atomic_write(self.file_path, json.dumps(manifest, indent=2).encode("utf-8"))
@@ -3,6 +3,9 @@ from FMUiL.schemas import SimulationConfig, ExternalServerConfig
 from pydantic import ValidationError
 from pathlib import Path
 
+# tokens of a condition "system.variable operator number", the dot is dropped
+CONDITION_PATTERN = r'\d+\.\d+|\d+|[a-zA-Z_][\w]*|[<>!=]=?|==|!=|[^\s\w\.]'
+
 class ExperimentHandler:
     def __init__(self, file_path):
         self.file_path = file_path
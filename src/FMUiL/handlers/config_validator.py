@@ -0,0 +1,267 @@
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from FMUiL.handlers.config_handler import ExperimentHandler, ExternalServerHandler, CONDITION_PATTERN
+from FMUiL.communications.publication import PublicationPolicy
+from FMUiL.utils.hashing import file_hash
+from FMUiL.utils.operations import ops
+
+DEFAULT_MODEL_CACHE = os.path.join(".fmuil_cache", "model_descriptions")
+MODEL_CACHE_FORMAT  = 2 # bump when read() stores other fields
+SERVER_ONLY_VARIABLES = {"timestep"} # nodes of the internal servers, see InternalServerSetup
+
+class ModelDescriptionCache:
+    """
+    Variables of FMU model descriptions, stored as JSON keyed by the FMU file hash.
+    A cached FMU is validated without importing fmpy or reading its archive again.
+    """
+    def __init__(self, root: str = DEFAULT_MODEL_CACHE) -> None:
+        self.root = root
+
+    def load(self, fmu_file: str) -> dict:
+        """model_name, instantiate_once and variables (name → causality, type, variability) of the FMU"""
+        cache_file = os.path.join(self.root, f"{file_hash(fmu_file)}.json")
+        if os.path.exists(cache_file):
+            with open(cache_file) as file:
+                description = json.load(file)
+            if description.get("format") == MODEL_CACHE_FORMAT:
+                return description
+        description = self.read(fmu_file)
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp_")
+        with os.fdopen(fd, "w") as file:
+            json.dump(description, file)
+        os.replace(tmp_path, cache_file)
+        return description
+
+    @staticmethod
+    def read(fmu_file: str) -> dict:
+        import fmpy
+        model_description = fmpy.read_model_description(fmu_file)
+        co_simulation = model_description.coSimulation
+        return {
+            "format": MODEL_CACHE_FORMAT,
+            "model_name": model_description.modelName,
+            "instantiate_once": bool(co_simulation is not None and co_simulation.canBeInstantiatedOnlyOncePerProcess),
+            "variables": {
+                variable.name: {"causality": variable.causality, "type": variable.type, "variability": variable.variability}
+                for variable in model_description.modelVariables
+            },
+        }
+
+@dataclass
+class SystemDescription:
+    """Variables of a system as the coordinator sees them, None when they are only known at runtime"""
+    kind:      str                # "fmu", "external" or "replay"
+    readable:  set[str] | None
+    settable:  set[str] | None
+    outputs:   set[str] = field(default_factory=set)
+    fixed:     set[str] = field(default_factory=set) # parameters that cannot change after initialization
+    instances: int = 1
+
+class ConfigValidator:
+    """
+    Checks experiment configs without starting servers, instantiating FMUs or
+    connecting to external servers: the schema, the FMU, external server and replay
+    files and every reference to a system variable (system_loop, logging, evaluation,
+    start_evaluating_conditions, initial_system_state, ensemble, publish, deadbands,
+    monte_carlo, performance, sensitivity and early_exit) against the model descriptions.
+    """
+    def __init__(self, model_cache: ModelDescriptionCache | None = None) -> None:
+        self.model_cache = model_cache or ModelDescriptionCache()
+
+    def validate(self, experiment_file: str) -> list[str]:
+        """Problems found in the experiment, empty if it is valid"""
+        try:
+            config = ExperimentHandler(experiment_file).dump_dict()
+        except (FileNotFoundError, ValueError) as e:
+            return [str(e)]
+        problems: list[str] = []
+        systems = self._systems(config, problems)
+        self._check_references(config["experiment"], systems, problems)
+        return problems
+
+    ########### Systems ###########
+    def _systems(self, config: dict, problems: list[str]) -> dict[str, SystemDescription]:
+        experiment = config["experiment"]
+        ensemble = experiment.get("ensemble") or {}
+        systems: dict[str, SystemDescription] = {}
+
+        def add(name: str, system: SystemDescription, source: str) -> None:
+            if name in systems:
+                problems.append(f"System name '{name}' of {source} is used more than once")
+            systems[name] = system
+
+        for fmu_file in config["fmu_files"]:
+            if not os.path.isfile(fmu_file):
+                problems.append(f"FMU file not found: {fmu_file}")
+                continue
+            try:
+                description = self.model_cache.load(fmu_file)
+            except Exception as e:
+                problems.append(f"Cannot read the model description of {fmu_file}: {e}")
+                continue
+            variables = description["variables"]
+            name = description["model_name"]
+            instances = ensemble.get(name, 1)
+            if instances > 1 and description["instantiate_once"]:
+                problems.append(f"FMU {name} can be instantiated only once per process, it cannot run as an ensemble")
+
+            def by_causality(*causalities: str) -> set[str]:
+                return {variable for variable, info in variables.items() if info["causality"] in causalities}
+
+            add(name, SystemDescription(
+                kind      = "fmu",
+                readable  = by_causality("input", "output", "parameter") | SERVER_ONLY_VARIABLES,
+                settable  = by_causality("input", "parameter"),
+                outputs   = by_causality("output"),
+                fixed     = {variable for variable in by_causality("parameter") if variables[variable]["variability"] == "fixed"},
+                instances = instances,
+            ), fmu_file)
+
+        for server_file in config.get("external_servers") or []:
+            try:
+                server = ExternalServerHandler(server_file).dump_dict()
+            except (FileNotFoundError, ValueError) as e:
+                problems.append(str(e))
+                continue
+            variables = set()
+            for obj, object_variables in server["objects"].items():
+                for variable, node in object_variables.items():
+                    if node.get("name") is None and (node.get("id") is None or node.get("ns") is None):
+                        problems.append(f"Variable {variable} of object {obj} in {server_file} needs a name or an id and ns")
+                    variables.add(variable)
+            add(Path(server_file).stem, SystemDescription(kind="external", readable=variables, settable=variables), server_file)
+
+        for name, source in (config.get("replay") or {}).items():
+            if not os.path.isfile(source["file"]):
+                problems.append(f"Replayed log of '{name}' not found: {source['file']}")
+            # without a variables list the recorded variables are only known after reading the log
+            variables = set(source["variables"]) | SERVER_ONLY_VARIABLES if source.get("variables") else None
+            add(name, SystemDescription(kind="replay", readable=variables, settable=set()), "replay")
+
+        for name in ensemble:
+            if name in systems and systems[name].kind != "fmu":
+                problems.append(f"ensemble: '{name}' is not an FMU")
+            elif name not in systems:
+                problems.append(f"ensemble: unknown FMU '{name}'")
+        return systems
+
+    ########### References ###########
+    @staticmethod
+    def _reference(endpoint: str, systems: dict[str, SystemDescription], problems: list[str], where: str,
+                   settable: bool = False) -> SystemDescription | None:
+        """The system of a "system.variable" reference, None (and a problem) if it cannot be resolved"""
+        system_name, _, variable = endpoint.partition(".")
+        if not system_name or not variable:
+            problems.append(f"{where}: '{endpoint}' is not a 'system.variable' reference")
+            return None
+        system = systems.get(system_name)
+        if system is None:
+            problems.append(f"{where}: unknown system '{system_name}' in '{endpoint}'")
+            return None
+        known = system.settable if settable else system.readable
+        if known is not None and variable not in known:
+            if settable and system.readable is not None and variable in system.readable:
+                problems.append(f"{where}: {endpoint} is not an input or parameter")
+            else:
+                problems.append(f"{where}: {system.kind} '{system_name}' has no variable '{variable}'")
+            return None
+        return system
+
+    def _check_references(self, experiment: dict, systems: dict[str, SystemDescription], problems: list[str]) -> None:
+        for edge in experiment.get("system_loop") or []:
+            source = self._reference(edge["from"], systems, problems, "system_loop from")
+            target = self._reference(edge["to"], systems, problems, "system_loop to", settable=True)
+            if source is not None and target is not None and source.instances > 1 and source.instances != target.instances:
+                problems.append(
+                    f"system_loop: ensemble output {edge['from']} can only be connected to an ensemble "
+                    f"with the same number of instances ({source.instances})"
+                )
+
+        logged = set(experiment.get("logging") or [])
+        for endpoint in experiment.get("logging") or []:
+            self._reference(endpoint, systems, problems, "logging")
+
+        conditions = {f"start_evaluating_conditions {name}": condition
+                      for name, condition in (experiment.get("start_evaluating_conditions") or {}).items()}
+        conditions.update({f"evaluation {name}": criterion["condition"]
+                           for name, criterion in (experiment.get("evaluation") or {}).items()})
+        for where, condition in conditions.items():
+            tokens = re.findall(CONDITION_PATTERN, condition)
+            if len(tokens) != 4:
+                problems.append(f"{where}: '{condition}' does not match 'system.variable operator number'")
+                continue
+            system_name, variable, operator, value = tokens
+            if operator not in ops:
+                problems.append(f"{where}: unsupported operator '{operator}', use one of {list(ops)}")
+            try:
+                float(value)
+            except ValueError:
+                problems.append(f"{where}: '{value}' is not a number")
+            self._reference(f"{system_name}.{variable}", systems, problems, where)
+
+        for system_name, state in (experiment.get("initial_system_state") or {}).items():
+            if system_name not in systems:
+                problems.append(f"initial_system_state: unknown system '{system_name}'")
+                continue
+            if systems[system_name].kind == "external":
+                problems.append(f"initial_system_state: '{system_name}' is an external server, only FMUs and replayed systems take initial values")
+                continue
+            for variable, value in state.items():
+                if variable in SERVER_ONLY_VARIABLES:
+                    continue
+                if self._reference(f"{system_name}.{variable}", systems, problems, "initial_system_state", settable=True) is None:
+                    continue
+                instances = systems[system_name].instances
+                if isinstance(value, list) and len(value) != instances:
+                    problems.append(f"initial_system_state: {system_name}.{variable} has {len(value)} values for {instances} instance(s)")
+
+        for system_name, variables in (experiment.get("publish") or {}).items():
+            if systems.get(system_name) is None or systems[system_name].kind != "fmu":
+                problems.append(f"publish: '{system_name}' is not an FMU")
+            elif variables != "all":
+                for variable in variables:
+                    self._reference(f"{system_name}.{variable}", systems, problems, "publish")
+
+        referenced = PublicationPolicy.from_experiment_config({"experiment": experiment}).referenced
+        for key in experiment.get("deadbands") or {}:
+            system_name, _, variable = key.partition(".")
+            system = systems.get(system_name)
+            if system is None or system.kind != "fmu":
+                problems.append(f"deadbands: '{system_name}' is not an FMU")
+            elif variable and variable not in system.outputs:
+                problems.append(f"deadbands: {key} is not an output")
+            elif variable in referenced.get(system_name, ()):
+                problems.append(f"deadbands: {key} is read by the experiment, its published values stay exact")
+
+        for parameter in ((experiment.get("monte_carlo") or {}).get("parameters") or {}):
+            self._reference(parameter, systems, problems, "monte_carlo parameters", settable=True)
+
+        for variable, settings in (experiment.get("performance") or {}).items():
+            if variable not in logged:
+                problems.append(f"performance: {variable} must be logged")
+            if isinstance(settings["setpoint"], str) and settings["setpoint"] not in logged:
+                problems.append(f"performance: setpoint {settings['setpoint']} of {variable} must be logged")
+
+        for system_name, settings in (experiment.get("sensitivity") or {}).items():
+            system = systems.get(system_name)
+            if system is None or system.kind != "fmu":
+                problems.append(f"sensitivity: '{system_name}' is not an FMU")
+                continue
+            for output in settings["outputs"]:
+                if output not in system.outputs:
+                    problems.append(f"sensitivity: {system_name}.{output} is not an output")
+            for variable in settings["with_respect_to"]:
+                self._reference(f"{system_name}.{variable}", systems, problems, "sensitivity with_respect_to", settable=True)
+                if variable in system.fixed:
+                    problems.append(f"sensitivity: {system_name}.{variable} is a fixed parameter, it cannot be perturbed")
+
+        steady_state = (experiment.get("early_exit") or {}).get("steady_state") or {}
+        for signal in steady_state.get("signals") or []:
+            if signal not in logged:
+                problems.append(f"early_exit: steady_state signal {signal} must be logged")
@@ -0,0 +1,64 @@
+import numpy as np
+
+class EarlyExitMonitor:
+    """
+    Stops an experiment before stop_time once its outcome is fixed. Rules (all optional):
+    - on_first_failure: stop when any evaluation criterion fails
+    - all_passed_for:   stop when every criterion has passed for this many seconds
+    - steady_state:     stop when the monitored signals stay within band for window seconds,
+                        judged on the TrajectoryHistory of the logged variables
+    The first rule that triggers gives the stop reason.
+    """
+    def __init__(self, on_first_failure: bool = False, all_passed_for: float | None = None,
+                 steady_state: dict | None = None) -> None:
+        self.on_first_failure = on_first_failure
+        self.all_passed_for   = all_passed_for
+        self.band    = steady_state["band"] if steady_state else None
+        self.window  = steady_state["window"] if steady_state else None
+        self.signals = steady_state.get("signals") if steady_state else None # None monitors every logged variable
+        self.columns: list[str] = [] # history columns of the monitored signals, see Probe.columns
+        self.passed_since = None # time since all criteria have passed
+        self.reason = None
+
+    @property
+    def monitors_signals(self) -> bool:
+        return self.band is not None
+
+    def record_results(self, results: list[bool] | None, time: float) -> None:
+        """Takes the criteria results of the step, None when the criteria were not evaluated"""
+        if not results:
+            self.passed_since = None
+            return
+        if self.on_first_failure and not all(results):
+            self.reason = "first_failure"
+        elif all(results):
+            if self.passed_since is None:
+                self.passed_since = time
+        else:
+            self.passed_since = None
+
+    def settled(self, history, time: float) -> bool:
+        """The monitored signals stayed within band for the last window seconds of the history"""
+        if not self.columns:
+            return False
+        for column in self.columns:
+            _, values = history.since(column, time - self.window)
+            if not len(values) or np.isnan(values).any() or values.max() - values.min() > self.band:
+                return False
+        return True
+
+    def check(self, time: float, history=None) -> str | None:
+        """Returns the stop reason once a rule has triggered, steady_state needs the history"""
+        if self.reason is None and self.all_passed_for is not None and self.passed_since is not None:
+            if time - self.passed_since >= self.all_passed_for:
+                self.reason = "all_passed"
+        if self.reason is None and self.monitors_signals and history is not None and self.settled(history, time):
+            self.reason = "steady_state"
+        return self.reason
+
+    def get_state(self) -> dict:
+        return {"passed_since": self.passed_since, "reason": self.reason}
+
+    def set_state(self, state: dict) -> None:
+        self.passed_since = state["passed_since"]
+        self.reason       = state["reason"]
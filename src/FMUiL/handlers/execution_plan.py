@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from FMUiL.utils import ops
+
+from asyncua import ua
+from asyncua.common.node import Node
+
+# methods of the internal server objects, see InternalServerSetup.setup_standard_methods
+SERVER_OBJECT  = ua.NodeId(1, 1)
+SIMULATE_METHOD = ua.NodeId(1, 2)
+UPDATE_METHOD   = ua.NodeId(1, 3)
+RESET_METHOD    = ua.NodeId(1, 4)
+UPDATE_BULK_METHOD = ua.NodeId(1, 5)
+PUBLISH_METHOD  = ua.NodeId(1, 6)
+
+class StepCommand:
+    """Simulate call of a single internal server"""
+    __slots__ = ("server_name", "object_node")
+
+    def __init__(self, server_name: str, object_node: Node) -> None:
+        self.server_name = server_name
+        self.object_node = object_node
+
+class Transfer:
+    """A resolved connection to an external server: source node → target node"""
+    __slots__ = ("source_node", "target_name", "target_var", "target_node", "variant_types")
+
+    def __init__(self, source_node: Node, target_name: str, target_var: str, target_node: Node, variant_types: dict) -> None:
+        self.source_node   = source_node
+        self.target_name   = target_name
+        self.target_var    = target_var
+        self.target_node   = target_node
+        self.variant_types = variant_types # shared cache of the external client
+
+class BulkUpdate:
+    """All connections into one internal server, applied with a single update_bulk call per step"""
+    __slots__ = ("server_name", "server", "object_node", "source_nodes", "variables", "layout")
+
+    def __init__(self, server_name: str, server, object_node: Node) -> None:
+        self.server_name  = server_name
+        self.server       = server # InternalServerSetup, builds the update_bulk arguments
+        self.object_node  = object_node
+        self.source_nodes: list[Node] = []
+        self.variables:    list[str]  = []
+        self.layout       = None # see InternalServerSetup.bulk_layout
+
+class Probe:
+    """A logged variable, width is the number of values (instances of an ensemble)"""
+    __slots__ = ("system", "variable", "node", "width")
+
+    def __init__(self, system: str, variable: str, node: Node, width: int = 1) -> None:
+        self.system   = system
+        self.variable = variable
+        self.node     = node
+        self.width    = width
+
+    @property
+    def columns(self) -> list[str]:
+        """Names of the values, ensemble instances are System[i].variable"""
+        if self.width == 1:
+            return [f"{self.system}.{self.variable}"]
+        return [f"{self.system}[{instance}].{self.variable}" for instance in range(self.width)]
+
+class Comparison:
+    """A parsed reading condition or evaluation criterion with a pre-bound operator"""
+    __slots__ = ("name", "node", "compare", "value", "watched")
+
+    def __init__(self, name: str, node: Node, compare, value: float, watched: int | None = None) -> None:
+        self.name    = name
+        self.node    = node
+        self.compare = compare
+        self.value   = value
+        self.watched = watched # position in ExecutionPlan.watched, None when the variable is logged
+
+class ExecutionPlan:
+    """
+    Everything the step loop needs, resolved once after the clients are created:
+    nodes are created and bound to their clients, operators are looked up
+    and disabled criteria are dropped, so every step only iterates flat lists.
+    """
+    __slots__ = ("steps", "run_ahead", "updates", "transfers", "probes", "watched", "conditions", "criteria")
+
+    def __init__(self) -> None:
+        self.steps:      list[StepCommand] = []
+        self.run_ahead:  list              = [] # free-running InternalServerSetups, advanced in-process
+        self.updates:    list[BulkUpdate]  = []
+        self.transfers:  list[Transfer]    = []
+        self.probes:     list[Probe]       = []
+        self.watched:    list[Probe]       = [] # evaluated but not logged, kept in the history
+        self.conditions: list[Comparison]  = []
+        self.criteria:   list[Comparison]  = []
+
+    @classmethod
+    def build(cls, system: "SimulationHandler") -> "ExecutionPlan":
+        self = cls()
+        clients      = system.client_obj
+        node_ids     = system.system_node_ids
+        internal     = system.server_obj.internal_servers
+
+        def node(client_name: str, variable: str) -> Node:
+            return clients.get_client(client_name=client_name).get_node(node_ids[client_name][variable])
+
+        def width(system: str) -> int:
+            return internal[system].instances if system in internal else 1
+
+        for server_name, client in clients.internal_clients.items():
+            if server_name in system.free_running:
+                self.run_ahead.append(internal[server_name])
+            else:
+                self.steps.append(StepCommand(server_name, client.get_node(SERVER_OBJECT)))
+
+        updates: dict[str, BulkUpdate] = {}
+        for connection in system.connections:
+            if connection in system.direct_routes:
+                continue # exchanged by the servers over the signal bus
+            if width(connection.from_fmu) > 1 and width(connection.from_fmu) != width(connection.to_fmu):
+                raise ValueError(
+                    f"Ensemble output {connection.from_fmu}.{connection.from_var} can only be connected to an ensemble "
+                    f"with the same number of instances ({width(connection.from_fmu)})"
+                )
+            source_node = node(connection.from_fmu, connection.from_var)
+            if connection.to_fmu in internal:
+                if connection.to_fmu not in updates:
+                    object_node = clients.internal_clients[connection.to_fmu].get_node(SERVER_OBJECT)
+                    updates[connection.to_fmu] = BulkUpdate(connection.to_fmu, internal[connection.to_fmu], object_node)
+                updates[connection.to_fmu].source_nodes.append(source_node)
+                updates[connection.to_fmu].variables.append(connection.to_var)
+            else:
+                self.transfers.append(Transfer(
+                    source_node   = source_node,
+                    target_name   = connection.to_fmu,
+                    target_var    = connection.to_var,
+                    target_node   = node(connection.to_fmu, connection.to_var),
+                    variant_types = clients.variant_types[connection.to_fmu],
+                ))
+        for server_name, update in updates.items():
+            update.layout = internal[server_name].bulk_layout(update.variables)
+            self.updates.append(update)
+
+        for fmu, var in system.experimentLogger.logged_values:
+            self.probes.append(Probe(fmu, var, node(fmu, var), width(fmu)))
+
+        # evaluated variables that are not logged, their values are taken from the comparisons
+        logged  = {(probe.system, probe.variable) for probe in self.probes}
+        watched = {}
+        def comparison(name: str, parsed: dict) -> Comparison:
+            key = (parsed["target_obj"], parsed["target_var"])
+            if key not in logged and key not in watched:
+                watched[key] = len(self.watched)
+                self.watched.append(Probe(*key, node(*key), width(key[0])))
+            return cls._comparison(name, parsed, node, watched.get(key))
+
+        for name, condition in system.reading_condition_dict.items():
+            self.conditions.append(comparison(name, condition))
+
+        for name, criterion in system.evaluation_equation_dic.items():
+            if criterion.get("enabled", True):
+                self.criteria.append(comparison(name, criterion))
+
+        return self
+
+    @property
+    def history_columns(self) -> list[str]:
+        """Columns of the TrajectoryHistory: the logged variables, then the watched ones"""
+        return [column for probe in (*self.probes, *self.watched) for column in probe.columns]
+
+    @staticmethod
+    def _comparison(name: str, parsed: dict, node, watched: int | None = None) -> Comparison:
+        return Comparison(
+            name    = name,
+            node    = node(parsed["target_obj"], parsed["target_var"]),
+            compare = ops[parsed["operator"]],
+            value   = parsed["value"],
+            watched = watched,
+        )
@@ -1,18 +1,105 @@
 import fmpy
 import logging
+import pickle
+import shutil
+from functools import cached_property
+
+import numpy as np
 
 _logger = logging.getLogger(__name__)
 
+class EnsembleSlave:
+    """
+    Several instances of one FMU behind the interface of fmpy's FMU2Slave.
+    Every call is applied to all instances, values are (variables, instances) arrays:
+    getReal returns one row of instance values per value reference and setReal takes
+    per variable either one value for all instances or one value per instance.
+    """
+    def __init__(self, instances: list) -> None:
+        self.instances = instances
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def _each(self, method: str, *args, **kwargs) -> list:
+        return [getattr(instance, method)(*args, **kwargs) for instance in self.instances]
+
+    def doStep(self, currentCommunicationPoint, communicationStepSize, **kwargs) -> None:
+        self._each("doStep", currentCommunicationPoint=currentCommunicationPoint,
+                   communicationStepSize=communicationStepSize, **kwargs)
+
+    def getReal(self, value_references) -> np.ndarray:
+        return np.array(self._each("getReal", value_references), dtype=float).reshape(len(self), -1).T
+
+    def getInteger(self, value_references) -> np.ndarray:
+        return np.array(self._each("getInteger", value_references), dtype=int).reshape(len(self), -1).T
+
+    def getBoolean(self, value_references) -> np.ndarray:
+        return np.array(self._each("getBoolean", value_references), dtype=bool).reshape(len(self), -1).T
+
+    def getDirectionalDerivative(self, vUnknown_ref, vKnown_ref, dvKnown) -> np.ndarray:
+        return np.array(self._each("getDirectionalDerivative", vUnknown_ref, vKnown_ref, dvKnown), dtype=float).reshape(len(self), -1).T
+
+    def _columns(self, values) -> np.ndarray:
+        # (instances, variables), scalars are applied to every instance
+        return np.array([np.broadcast_to(np.asarray(value, dtype=float), (len(self),)) for value in values]).reshape(-1, len(self)).T
+
+    def setReal(self, value_references, values) -> None:
+        for instance, column in zip(self.instances, self._columns(values)):
+            instance.setReal(value_references, [float(v) for v in column])
+
+    def setInteger(self, value_references, values) -> None:
+        for instance, column in zip(self.instances, self._columns(values)):
+            instance.setInteger(value_references, [int(round(v)) for v in column])
+
+    def setBoolean(self, value_references, values) -> None:
+        for instance, column in zip(self.instances, self._columns(values)):
+            instance.setBoolean(value_references, [bool(v) for v in column])
+
+    def instantiate(self, *args, **kwargs) -> None:     self._each("instantiate", *args, **kwargs)
+    def setupExperiment(self, *args, **kwargs) -> None: self._each("setupExperiment", *args, **kwargs)
+    def enterInitializationMode(self) -> None:          self._each("enterInitializationMode")
+    def exitInitializationMode(self) -> None:           self._each("exitInitializationMode")
+    def reset(self) -> None:        self._each("reset")
+    def terminate(self) -> None:    self._each("terminate")
+    def freeInstance(self) -> None: self._each("freeInstance")
+
+    # one state per instance
+    def getFMUstate(self) -> list:
+        return self._each("getFMUstate")
+
+    def setFMUstate(self, states: list) -> None:
+        for instance, state in zip(self.instances, states):
+            instance.setFMUstate(state)
+
+    def freeFMUstate(self, states: list) -> None:
+        for instance, state in zip(self.instances, states):
+            instance.freeFMUstate(state)
+
+    def serializeFMUstate(self, states: list) -> bytes:
+        return pickle.dumps([bytes(instance.serializeFMUstate(state)) for instance, state in zip(self.instances, states)])
+
+    def deSerializeFMUstate(self, data: bytes) -> list:
+        return [instance.deSerializeFMUstate(state) for instance, state in zip(self.instances, pickle.loads(data))]
+
 class FmuHandler:
-    def __init__(self, fmu_file) -> None:
-        
+    def __init__(self, fmu_file, ensemble: dict[str, int] | None = None) -> None:
+        """ensemble: number of instances by model name, one instance if the FMU is not listed"""
         self.model_description = fmpy.read_model_description(fmu_file)  
         self.fmu_name = self.model_description.modelName
+        self.instances = (ensemble or {}).get(self.fmu_name, 1)
+        if self.instances > 1 and self.model_description.coSimulation.canBeInstantiatedOnlyOncePerProcess:
+            raise ValueError(f"FMU {self.fmu_name} can be instantiated only once per process, it cannot run as an ensemble")
+        # the instances share the extracted files and the loaded binary
         self.unzipdir = fmpy.extract(fmu_file)
-        self.fmu = fmpy.fmi2.FMU2Slave(guid=self.model_description.guid,
+        slaves = [
+            fmpy.fmi2.FMU2Slave(guid=self.model_description.guid,
                         unzipDirectory=self.unzipdir,
                         modelIdentifier=self.model_description.coSimulation.modelIdentifier,
-                        instanceName='instance1')
+                        instanceName=f'instance{number}')
+            for number in range(1, self.instances + 1)
+        ]
+        self.fmu = slaves[0] if self.instances == 1 else EnsembleSlave(slaves)
 
         self.fmu.instantiate()
         self.fmu.setupExperiment(startTime=0.0)
@@ -39,7 +126,8 @@ class FmuHandler:
     def _add_parameter(self, variable:fmpy.model_description.ScalarVariable) -> None:
         self.fmu_parameters[variable.name] = {
                 "id" : variable.valueReference,
-                "type" : variable.type
+                "type" : variable.type,
+                "variability" : variable.variability # "fixed" parameters cannot change after initialization
             }
             
     def locate_variable_names(self) -> None:
@@ -60,6 +148,32 @@ class FmuHandler:
                 
         _logger.info(f"inp = {self.fmu_inputs}, \nout = {self.fmu_outputs}, \npar = {self.fmu_parameters}")
 
+    def close(self) -> None:
+        """Frees the FMU instances and removes the extracted files"""
+        try:
+            self.fmu.terminate()
+            self.fmu.freeInstance()
+        except Exception as e:
+            _logger.warning(f"Could not free FMU {self.fmu_name}: {e}")
+        shutil.rmtree(self.unzipdir, ignore_errors=True)
+
+    @cached_property
+    def settable_names(self) -> dict[str, dict[int, list[str]]]:
+        """
+        Names of the inputs and parameters by FMI type and value reference
+        (value references are only unique within a type, aliases share one)
+        """
+        names = {"Real": {}, "Integer": {}, "Boolean": {}}
+        for name, variable in {**self.fmu_parameters, **self.fmu_inputs}.items():
+            fmi_type = "Integer" if variable["type"] == "Enumeration" else variable["type"]
+            if fmi_type in names:
+                names[fmi_type].setdefault(variable["id"], []).append(name)
+        return names
+
+    @cached_property
+    def fmu_variables(self) -> dict:
+        return {**self.fmu_parameters, **self.fmu_inputs, **self.fmu_outputs}
+
     def get_fmu_inputs(self) -> list[str]:
         return list(self.fmu_inputs.keys())
     
@@ -0,0 +1,365 @@
+import asyncio
+import copy
+import csv
+import json
+import logging
+import math
+import multiprocessing
+import multiprocessing.util
+import os
+import shutil
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FILE = "MonteCarlo.csv"
+SUMMARY_FILE = "MonteCarloSummary.json"
+
+def draw_samples(parameters: dict, realizations: int, seed: int | None = None) -> list[dict[str, float]]:
+    """
+    Values of every realization, drawn up front so a seed gives the same
+    samples whatever the number of processes
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, spec in parameters.items():
+        distribution = spec["distribution"]
+        if distribution == "normal":
+            columns[name] = rng.normal(spec["mean"], spec["std"], realizations)
+        elif distribution == "lognormal":
+            columns[name] = rng.lognormal(spec["mean"], spec["std"], realizations)
+        elif distribution == "uniform":
+            columns[name] = rng.uniform(spec["low"], spec["high"], realizations)
+        elif distribution == "triangular":
+            columns[name] = rng.triangular(spec["low"], spec["mode"], spec["high"], realizations)
+        else:
+            columns[name] = rng.choice(spec["values"], realizations)
+    return [{name: float(column[index]) for name, column in columns.items()} for index in range(realizations)]
+
+class OutcomeCollector:
+    """Outcome of every evaluation criterion over one realization"""
+    def __init__(self) -> None:
+        self.criteria: dict[str, dict] = {}
+
+    def record(self, name: str, measured_value, passed: bool) -> None:
+        if isinstance(measured_value, list):
+            # ensemble, every instance is a criterion of its own
+            for instance, (value, result) in enumerate(zip(measured_value, passed)):
+                self.record(f"{name}[{instance}]", value, result)
+            return
+        value = float(measured_value)
+        entry = self.criteria.get(name)
+        if entry is None:
+            self.criteria[name] = {"passed": bool(passed), "final": value, "min": value, "max": value}
+            return
+        entry["passed"] = entry["passed"] and bool(passed)
+        entry["final"]  = value
+        entry["min"]    = min(entry["min"], value)
+        entry["max"]    = max(entry["max"], value)
+
+    @property
+    def passed(self) -> bool:
+        # criteria that were never evaluated do not fail the realization
+        return all(entry["passed"] for entry in self.criteria.values())
+
+class MonteCarloStatistics:
+    """
+    Aggregates the realization outcomes as they arrive:
+    - pass rate of the realizations and of every criterion, with Wilson score intervals
+    - mean (with a normal confidence interval) and percentiles of the final,
+      smallest and largest measured value of every criterion
+    """
+    def __init__(self, criteria: list[str], confidence: float = 0.95, percentiles: list[float] = (5.0, 50.0, 95.0)) -> None:
+        self.confidence  = confidence
+        self.percentiles = list(percentiles)
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.realizations = 0
+        self.passed = 0
+        self.errors = 0
+        self.stop_reasons = Counter()
+        self.criteria = {name: self._empty() for name in criteria}
+
+    @staticmethod
+    def _empty() -> dict:
+        return {"evaluated": 0, "passed": 0, "final": [], "min": [], "max": []}
+
+    def add(self, outcome: dict) -> None:
+        self.realizations += 1
+        if "error" in outcome:
+            self.errors += 1
+            return
+        self.passed += outcome["passed"]
+        self.stop_reasons[outcome["stop_reason"]] += 1
+        for name, result in outcome["criteria"].items():
+            stats = self.criteria.setdefault(name, self._empty())
+            stats["evaluated"] += 1
+            stats["passed"]    += result["passed"]
+            for key in ("final", "min", "max"):
+                stats[key].append(result[key])
+
+    def interval(self, successes: int, trials: int) -> list[float]:
+        """Wilson score interval of a proportion"""
+        if not trials:
+            return [float("nan"), float("nan")]
+        rate = successes / trials
+        denominator = 1 + self.z ** 2 / trials
+        center = (rate + self.z ** 2 / (2 * trials)) / denominator
+        half = self.z * math.sqrt(rate * (1 - rate) / trials + self.z ** 2 / (4 * trials ** 2)) / denominator
+        return [max(center - half, 0.0), min(center + half, 1.0)]
+
+    def rate(self, successes: int, trials: int) -> dict:
+        return {"value": successes / trials if trials else float("nan"), "interval": self.interval(successes, trials)}
+
+    def describe(self, values: list[float]) -> dict:
+        if not values:
+            return {}
+        values = np.asarray(values, dtype=float)
+        mean = float(values.mean())
+        std  = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+        half = self.z * std / math.sqrt(len(values))
+        return {
+            "mean": mean,
+            "std": std,
+            "mean_interval": [mean - half, mean + half],
+            "percentiles": {f"p{p:g}": float(v) for p, v in zip(self.percentiles, np.percentile(values, self.percentiles))},
+        }
+
+    def summary(self) -> dict:
+        completed = self.realizations - self.errors
+        return {
+            "realizations": self.realizations,
+            "completed": completed,
+            "errors": self.errors,
+            "confidence": self.confidence,
+            "pass_rate": self.rate(self.passed, completed),
+            "stop_reasons": dict(self.stop_reasons),
+            "criteria": {
+                name: {
+                    "evaluated": stats["evaluated"],
+                    "pass_rate": self.rate(stats["passed"], stats["evaluated"]),
+                    **{key: self.describe(stats[key]) for key in ("final", "min", "max")},
+                }
+                for name, stats in self.criteria.items()
+            },
+        }
+
+class RealizationWorker:
+    """
+    Runs the realizations of one pool process on warm servers: the OPC UA servers and
+    clients of the experiment are created once, every realization resets the FMUs and
+    applies its sample on top of the initial system state.
+    """
+    def __init__(self, experiment_file: str, base_port: int, log_folder: str, slot: int, keep_logs: bool) -> None:
+        self.experiment_file = experiment_file
+        self.base_port  = base_port
+        self.log_folder = log_folder
+        self.slot       = slot
+        self.keep_logs  = keep_logs
+        self.handler    = None
+        self.name          = None
+        self.initial_state = None
+
+    async def start(self) -> None:
+        from FMUiL.communications import server_manager, client_manager
+        from FMUiL.handlers.simulation_handler import SimulationHandler
+
+        handler = SimulationHandler([self.experiment_file], self.base_port, log_folder=self.log_folder, force=True)
+        await handler.initialize_experiment_params(self.experiment_file)
+        handler.checkpoint_interval = None
+        self.name = handler.experiment_name
+        self.initial_state = copy.deepcopy(handler.experiment["initial_system_state"])
+        if not self.keep_logs:
+            self._use_logs(handler, f"worker_{self.slot}") # scratch logs, emptied for every realization
+
+        handler.server_obj = await server_manager.create(experiment_config=handler.config, port=self.base_port)
+        handler.gather_system_ids()
+        handler.client_obj = await client_manager.create(internal_servers = handler.server_obj.internal_servers,
+                                                         external_servers = handler.server_obj.remote_servers,
+                                                         node_ids         = handler.system_node_ids,
+                                                         connection_pool  = handler.connection_pool)
+        self.handler = handler
+
+    @staticmethod
+    def _use_logs(handler, name: str) -> None:
+        from FMUiL.logger import ExperimentLogger
+        handler.experiment["experiment_name"] = name
+        handler.experiment_name  = name
+        handler.experimentLogger = ExperimentLogger(system=handler)
+
+    async def run(self, index: int, sample: dict[str, float]) -> dict:
+        handler = self.handler
+        state = copy.deepcopy(self.initial_state)
+        for key, value in sample.items():
+            fmu, variable = key.split(".", maxsplit=1)
+            state[fmu][variable] = value
+        handler.experiment["initial_system_state"] = state
+
+        if self.keep_logs:
+            self._use_logs(handler, f"{self.name}_{index:05d}")
+        else:
+            handler.experimentLogger.truncate()
+
+        handler.outcomes = OutcomeCollector()
+        try:
+            await handler.run_experiment()
+        finally:
+            handler.close_signal_bus()
+        return {
+            "realization": index,
+            "sample": sample,
+            "passed": handler.outcomes.passed,
+            "stop_reason": handler.stop_reason,
+            "stop_time": handler.simulation_time,
+            "criteria": handler.outcomes.criteria,
+        }
+
+    async def close(self) -> None:
+        """Disconnects the clients, stops the servers and frees the FMUs"""
+        handler, self.handler = self.handler, None
+        if handler is None:
+            return
+        await handler.client_obj.close()
+        await handler.server_obj.close()
+        await handler.connection_pool.close()
+
+# state of a pool process, the servers stay up between batches
+_loop   = None
+_worker = None
+
+def _start_worker(experiment_file: str, base_port: int, port_stride: int, log_folder: str, keep_logs: bool, slots) -> None:
+    global _loop, _worker
+    sys.stdout = open(os.devnull, "w") # the progress of the realizations is reported by the runner
+    slot = slots.get()
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    _worker = RealizationWorker(experiment_file, base_port + slot * port_stride, log_folder, slot, keep_logs)
+    # runs when the pool shuts the process down, before the interpreter exits
+    multiprocessing.util.Finalize(None, _stop_worker, exitpriority=10)
+    _loop.run_until_complete(_worker.start())
+
+def _stop_worker() -> None:
+    global _loop, _worker
+    try:
+        if _worker is not None:
+            _loop.run_until_complete(_worker.close())
+    except Exception as e:
+        logger.error(f"Stopping the realization worker failed: {e}")
+    finally:
+        _loop.close()
+        _loop = _worker = None
+
+def _run_batch(batch: list[tuple[int, dict]]) -> list[dict]:
+    outcomes = []
+    for index, sample in batch:
+        try:
+            outcomes.append(_loop.run_until_complete(_worker.run(index, sample)))
+        except Exception as e:
+            logger.error(f"Realization {index} failed: {e}")
+            outcomes.append({"realization": index, "sample": sample, "error": repr(e)})
+    return outcomes
+
+class MonteCarloRunner:
+    """
+    Runs the realizations of an experiment with a monte_carlo section on a pool of
+    processes, each with its own servers on base_port + slot * port_stride.
+    The outcomes are streamed into MonteCarlo.csv (one row per realization) as the
+    batches finish and aggregated into MonteCarloSummary.json.
+    """
+    port_stride = 100 # OPC UA ports reserved for every process
+    batches_per_worker = 4 # smaller batches report progress more often
+
+    def __init__(self, experiment_file: str, experiment: dict, criteria: list[str], experiment_folder: str, base_port: int) -> None:
+        self.experiment_file   = experiment_file
+        self.settings          = experiment["monte_carlo"]
+        self.criteria          = criteria
+        self.experiment_folder = experiment_folder
+        self.base_port         = base_port
+        self.parameters        = list(self.settings["parameters"])
+        self.statistics = MonteCarloStatistics(criteria, self.settings["confidence"], self.settings["percentiles"])
+
+    @property
+    def realization_folder(self) -> str:
+        return os.path.join(self.experiment_folder, "realizations")
+
+    def header(self) -> list[str]:
+        columns = ["realization", *self.parameters, "passed", "stop_reason", "stop_time"]
+        for name in self.criteria:
+            columns += [f"{name}_passed", f"{name}_final", f"{name}_min", f"{name}_max"]
+        return columns + ["error"]
+
+    def row(self, outcome: dict) -> list:
+        row = [outcome["realization"], *(outcome["sample"][name] for name in self.parameters)]
+        if "error" in outcome:
+            return row + [""] * (len(self.header()) - len(row) - 1) + [outcome["error"]]
+        row += [outcome["passed"], outcome["stop_reason"], outcome["stop_time"]]
+        for name in self.criteria:
+            result = outcome["criteria"].get(name)
+            row += [result[key] for key in ("passed", "final", "min", "max")] if result else [""] * 4
+        return row + [""]
+
+    async def run(self) -> list[str]:
+        """Runs all realizations, returns the result files"""
+        realizations = self.settings["realizations"]
+        samples = draw_samples(self.settings["parameters"], realizations, self.settings["seed"])
+        workers = min(self.settings["workers"] or os.cpu_count() or 1, realizations)
+        batch_size = max(1, math.ceil(realizations / (workers * self.batches_per_worker)))
+        batches = [
+            [(index, samples[index]) for index in range(start, min(start + batch_size, realizations))]
+            for start in range(0, realizations, batch_size)
+        ]
+        print(f"Running {realizations} realizations of {os.path.basename(self.experiment_folder)} on {workers} processes")
+
+        os.makedirs(self.experiment_folder, exist_ok=True)
+        results_file = os.path.join(self.experiment_folder, RESULTS_FILE)
+        # the runner is multithreaded (asyncua, executors), forking it could deadlock the children
+        context = multiprocessing.get_context("spawn")
+        slots = context.Queue()
+        for slot in range(workers):
+            slots.put(slot)
+
+        loop = asyncio.get_running_loop()
+        try:
+            with open(results_file, "w", newline="") as file, ProcessPoolExecutor(
+                max_workers = workers,
+                mp_context  = context,
+                initializer = _start_worker,
+                initargs    = (self.experiment_file, self.base_port, self.port_stride, self.realization_folder,
+                               self.settings["keep_logs"], slots),
+            ) as pool:
+                writer = csv.writer(file)
+                writer.writerow(self.header())
+                futures = [loop.run_in_executor(pool, _run_batch, batch) for batch in batches]
+                for future in asyncio.as_completed(futures):
+                    for outcome in await future:
+                        self.statistics.add(outcome)
+                        writer.writerow(self.row(outcome))
+                    file.flush()
+                    print(f"\rRealizations {self.statistics.realizations}/{realizations} | "
+                          f"passed {self.statistics.passed} | errors {self.statistics.errors}", end="", flush=True)
+            print()
+        finally:
+            if not self.settings["keep_logs"]:
+                shutil.rmtree(self.realization_folder, ignore_errors=True)
+
+        summary_file = os.path.join(self.experiment_folder, SUMMARY_FILE)
+        summary = {"experiment_file": self.experiment_file, "seed": self.settings["seed"], **self.statistics.summary()}
+        with open(summary_file, "w") as file:
+            json.dump(summary, file, indent=2)
+        self.report(summary)
+        return [results_file, summary_file]
+
+    @staticmethod
+    def report(summary: dict) -> None:
+        confidence = f"{summary['confidence']:.0%}"
+        pass_rate = summary["pass_rate"]
+        low, high = pass_rate["interval"]
+        print(f"Passed {pass_rate['value']:.1%} of {summary['completed']} realizations ({confidence} CI {low:.1%} - {high:.1%})")
+        for name, stats in summary["criteria"].items():
+            low, high = stats["pass_rate"]["interval"]
+            percentiles = ", ".join(f"{key} {value:.4g}" for key, value in stats["final"].get("percentiles", {}).items())
+            print(f"  {name}: passed {stats['pass_rate']['value']:.1%} ({confidence} CI {low:.1%} - {high:.1%}), final value {percentiles}")
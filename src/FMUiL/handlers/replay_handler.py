@@ -0,0 +1,166 @@
+import pickle
+from functools import cached_property
+from types import SimpleNamespace
+
+import numpy as np
+
+class TraceReader:
+    """
+    Recorded values of one system, read from a Values.csv log
+    ("Experiment_name, System, Variable, Value, Time" rows).
+
+    The log is streamed line by line and only the rows of the system are decoded and kept
+    (as arrays), so large logs with many systems are not loaded into memory.
+    """
+    def __init__(self, file_path: str, system: str, experiment: str | None = None, variables: list[str] | None = None) -> None:
+        self.file_path  = file_path
+        self.system     = system
+        self.experiment = experiment
+        self.times:  dict[str, np.ndarray] = {}
+        self.values: dict[str, np.ndarray] = {}
+        self._load(variables)
+
+    def _load(self, variables: list[str] | None) -> None:
+        rows: dict[str, list[tuple[float, float]]] = {}
+        experiments = set()
+        key = self.system.encode()
+        with open(self.file_path, "rb") as file:
+            file.readline() # header
+            for line in file:
+                if key not in line:
+                    continue
+                parts = [part.strip() for part in line.decode().split(",")]
+                if len(parts) != 5:
+                    continue
+                experiment, system, variable, value, time = parts
+                if system != self.system or (self.experiment is not None and experiment != self.experiment):
+                    continue
+                if variables is not None and variable not in variables:
+                    continue
+                try:
+                    sample = (float(time), float(value))
+                except ValueError:
+                    continue # not a number, e.g. a string variable
+                rows.setdefault(variable, []).append(sample)
+                experiments.add(experiment)
+
+        if not rows:
+            raise ValueError(f"No recorded values of '{self.system}' in {self.file_path}")
+        if len(experiments) > 1:
+            raise ValueError(
+                f"{self.file_path} holds '{self.system}' of several experiments {sorted(experiments)}, select one with 'experiment'"
+            )
+        missing = set(variables or []) - set(rows)
+        if missing:
+            raise ValueError(f"Variables {sorted(missing)} of '{self.system}' are not recorded in {self.file_path}")
+
+        for variable, samples in rows.items():
+            samples = np.array(samples, dtype=float)
+            # the last value of a repeated time wins
+            times, last = np.unique(samples[::-1, 0], return_index=True)
+            self.times[variable]  = times
+            self.values[variable] = samples[::-1, 1][last]
+
+    @property
+    def variables(self) -> list[str]:
+        return list(self.times)
+
+    def sample(self, variable: str, time: float, interpolation: str = "linear") -> float:
+        """Value at time, held constant before the first and after the last recorded point"""
+        times, values = self.times[variable], self.values[variable]
+        if interpolation == "hold":
+            index = max(int(np.searchsorted(times, time + 1e-9, side="right")) - 1, 0)
+            return float(values[index])
+        return float(np.interp(time, times, values))
+
+class TraceSlave:
+    """Stands in for fmpy's FMU2Slave: stepping only advances the replay time"""
+    def __init__(self, reader: TraceReader, variables: list[str], interpolation: str) -> None:
+        self.reader        = reader
+        self.variables     = variables
+        self.interpolation = interpolation
+        self.time = 0.0
+
+    def doStep(self, currentCommunicationPoint, communicationStepSize, **kwargs) -> None:
+        self.time = float(currentCommunicationPoint) + float(communicationStepSize)
+
+    def getReal(self, value_references) -> list[float]:
+        return [self.reader.sample(self.variables[int(vr)], self.time, self.interpolation) for vr in value_references]
+
+    getInteger = getReal
+    getBoolean = getReal
+
+    def setReal(self, value_references, values) -> None:
+        if len(value_references):
+            raise ValueError("Replayed systems have no inputs")
+
+    setInteger = setReal
+    setBoolean = setReal
+
+    def reset(self) -> None:
+        self.time = 0.0
+
+    def instantiate(self, *args, **kwargs) -> None: pass
+    def enterInitializationMode(self) -> None: pass
+    def exitInitializationMode(self) -> None: pass
+    def terminate(self) -> None: pass
+    def freeInstance(self) -> None: pass
+
+    # the state is the replay time
+    def getFMUstate(self) -> float:
+        return self.time
+
+    def setFMUstate(self, state: float) -> None:
+        self.time = state
+
+    def freeFMUstate(self, state) -> None: pass
+
+    def serializeFMUstate(self, state: float) -> bytes:
+        return pickle.dumps(state)
+
+    def deSerializeFMUstate(self, data: bytes) -> float:
+        return pickle.loads(data)
+
+class ReplayHandler:
+    """
+    Replaces a system (FMU or external server) by its recorded behavior. Exposes the same
+    interface as FmuHandler, so it is served by an InternalServerSetup: the recorded
+    variables are outputs that follow the communication steps of the experiment.
+    """
+    def __init__(self, name: str, source: dict) -> None:
+        self.fmu_name = name
+        self.reader = TraceReader(
+            file_path  = source["file"],
+            system     = source.get("system") or name,
+            experiment = source.get("experiment"),
+            variables  = source.get("variables"),
+        )
+        variables = self.reader.variables
+        self.fmu = TraceSlave(self.reader, variables, source.get("interpolation", "linear"))
+        self.fmu_inputs = {}
+        self.fmu_parameters = {}
+        self.fmu_outputs = {variable: {"id": vr, "type": "Real"} for vr, variable in enumerate(variables)}
+        self.model_description = SimpleNamespace(
+            modelName=name,
+            coSimulation=SimpleNamespace(canGetAndSetFMUstate=True, canSerializeFMUstate=True),
+        )
+
+    def close(self) -> None:
+        pass # nothing extracted or instantiated
+
+    @cached_property
+    def settable_names(self) -> dict[str, dict[int, list[str]]]:
+        return {"Real": {}, "Integer": {}, "Boolean": {}}
+
+    @cached_property
+    def fmu_variables(self) -> dict:
+        return dict(self.fmu_outputs)
+
+    def get_fmu_inputs(self) -> list[str]:
+        return []
+
+    def get_fmu_outputs(self) -> list[str]:
+        return list(self.fmu_outputs.keys())
+
+    def get_fmu_parameters(self) -> list[str]:
+        return []
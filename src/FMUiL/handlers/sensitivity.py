@@ -0,0 +1,198 @@
+import numpy as np
+
+DIRECTIONAL       = "directional"
+FINITE_DIFFERENCE = "finite_difference"
+INPUT_TYPES = ("Real", "Integer", "Enumeration", "Boolean")
+
+def sensitivity_name(output: str, variable: str, method: str = FINITE_DIFFERENCE) -> str:
+    """
+    Name of the server variable (and logged column): d(output)/d(variable) along the trajectory,
+    partial(output)/partial(variable) for the directional derivative at the communication point
+    """
+    if method == DIRECTIONAL:
+        return f"partial({output})/partial({variable})"
+    return f"d({output})/d({variable})"
+
+def sensitivity_variables(sensitivity: dict | None) -> list[str]:
+    """Logged "FMU.d(output)/d(variable)" columns of the sensitivity section of an experiment"""
+    return [
+        f"{fmu}.{sensitivity_name(output, variable, settings.get('method', 'auto'))}"
+        for fmu, settings in (sensitivity or {}).items()
+        for output in settings["outputs"] for variable in settings["with_respect_to"]
+    ]
+
+class SensitivityAnalysis:
+    """
+    Sensitivities of outputs of an FMU with respect to its inputs and parameters, updated
+    after every step of the FMU. The inputs follow their nominal values, so in a closed loop
+    these are the sensitivities of the FMU itself, not of the coupled system.
+
+    - finite_difference (also auto): every variable gets a perturbed copy of the FMU state
+      (two with central), stepped with the nominal inputs next to the FMU by swapping the FMU
+      state (canGetAndSetFMUstate). The difference to the nominal outputs is what a run with
+      the perturbed value gives, from one run instead of one or two runs per variable.
+      The perturbation is relative_step · max(|value|, 1) of the value at the start
+    - directional (opt-in): the direct feedthrough partial derivatives of the outputs with
+      respect to the inputs at the communication point, from getDirectionalDerivative
+      (providesDirectionalDerivative). They do not include the effect through the FMU
+      state, so they are named partial(output)/partial(variable), see sensitivity_name
+
+    Ensembles (see EnsembleSlave) give one value per instance.
+    """
+    def __init__(self, fmu_handler, outputs: list[str], with_respect_to: list[str], method: str = "auto",
+                 relative_step: float = 1e-4, central: bool = False) -> None:
+        self.fmu      = fmu_handler.fmu # FMU2Slave or EnsembleSlave
+        self.name     = fmu_handler.fmu_name
+        self.outputs  = outputs
+        self.with_respect_to = with_respect_to
+        self.relative_step   = relative_step
+        self.central  = central
+        self.output_references   = [self._reference(fmu_handler.fmu_outputs, output, "output") for output in outputs]
+        self.variable_references = [
+            self._reference({**fmu_handler.fmu_parameters, **fmu_handler.fmu_inputs}, variable, "input or parameter")
+            for variable in with_respect_to
+        ]
+        self.method = self.resolve_method(fmu_handler, method)
+        # inputs of the nominal FMU applied to the perturbed copies, by FMI type
+        self.inputs: dict[str, list[int]] = {}
+        for variable in fmu_handler.fmu_inputs.values():
+            if variable["type"] in INPUT_TYPES:
+                self.inputs.setdefault(variable["type"], []).append(variable["id"])
+        perturbed_inputs = {reference: j for j, reference in enumerate(self.variable_references)}
+        self.perturbed_positions = [perturbed_inputs.get(reference) for reference in self.inputs.get("Real", [])]
+        self.steps  = None # perturbation of every variable
+        self.copies = []   # (variable index, sign, FMU state) of finite_difference
+        self.perturbed_outputs: dict[tuple[int, float], np.ndarray] = {} # outputs of the copies after their last step
+        self.values = np.empty(0)
+
+    def _reference(self, variables: dict, name: str, kind: str) -> int:
+        if name not in variables:
+            raise ValueError(f"sensitivity: {self.name}.{name} is not an {kind}")
+        if variables[name]["type"] != "Real":
+            raise ValueError(f"sensitivity: {self.name}.{name} is not a Real variable")
+        if variables[name].get("variability") == "fixed":
+            # the copies are perturbed after initialization, FMI 2.0 only allows that for tunable parameters
+            raise ValueError(f"sensitivity: {self.name}.{name} is a fixed parameter, only inputs and tunable parameters can be perturbed")
+        return variables[name]["id"]
+
+    def resolve_method(self, fmu_handler, method: str) -> str:
+        # auto never switches to directional, it computes a different quantity
+        co_simulation = fmu_handler.model_description.coSimulation
+        if method == "auto":
+            method = FINITE_DIFFERENCE
+        if method == DIRECTIONAL:
+            if not co_simulation.providesDirectionalDerivative:
+                raise ValueError(f"sensitivity: FMU {self.name} does not provide directional derivatives")
+            if not all(variable in fmu_handler.fmu_inputs for variable in self.with_respect_to):
+                raise ValueError(f"sensitivity: directional derivatives of {self.name} are only taken with respect to inputs")
+        elif not co_simulation.canGetAndSetFMUstate:
+            raise ValueError(f"sensitivity: FMU {self.name} cannot get and set its state, finite differences are not possible")
+        return method
+
+    @property
+    def names(self) -> list[str]:
+        """Server variables of the sensitivities, in the order of the values"""
+        return [sensitivity_name(output, variable, self.method) for output in self.outputs for variable in self.with_respect_to]
+
+    ########### Perturbed copies ###########
+    def start(self) -> None:
+        """Creates the perturbed copies from the current state, call after the initial values are set"""
+        self.close()
+        values = np.asarray(self.fmu.getReal(self.variable_references), dtype=float)
+        self.steps = self.relative_step * np.maximum(np.abs(values), 1.0)
+        if self.method == DIRECTIONAL:
+            return
+        nominal = self.fmu.getFMUstate()
+        try:
+            for j, reference in enumerate(self.variable_references):
+                for sign in ((1.0, -1.0) if self.central else (1.0,)):
+                    self.fmu.setFMUstate(nominal)
+                    self.fmu.setReal([reference], [values[j] + sign * self.steps[j]])
+                    self.perturbed_outputs[j, sign] = np.asarray(self.fmu.getReal(self.output_references), dtype=float)
+                    self.copies.append((j, sign, self.fmu.getFMUstate()))
+        finally:
+            self.fmu.setFMUstate(nominal)
+            self.fmu.freeFMUstate(nominal)
+
+    def _apply_inputs(self, inputs: dict, j: int, sign: float) -> None:
+        for fmi_type, (references, values) in inputs.items():
+            if fmi_type == "Real":
+                values = np.array(values, dtype=float)
+                for position, perturbed in enumerate(self.perturbed_positions):
+                    if perturbed == j:
+                        values[position] += sign * self.steps[j]
+                self.fmu.setReal(references, values)
+            elif fmi_type in ("Integer", "Enumeration"):
+                self.fmu.setInteger(references, values)
+            else:
+                self.fmu.setBoolean(references, values)
+
+    def step_copies(self, current_time, step_size) -> None:
+        """Steps the perturbed copies with the current inputs of the FMU, before the FMU itself is stepped"""
+        if not self.copies:
+            return
+        inputs = {
+            fmi_type: (references, self._get(fmi_type, references))
+            for fmi_type, references in self.inputs.items()
+        }
+        nominal = self.fmu.getFMUstate()
+        try:
+            for index, (j, sign, state) in enumerate(self.copies):
+                self.fmu.setFMUstate(state)
+                self._apply_inputs(inputs, j, sign)
+                self.fmu.doStep(currentCommunicationPoint=current_time, communicationStepSize=step_size)
+                self.perturbed_outputs[j, sign] = np.asarray(self.fmu.getReal(self.output_references), dtype=float)
+                self.copies[index] = (j, sign, self.fmu.getFMUstate())
+                self.fmu.freeFMUstate(state)
+        finally:
+            self.fmu.setFMUstate(nominal)
+            self.fmu.freeFMUstate(nominal)
+
+    def _get(self, fmi_type: str, references: list[int]):
+        if fmi_type == "Real":
+            return self.fmu.getReal(references)
+        if fmi_type in ("Integer", "Enumeration"):
+            return self.fmu.getInteger(references)
+        return self.fmu.getBoolean(references)
+
+    ########### Sensitivities ###########
+    def update(self) -> np.ndarray:
+        """Sensitivities after the FMU was stepped, output by output: (outputs · variables[, instances])"""
+        if self.method == DIRECTIONAL:
+            columns = [
+                self.fmu.getDirectionalDerivative(self.output_references, [reference], [1.0])
+                for reference in self.variable_references
+            ]
+        elif self.central:
+            perturbed = self.perturbed_outputs
+            columns = [(perturbed[j, 1.0] - perturbed[j, -1.0]) / (2 * self.steps[j]) for j in range(len(self.steps))]
+        else:
+            nominal = np.asarray(self.fmu.getReal(self.output_references), dtype=float)
+            columns = [(self.perturbed_outputs[j, 1.0] - nominal) / self.steps[j] for j in range(len(self.steps))]
+        columns = np.asarray(columns, dtype=float) # (variables, outputs[, instances])
+        self.values = np.swapaxes(columns, 0, 1).reshape(len(self.names), *columns.shape[2:])
+        return self.values
+
+    ########### Checkpoints ###########
+    def get_state(self) -> list:
+        return [self.fmu.serializeFMUstate(state) for _, _, state in self.copies]
+
+    def set_state(self, serialized: list) -> None:
+        if len(serialized) != len(self.copies):
+            raise ValueError(f"sensitivity: the checkpoint of {self.name} has {len(serialized)} perturbed states, expected {len(self.copies)}")
+        nominal = self.fmu.getFMUstate()
+        try:
+            for index, ((j, sign, state), data) in enumerate(zip(self.copies, serialized)):
+                self.copies[index] = (j, sign, self.fmu.deSerializeFMUstate(data))
+                self.fmu.freeFMUstate(state)
+                self.fmu.setFMUstate(self.copies[index][2])
+                self.perturbed_outputs[j, sign] = np.asarray(self.fmu.getReal(self.output_references), dtype=float)
+        finally:
+            self.fmu.setFMUstate(nominal)
+            self.fmu.freeFMUstate(nominal)
+
+    def close(self) -> None:
+        for _, _, state in self.copies:
+            self.fmu.freeFMUstate(state)
+        self.copies = []
+        self.perturbed_outputs = {}
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 from FMUiL.communications import server_manager
-from FMUiL.communications import client_manager
-from FMUiL.handlers.config_handler import ExperimentHandler
-from FMUiL.logger import ExperimentLogger
-from FMUiL.utils import ops
+from FMUiL.communications import client_manager, ClientConnectionError, ConnectionPool, SignalBus
+from FMUiL.handlers.config_handler import ExperimentHandler, CONDITION_PATTERN
+from FMUiL.handlers.checkpoint_handler import CheckpointHandler, RunManifest
+from FMUiL.handlers.step_controller import StepSizeController
+from FMUiL.handlers.early_exit import EarlyExitMonitor
+from FMUiL.handlers.monte_carlo import MonteCarloRunner
+from FMUiL.handlers.sensitivity import sensitivity_variables
+from FMUiL.handlers.execution_plan import ExecutionPlan, SERVER_OBJECT, SIMULATE_METHOD, UPDATE_BULK_METHOD
+from FMUiL.logger import ExperimentLogger, ResultStore, ResultsIndex, TelemetryPublisher, ProgressReporter, TrajectoryHistory, MemoryProfiler
+from FMUiL.logger.memory_profiler import MEMORY_PROFILE_FILE
 
 import asyncio
 from asyncua import ua
+import numpy as np
 import os
 from decimal import getcontext
 import logging
@@ -76,10 +83,35 @@ def parse_connections(raw_connections: Optional[Iterable[Dict[str, str]]]) -> Li
         return []
     return [Connection.from_raw(item) for item in raw_connections]
 
+def flat_values(values: list) -> list:
+    """
+    Spreads the values of ensemble variables (one list with a value per instance)
+    into the surrounding scalars
+
+    >>> flat_values([1.0, [2.0, 3.0], 4.0])
+    [1.0, 2.0, 3.0, 4.0]
+    """
+    flat = []
+    for value in values:
+        if isinstance(value, list):
+            flat.extend(value)
+        else:
+            flat.append(value)
+    return flat
+
 class SimulationHandler:
-    def __init__(self, experiment_configs: list[str], base_port) -> None:
+    def __init__(self, experiment_configs: list[str], base_port, log_folder: Optional[str] = None, force: bool = False,
+                 telemetry: Optional[str] = None, profile_memory: bool = False) -> None:
         self.experiment_configs = experiment_configs
-        self.log_folder         = self.generate_log()
+        self.force              = force # run even when the result store has the results
+        self.result_store       = ResultStore()
+        self.results_index      = ResultsIndex() # finished experiments of all runs, see "fmuil results query"
+        self.telemetry          = TelemetryPublisher(telemetry) if telemetry else None # live stream of the logged values
+        self.resuming           = log_folder is not None # continue a run in an existing log folder
+        self.log_folder         = log_folder if self.resuming else self.generate_log()
+        self.run_manifest       = RunManifest(self.log_folder)
+        # opt-in tracemalloc/RSS snapshots at the phase boundaries of every experiment
+        self.memory_profiler    = MemoryProfiler(os.path.join(self.log_folder, MEMORY_PROFILE_FILE)) if profile_memory else None
         self.base_port          = base_port
         self.experimentLogger   = None
         self.config             = None 
@@ -89,11 +121,31 @@ class SimulationHandler:
         self.connections        = None # description of system loop definition from experiment
         self.logged_values      = None
         self.server_obj         = None
+        self.plan               = None # ExecutionPlan, built once per experiment
+        self.direct_routes      = []   # internal → internal connections exchanged over the signal bus
+        self.signal_bus         = None # only allocated when there are direct routes
+        self.bus_readers        = []   # servers with inputs on the signal bus
+        self.free_running       = []   # internal servers without connected inputs, simulated ahead in batches
+        self.connection_pool    = ConnectionPool() # external clients shared by all experiments of the run
         self.simulation_time    = None
+        self.experiment_file    = None
+        self.checkpoint_handler  = None
+        self.checkpoint_interval = None
+        self.adaptive_step       = None # adaptive_step section of the experiment
+        self.step_controller     = None # StepSizeController when adaptive_step is set
+        self.early_exit_config   = None # early_exit section of the experiment
+        self.early_exit          = None # EarlyExitMonitor when early_exit is set
+        self.history             = None # TrajectoryHistory of the logged and evaluated variables, see latest/window/resample
+        self.watched_values      = []   # values of ExecutionPlan.watched read by the evaluations of the current step
+        self.stop_reason         = None # why the last experiment stopped, see EarlyExitMonitor
+        self.monte_carlo         = None # monte_carlo section of the experiment
+        self.sensitivity         = None # sensitivity section of the experiment, settings by FMU name
+        self.ensemble            = {}   # instances by FMU name, FMUs that are not listed have one
+        self.outcomes            = None # OutcomeCollector while running a Monte Carlo realization
         self.reading_condition_dict  = {}
         self.evaluation_equation_dic = {}
         self.system_node_ids         = {} # this is meant to take in all of the systems node id's
-        self.regex_parser_pattern    = r'\d+\.\d+|\d+|[a-zA-Z_][\w]*|[<>!=]=?|==|!=|[^\s\w\.]'
+        self.regex_parser_pattern    = CONDITION_PATTERN
     
     ########### Utils ###########
     """
@@ -107,12 +159,126 @@ class SimulationHandler:
         return folder_path
     
     async def log_requested_values(self):
-    # Uses get_value to get current value and logs it using the experimentlogger
-        for fmu, var in self.experimentLogger.logged_values:
-            node_id = self.system_node_ids[fmu][var]
-            value = await self.get_value(fmu, node_id)
-            await self.experimentLogger.log_value(fmu, var, value, self.simulation_time)
+    # Reads the current values of the planned probes and logs them using the experimentlogger
+        values = []
+        for probe in self.plan.probes:
+            value = await probe.node.read_value()
+            await self.experimentLogger.log_value(probe.system, probe.variable, value, self.simulation_time)
+            values.append(value)
+        return values
+
+    def clear_watched(self) -> None:
+        # evaluated variables that were not read in a step are stored as NaN
+        self.watched_values = [[None] * probe.width if probe.width > 1 else None for probe in self.plan.watched]
+
+    def record_history(self, logged: list) -> None:
+        # the values read for logging and evaluation are reused, nothing is read again
+        self.history.append(self.simulation_time, flat_values(logged + self.watched_values))
+        self.clear_watched()
+
+    ########### History ###########
+    """
+    Recent values of the logged and evaluated variables ("FMU.variable", ensemble
+    instances "FMU[i].variable") for evaluations, telemetry and user code,
+    without reading the log files. history_horizon seconds are kept.
+    """
+    def _history(self) -> TrajectoryHistory:
+        if self.history is None:
+            raise LookupError("No experiment has been started, the history is empty")
+        return self.history
+
+    def latest(self, variable: str) -> tuple[float, float]:
+        """Newest (time, value) of the variable"""
+        return self._history().latest(variable)
+
+    def window(self, variable: str, duration: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(times, values) of the last duration seconds, all kept points by default"""
+        return self._history().window(variable, duration)
+
+    def resample(self, variable: str, start: float, stop: float, step: float,
+                 interpolation: str = "linear") -> tuple[np.ndarray, np.ndarray]:
+        """(times, values) on the grid start, start + step, ... <= stop"""
+        return self._history().resample(variable, start, stop, step, interpolation)
         
+    @classmethod
+    def from_log_folder(cls, log_folder: str, base_port: Optional[int] = None, profile_memory: bool = False) -> "SimulationHandler":
+        """
+        Creates a handler that resumes the run stored in log_folder
+        """
+        manifest = RunManifest(log_folder).load()
+        return cls(
+            experiment_configs = manifest["experiment_configs"],
+            base_port          = manifest["base_port"] if base_port is None else base_port,
+            log_folder         = log_folder,
+            profile_memory     = profile_memory,
+        )
+
+    def profile_phase(self, phase: str) -> None:
+        if self.memory_profiler is not None:
+            self.memory_profiler.phase(phase)
+
+    ########### Checkpoints ###########
+    def verify_checkpoint_support(self) -> None:
+        """
+        Disables checkpoints if any of the FMUs cannot serialize its state
+        """
+        if not self.checkpoint_interval:
+            return
+        unsupported = [name for name, server in self.server_obj.internal_servers.items() if not server.supports_checkpoints()]
+        if unsupported:
+            logger.error(f"Checkpoints disabled, FMUs {unsupported} do not support serializing their state")
+            self.checkpoint_interval = None
+
+    def save_checkpoint(self) -> None:
+        """
+        Stores FMU states, coordinator time and log offsets atomically to disk
+        """
+        checkpoint = {
+            "experiment_file": self.experiment_file,
+            "simulation_time": self.simulation_time,
+            "fmu_states": {
+                server_name: server.get_checkpoint_state()
+                for server_name, server in self.server_obj.internal_servers.items()
+            },
+            "log_offsets": self.experimentLogger.get_offsets(),
+            "step_controller": self.step_controller.get_state() if self.step_controller is not None else None,
+            "early_exit": self.early_exit.get_state() if self.early_exit is not None else None,
+            "history": self.history.get_state(),
+            "summary": self.experimentLogger.summary(),
+            "statistics": self.experimentLogger.statistics.get_state(),
+        }
+        self.checkpoint_handler.save(checkpoint)
+
+    async def restore_checkpoint(self, checkpoint: dict) -> float:
+        """
+        Restores the system to the checkpoint, returns the simulation time to continue from
+        """
+        for server_name, state in checkpoint["fmu_states"].items():
+            await self.server_obj.internal_servers[server_name].restore_checkpoint_state(state)
+        self.experimentLogger.truncate(checkpoint["log_offsets"])
+        if self.step_controller is not None and checkpoint["step_controller"] is not None:
+            self.step_controller.set_state(checkpoint["step_controller"])
+        if self.early_exit is not None and checkpoint["early_exit"] is not None:
+            self.early_exit.set_state(checkpoint["early_exit"])
+        self.history.set_state(checkpoint["history"])
+        self.experimentLogger.load_summary(checkpoint["summary"])
+        self.experimentLogger.statistics.set_state(checkpoint["statistics"])
+        print(f"Resuming {self.experiment_name} from t={checkpoint['simulation_time']}")
+        return checkpoint["simulation_time"]
+
+    def load_checkpoint(self) -> Optional[dict]:
+        """
+        Returns the checkpoint of the current experiment when resuming a run
+        """
+        if not self.resuming:
+            return None
+        checkpoint = self.checkpoint_handler.load()
+        if checkpoint is None or checkpoint["experiment_file"] != self.experiment_file:
+            # nothing to continue from, start over with empty logs
+            self.experimentLogger.truncate()
+            return None
+        return checkpoint
+
     ########### SETTERS & GETTERS ########### 
     async def get_value(self, client_name: str, variable: ua.NodeId) -> None:
         """
@@ -129,30 +295,37 @@ class SimulationHandler:
         """
         # if it's part of the systems servers
         if (client_name in self.server_obj.internal_servers):
-                object_node = self.client_obj.internal_clients[client_name].get_node(ua.NodeId(1, 1))
-                update_values = {
-                    "variable": variable,
-                    "value": value
-                }
-                await object_node.call_method(ua.NodeId(1, 3), str(update_values)) # update fmu before updating values
+                server = self.server_obj.internal_servers[client_name]
+                client = self.client_obj.internal_clients[client_name]
+                if variable in server.opc_server_only_variables:
+                    await client.get_node(server.server_variable_ids[variable]).write_value(float(value))
+                else:
+                    object_node = client.get_node(SERVER_OBJECT)
+                    layout = server.bulk_layout([variable])
+                    await object_node.call_method(UPDATE_BULK_METHOD, *server.bulk_arguments(layout, [value])) # update fmu before updating values
         
         # if it's an external server
         else:
             node_id = self.client_obj.node_ids[client_name][variable]
             client = self.client_obj.get_client(client_name=client_name)
             node = client.get_node(node_id)
-            datavalue1 = await node.read_data_value()
-            variant1 = datavalue1.Value
-            await node.write_value(ua.DataValue(ua.Variant(value, variant1.VariantType)))            
+            # the variant type is read once and cached with the (pooled) connection
+            variant_types = self.client_obj.variant_types[client_name]
+            if variable not in variant_types:
+                datavalue1 = await node.read_data_value()
+                variant_types[variable] = datavalue1.Value.VariantType
+            await node.write_value(ua.DataValue(ua.Variant(value, variant_types[variable])))
             
     async def run_system_updates(self, timestep):
         """
-        Calls method "..." from all the opc ua simulation servers
+        Calls method "simulate" from all the opc ua simulation servers
         """
-        for key in self.client_obj.internal_clients.keys():
-            client = self.client_obj.internal_clients[key]
-            object_node = client.get_node(ua.NodeId(1, 1))
-            await object_node.call_method(ua.NodeId(1, 2), str(float(timestep)))
+        timestep = str(float(timestep))
+        for step in self.plan.steps:
+            await step.object_node.call_method(SIMULATE_METHOD, timestep)
+        # free-running servers serve their outputs from the batch computed ahead
+        for server in self.plan.run_ahead:
+            await server.advance(timestep)
         return
     
     ################### Passing values ########################
@@ -168,36 +341,124 @@ class SimulationHandler:
         | fmu1 |*OUTPUT2 ====> INPUT2*| fmu2 |
         |______|*OUTPUT3 ====> INPUT3*|______|
         """
-        for update in self.connections:
-            # get nodeid of the source variable
-            value_nodid = self.system_node_ids[update.from_fmu][update.from_var]
-            # get the value using the nodeid
-            value = await self.get_value(client_name= update.from_fmu, variable= value_nodid)
-
-            # write it to the target value
-            await self.write_value(
-                client_name = update.to_fmu,
-                variable    = update.to_var,
-                value       = value
-            )
+        exchanged = []
+        # internal targets: all inputs of a server are applied with one typed bulk update
+        for update in self.plan.updates:
+            values = [await source_node.read_value() for source_node in update.source_nodes]
+            await update.object_node.call_method(UPDATE_BULK_METHOD, *update.server.bulk_arguments(update.layout, values))
+            exchanged.extend(values)
+
+        # external targets: write the node with its cached variant type
+        for transfer in self.plan.transfers:
+            value = await transfer.source_node.read_value()
+            variant_types = transfer.variant_types
+            if transfer.target_var not in variant_types:
+                datavalue = await transfer.target_node.read_data_value()
+                variant_types[transfer.target_var] = datavalue.Value.VariantType
+            await transfer.target_node.write_value(ua.DataValue(ua.Variant(value, variant_types[transfer.target_var])))
+            exchanged.append(value)
+
+        # values passed by the coordinator, used by the adaptive step size
+        return exchanged
+
+    def install_direct_routes(self):
+        """
+        Connections between two internal servers are exchanged through the shared memory
+        signal bus: the source writes its output after each step and the target reads it
+        after the step barrier, the coordinator only issues the step commands.
+        Connections to or from external servers and ensembles stay in the execution plan.
+        Without direct routes no bus is allocated.
+        """
+        internal_servers = self.server_obj.internal_servers
+        single = {server_name for server_name, server in internal_servers.items() if server.instances == 1}
+        self.direct_routes = [
+            connection for connection in self.connections
+            if connection.from_fmu in single and connection.to_fmu in single
+        ]
+        signals = list(dict.fromkeys(f"{c.from_fmu}.{c.from_var}" for c in self.direct_routes))
+        self.signal_bus  = SignalBus(signals=signals) if signals else None
+        self.bus_readers = []
+
+        outputs = {server_name: [] for server_name in internal_servers}
+        inputs  = {server_name: [] for server_name in internal_servers}
+        for signal in signals:
+            fmu, var = Connection._split(signal)
+            outputs[fmu].append((var, self.signal_bus.slot(signal)))
+        for connection in self.direct_routes:
+            slot = self.signal_bus.slot(f"{connection.from_fmu}.{connection.from_var}")
+            inputs[connection.to_fmu].append((connection.to_var, slot))
+        for server_name, server in internal_servers.items():
+            server.attach_signal_bus(self.signal_bus, outputs=outputs[server_name], inputs=inputs[server_name])
+            if inputs[server_name]:
+                self.bus_readers.append(server)
+
+    async def enable_sensitivities(self):
+        """
+        The servers compute the sensitivities next to their FMU from the initial state on,
+        see SensitivityAnalysis
+        """
+        for fmu, settings in self.sensitivity.items():
+            if fmu not in self.server_obj.internal_servers:
+                raise ValueError(f"'sensitivity': unknown FMU '{fmu}'")
+            await self.server_obj.internal_servers[fmu].enable_sensitivity(settings)
+
+    def detect_free_running(self):
+        """
+        FMUs whose inputs are not driven by the system loop (signal sources, open loop plants)
+        do not need to be stepped in lockstep. They are simulated run_ahead_steps communication
+        steps ahead at once and their outputs are buffered for logging and consumers.
+        Running ahead is only used in simulation_time mode with a fixed step and not for ensembles
+        or FMUs with sensitivities.
+        """
+        driven = {connection.to_fmu for connection in self.connections}
+        run_ahead_steps = self.experiment["run_ahead_steps"]
+        self.free_running = []
+        for server_name, server in self.server_obj.internal_servers.items():
+            if (self.timing == "simulation_time" and run_ahead_steps > 1 and not self.adaptive_step
+                    and server_name not in driven and server.instances == 1 and server.sensitivity is None):
+                server.enable_run_ahead(batch_steps=run_ahead_steps, stop_time=self.stop_time)
+                self.free_running.append(server_name)
+            else:
+                server.disable_run_ahead()
+
+    def coupled_signals(self, exchanged: list) -> list:
+        """
+        Current values of all connected outputs: routed signals from the bus
+        and the values passed by the coordinator
+        """
+        routed = list(self.signal_bus.read(list(range(len(self.signal_bus.signals))))) if self.signal_bus is not None else []
+        return routed + flat_values(exchanged)
+
+    async def exchange_bus_signals(self):
+        """
+        Step barrier: every server has written its outputs, swap the buffers and let
+        the servers read their inputs for the next step
+        """
+        if self.signal_bus is None:
+            return
+        self.signal_bus.advance()
+        for server in self.bus_readers:
+            await server.read_bus_inputs()
+
+    def close_signal_bus(self):
+        if self.signal_bus is not None:
+            self.signal_bus.close()
+            self.signal_bus  = None
+            self.bus_readers = []
 
     async def check_reading_conditions(self, conditions):
         """
         Checks that all reading conditions are met.
         Returns True if no conditions are defined.
         """
-        if not self.reading_condition_dict:
-            return True
-
-        for condition in self.reading_condition_dict:
-            node = self.system_node_ids[self.reading_condition_dict[condition]["target_obj"]][self.reading_condition_dict[condition]["target_var"]]
-            measured_value = self.client_obj.internal_clients[self.reading_condition_dict[condition]["target_obj"]].get_node(node)
-            measured_value = await measured_value.read_value()
-            eval_criterea = self.reading_condition_dict[condition]["value"] 
-            op            = self.reading_condition_dict[condition]["operator"]
-
-            # Fail early if one condition is not met
-            if not ops[op](measured_value, eval_criterea):
+        for condition in self.plan.conditions:
+            measured_value = await condition.node.read_value()
+            if condition.watched is not None:
+                self.watched_values[condition.watched] = measured_value
+
+            # Fail early if one condition is not met, by any instance of an ensemble
+            measured_values = measured_value if isinstance(measured_value, list) else [measured_value]
+            if not all(condition.compare(value, condition.value) for value in measured_values):
                 return False  
 
         return True
@@ -205,13 +466,14 @@ class SimulationHandler:
     ################################################
     ############## Simulation loop #################
     ################################################
-    async def run_multi_step_experiment(self, experiment: dict):
+    async def run_multi_step_experiment(self, experiment: dict, start_time: float = 0.0):
         """
         Executes the experiment while regulating time according to experiment["timing"]:
         - "simulation_time": advances time instantly
         - "real_time": waits so each step aligns with real wall-clock time
+        start_time is non-zero when continuing from a checkpoint
         """
-        sim_time = 0.0
+        sim_time = start_time
         self.simulation_time = sim_time
         simulation_status = True
         timestep = float(experiment["timestep"])  # communication timestep        
@@ -219,43 +481,100 @@ class SimulationHandler:
         if timestep > experiment["stop_time"]:
             raise ValueError("stop_time has to be equal or greater than step_time")
 
+        if self.step_controller is not None:
+            timestep = min(self.step_controller.step, experiment["stop_time"] - sim_time)
+
         print(f"""Starting simulation:
         Experiment: {self.experiment['experiment_name']}
         FMU's: {self.fmu_files}
-        Simulating""", end="", flush=True)
+        Simulating""")
+        progress = ProgressReporter(stop_time=experiment["stop_time"], start_time=start_time)
+        if self.telemetry is not None:
+            self.telemetry.begin(self.experiment_name, [column for probe in self.plan.probes for column in probe.columns],
+                                 history=self.history)
         
-        # Log the initial values/state
+        # Log the initial values/state (already in the logs when resuming)
         # TODO: fix to give the initial values (now 0)
-        await self.log_requested_values()
+        if start_time == 0.0:
+            self.record_history(await self.log_requested_values())
+
+        if self.checkpoint_interval:
+            next_checkpoint = sim_time + self.checkpoint_interval
 
         while simulation_status:
             start_wall_time = time.time()
             
             # Update all FMUs with one timestep into the future
             await self.run_system_updates(timestep=timestep)
+
+            # Step barrier, internal servers exchange their routed signals over the bus
+            await self.exchange_bus_signals()
             
             # Pass data between servers (FMUs and external)
-            await self.run_single_loop()
+            exchanged = await self.run_single_loop()
 
             # global time advancement (FMUs have been stepped)
-            sim_time += timestep
+            step_taken = timestep
+            if self.step_controller is not None:
+                sim_time = round(sim_time + timestep, 9) # variable steps, avoid drifting off the step grid
+            else:
+                sim_time += timestep
             self.simulation_time = sim_time
             
             # Evaluation logic
+            results = None
             if await self.check_reading_conditions(experiment["start_evaluating_conditions"]):
-                await self.check_outputs(experiment["evaluation"], simulation_time=sim_time)
+                results = await self.check_outputs(experiment["evaluation"], simulation_time=sim_time)
                        
             # Log here to have correct time -> First log is at the first communication point
-            await self.log_requested_values()
+            logged = await self.log_requested_values()
+            self.record_history(logged)
+
+            # Early exit rules
+            stop_reason = None
+            if self.early_exit is not None:
+                self.early_exit.record_results(results, sim_time)
+                stop_reason = self.early_exit.check(sim_time, self.history)
+
+            # Log the step taken and choose the next one from the coupled signals
+            if self.step_controller is not None:
+                await self.experimentLogger.log_value("coordinator", "timestep", step_taken, sim_time)
+                timestep = self.step_controller.update(sim_time, self.coupled_signals(exchanged))
+                remaining = round(experiment["stop_time"] - sim_time, 9)
+                if remaining > 0:
+                    timestep = min(timestep, remaining)
+
+            if self.checkpoint_interval and sim_time >= next_checkpoint:
+                self.save_checkpoint()
+                while next_checkpoint <= sim_time:
+                    next_checkpoint += self.checkpoint_interval
+
+            if self.telemetry is not None:
+                self.telemetry.record(sim_time, flat_values(logged), {
+                    "step": step_taken,
+                    "wall": time.time() - start_wall_time,
+                    "passed": sum(results or []),
+                    "failed": len(results or []) - sum(results or []),
+                })
 
             if self.timing == "real_time":
-                await self.regulate_timestep(start_time= start_wall_time, timestep= timestep)
+                await self.regulate_timestep(start_time= start_wall_time, timestep= step_taken)
             
-            print(".", end="", flush=True)
+            progress.update(sim_time, results)
 
-            if sim_time >= experiment["stop_time"]:
+            if stop_reason is None and sim_time >= experiment["stop_time"]:
+                stop_reason = "stop_time"
+            if stop_reason is not None:
                 simulation_status = False
-                print("Simulation ended\n\n ")
+                self.stop_reason = stop_reason
+                progress.finish(sim_time)
+                self.experimentLogger.log_stop(stop_reason, sim_time)
+                if self.telemetry is not None:
+                    self.telemetry.end(stop_reason, sim_time)
+                if stop_reason == "stop_time":
+                    print("Simulation ended\n\n ")
+                else:
+                    print(f"Simulation stopped early at t={sim_time} ({stop_reason})\n\n ")
 
     async def regulate_timestep(self, start_time: float, timestep: float):
         """
@@ -269,7 +588,7 @@ class SimulationHandler:
             logger.error("DURANTION OF LOOP EXCEEDS TIMESTEP!")
             # WARNING
             
-    async def run_experiment(self) -> None:
+    async def run_experiment(self, checkpoint: Optional[dict] = None) -> None:
         """
         check_experiment_type
         call corresponding experiment
@@ -277,10 +596,53 @@ class SimulationHandler:
         # reset and initialize system variables for every experiment
         await self.client_obj.reset_system() 
         await self.client_obj.initialize_system_variables(experiment=self.experiment)
+        await self.enable_sensitivities()
         # parses system_loop section of the experiment and stores it to use it as the system loop
         print("Parsing connections...") 
         self.connections = parse_connections(self.experiment["system_loop"])
-        await self.run_multi_step_experiment(experiment=self.experiment)
+        self.install_direct_routes()
+        self.detect_free_running()
+        self.plan = ExecutionPlan.build(self)
+
+        self.step_controller = None
+        if self.adaptive_step:
+            self.step_controller = StepSizeController(
+                tolerance          = self.adaptive_step["tolerance"],
+                relative_tolerance = self.adaptive_step["relative_tolerance"],
+                min_step           = self.adaptive_step["min_step"],
+                max_step           = self.adaptive_step["max_step"],
+                initial_step       = self.timestep,
+            )
+
+        self.early_exit = None
+        if self.early_exit_config:
+            self.early_exit = EarlyExitMonitor(
+                on_first_failure = self.early_exit_config["on_first_failure"],
+                all_passed_for   = self.early_exit_config["all_passed_for"],
+                steady_state     = self.early_exit_config["steady_state"],
+            )
+            signals = self.early_exit.signals
+            self.early_exit.columns = [
+                column for probe in self.plan.probes
+                if signals is None or f"{probe.system}.{probe.variable}" in signals
+                for column in probe.columns
+            ]
+
+        # the steady_state rule judges its window on the history, the horizon covers it
+        horizon = self.experiment["history_horizon"]
+        if self.early_exit is not None and self.early_exit.monitors_signals:
+            horizon = max(horizon, self.early_exit.window)
+        self.history = TrajectoryHistory.for_horizon(
+            variables=self.plan.history_columns,
+            horizon=horizon,
+            step=self.adaptive_step["min_step"] if self.adaptive_step else self.timestep,
+        )
+        self.clear_watched()
+
+        start_time = 0.0
+        if checkpoint is not None:
+            start_time = await self.restore_checkpoint(checkpoint)
+        await self.run_multi_step_experiment(experiment=self.experiment, start_time=start_time)
 
     #######################################################################
     ################   Evaluation logic       #############################
@@ -288,29 +650,31 @@ class SimulationHandler:
     async def check_outputs(self, evaluation: dict[list[dict]], simulation_time) -> None:
         """
         evaluation of system outputs, this function reads the "evaluation" section of the yaml file
+        returns the results of the criteria
         """
-        for criterea, criterea_data in self.evaluation_equation_dic.items():
-            if not criterea_data.get("enabled", True):
-                continue  # skip disabled evaluations
-
-            node = self.system_node_ids[criterea_data["target_obj"]][criterea_data["target_var"]]
-            measured_value = self.client_obj.internal_clients[criterea_data["target_obj"]].get_node(node)
-            measured_value = await measured_value.read_value()
-
-            target_value = criterea_data["value"]
-            op = criterea_data["operator"]
-
-            # compare the two values
-            evaluation_result = ops[op](measured_value, target_value)
+        results = []
+        # disabled evaluations are not part of the plan
+        for criterion in self.plan.criteria:
+            measured_value = await criterion.node.read_value()
+            if criterion.watched is not None:
+                self.watched_values[criterion.watched] = measured_value
+
+            # compare the two values, ensembles give one result per instance
+            if isinstance(measured_value, list):
+                evaluation_result = [criterion.compare(value, criterion.value) for value in measured_value]
+            else:
+                evaluation_result = criterion.compare(measured_value, criterion.value)
 
-            # save result only if this specific condition is enabled
-            if criterea_data.get("enabled", True):
-                self.experimentLogger.log_result(
-                    criterea=criterea,
-                    measured_value=measured_value,
-                    evaluation_result=evaluation_result,
-                    simulation_time=simulation_time,
-                )
+            self.experimentLogger.log_result(
+                criterea=criterion.name,
+                measured_value=measured_value,
+                evaluation_result=evaluation_result,
+                simulation_time=simulation_time,
+            )
+            results.extend(evaluation_result if isinstance(evaluation_result, list) else [evaluation_result])
+            if self.outcomes is not None:
+                self.outcomes.record(criterion.name, measured_value, evaluation_result)
+        return results
 
     ###########################################################################
     #################### INIT SYSTEM IDS AND VALUES ###########################
@@ -388,6 +752,7 @@ class SimulationHandler:
         placeholder
         """
         print("Initializing experiment parameters...")
+        self.experiment_file = experiment
         self.config    = ExperimentHandler(experiment).dump_dict() # dump pydantic model as dict
 
         try:
@@ -426,15 +791,64 @@ class SimulationHandler:
             if not isinstance(self.stop_time, (int, float)) or self.stop_time <= 0:
                 raise ValueError("'stop_time' must be a positive number")
 
+            # Adaptive step (optional)
+            self.adaptive_step = self.experiment.get("adaptive_step")
+            if self.adaptive_step is not None and self.adaptive_step["min_step"] > self.adaptive_step["max_step"]:
+                raise ValueError("'adaptive_step' min_step must not be greater than max_step")
+
+            # Checkpoint interval (optional)
+            self.checkpoint_interval = self.experiment.get("checkpoint_interval")
+            if self.checkpoint_interval is not None and (not isinstance(self.checkpoint_interval, (int, float)) or self.checkpoint_interval <= 0):
+                raise ValueError("'checkpoint_interval' must be a positive number")
+
+            # Early exit rules (optional)
+            self.early_exit_config = self.experiment.get("early_exit")
+            steady_state = (self.early_exit_config or {}).get("steady_state")
+            if steady_state and steady_state.get("signals"):
+                not_logged = set(steady_state["signals"]) - set(self.experiment.get("logging") or [])
+                if not_logged:
+                    raise ValueError(f"'early_exit' steady_state signals must be logged: {sorted(not_logged)}")
+
+            # Control performance (optional), the variables and setpoints must be logged
+            for variable, settings in (self.experiment.get("performance") or {}).items():
+                logged = set(self.experiment.get("logging") or [])
+                if variable not in logged:
+                    raise ValueError(f"'performance' variable {variable} must be logged")
+                if isinstance(settings["setpoint"], str) and settings["setpoint"] not in logged:
+                    raise ValueError(f"'performance' setpoint {settings['setpoint']} of {variable} must be logged")
+
             #Check initial system state
             self.initial_system_state = self.experiment.get("initial_system_state", {})
             if not isinstance(self.initial_system_state, dict):
                 raise ValueError("'initial_system_state' must be a dictionary")
+
+            # Ensembles (optional), initial values are given for all instances or as a list per instance
+            self.ensemble = self.experiment.get("ensemble") or {}
+            for fmu, state in self.initial_system_state.items():
+                for variable, value in state.items():
+                    if isinstance(value, list) and len(value) != self.ensemble.get(fmu, 1):
+                        raise ValueError(
+                            f"'initial_system_state' {fmu}.{variable} has {len(value)} values for {self.ensemble.get(fmu, 1)} instance(s)"
+                        )
+
+            # Monte Carlo realizations (optional), sampled values are applied on top of the initial state
+            self.monte_carlo = self.experiment.get("monte_carlo")
+            for parameter in (self.monte_carlo or {}).get("parameters", {}):
+                fmu, _, variable = parameter.partition(".")
+                if not variable or fmu not in self.initial_system_state:
+                    raise ValueError(f"'monte_carlo' parameter '{parameter}' must be <FMU>.<variable> of an FMU in 'initial_system_state'")
             
+            # Sensitivities (optional), logged as additional variables of their FMU
+            self.sensitivity = self.experiment.get("sensitivity") or {}
+            for fmu in self.sensitivity:
+                if fmu in (self.config.get("replay") or {}):
+                    raise ValueError(f"'sensitivity' of '{fmu}': sensitivities are only computed for FMUs, not replayed systems")
+
             # Logged values
             self.logged_values = self.experiment.get("logging", [])
             if not isinstance(self.logged_values, list):
                 raise ValueError("'logging' must be a dict")
+            self.logged_values = [*self.logged_values, *sensitivity_variables(self.sensitivity)]
 
             # For reading conditions
             self._parse_conditions(
@@ -457,12 +871,56 @@ class SimulationHandler:
             
             # Create logger for the experiment
             self.experimentLogger = ExperimentLogger(system = self)
+            self.checkpoint_handler = CheckpointHandler(os.path.join(self.log_folder, self.experiment_name))
 
         except KeyError as e:
             raise ValueError(f"Config missing required key: {e}")
         except TypeError as e:
             raise ValueError(f"Config has wrong type: {e}")
             
+    def register_run(self, experiment_file: str, fingerprint: str, started_at: float, files: Optional[list[str]] = None,
+                     reused: bool = False) -> None:
+        """
+        Adds the finished experiment to the results index, a broken index does not fail the run
+        """
+        try:
+            self.experimentLogger.register_run(
+                self.results_index,
+                files           = files,
+                experiment_file = os.path.abspath(experiment_file),
+                log_folder      = os.path.abspath(self.log_folder),
+                fingerprint     = fingerprint,
+                started_at      = started_at,
+                finished_at     = time.time(),
+                reused          = reused,
+            )
+        except Exception as e:
+            logger.error(f"Could not add {self.experiment_name} to the results index {self.results_index.path}: {e}")
+
+    async def run_monte_carlo(self, experiment_file: str) -> list[str]:
+        """
+        Runs the realizations of the experiment on a process pool, returns the result files
+        """
+        runner = MonteCarloRunner(
+            experiment_file   = experiment_file,
+            experiment        = self.experiment,
+            criteria          = [name for name, criterion in self.evaluation_equation_dic.items() if criterion.get("enabled", True)],
+            experiment_folder = os.path.join(self.log_folder, self.experiment_name),
+            base_port         = self.base_port,
+        )
+        result_files = await runner.run()
+        # indexed as one run, a criterion is evaluated and passed once per realization
+        self.experimentLogger.load_summary({
+            "stop_reason": "monte_carlo",
+            "stop_time": None,
+            "criteria": {
+                name: {"evaluations": stats["evaluated"], "passed": stats["passed"],
+                       "failed": stats["evaluated"] - stats["passed"], "first_failure": None}
+                for name, stats in runner.statistics.criteria.items()
+            },
+        })
+        return result_files
+
     ################################################################################
     ###########################   MAIN LOOP   ######################################
     ################################################################################
@@ -472,14 +930,87 @@ class SimulationHandler:
         for config in self.experiment_configs:
             experiment_files.append(os.path.join(config))
 
-        for experiment_file in experiment_files:
-            await self.initialize_experiment_params(experiment= experiment_file)
-            self.server_obj = await server_manager.create(experiment_config= self.config, port = self.base_port)
-            self.gather_system_ids()
-            self.client_obj = await client_manager.create(internal_servers = self.server_obj.internal_servers, 
-                                                          external_servers = self.server_obj.remote_servers, 
-                                                          node_ids= self.system_node_ids)
+        # the manifest allows continuing the run with "fmuil resume"
+        if not self.run_manifest.exists():
+            self.run_manifest.create(experiment_configs=experiment_files, base_port=self.base_port)
+        completed = self.run_manifest.load()["completed"]
+
+        if self.telemetry is not None:
+            await self.telemetry.start()
+
+        try:
+            for experiment_file in experiment_files:
+                if experiment_file in completed:
+                    print(f"Skipping completed experiment {experiment_file}")
+                    continue
+
+                if self.memory_profiler is not None:
+                    # also ends the previous experiment, whichever way it finished
+                    self.memory_profiler.begin(experiment_file)
+                await self.initialize_experiment_params(experiment= experiment_file)
+                started_at = time.time()
+
+                # unchanged experiments reuse their stored results
+                fingerprint = self.result_store.fingerprint(self.config)
+                if not self.force and self.result_store.contains(fingerprint):
+                    restored = self.result_store.restore(fingerprint, os.path.join(self.log_folder, self.experiment_name))
+                    print(f"Reusing stored results of {self.experiment_name}, the experiment is unchanged (use --force to run it)")
+                    summary = self.result_store.metadata(fingerprint).get("summary")
+                    if summary is not None:
+                        self.experimentLogger.load_summary(summary)
+                        self.register_run(experiment_file, fingerprint, started_at, files=restored, reused=True)
+                    self.run_manifest.mark_completed(experiment_file)
+                    continue
+
+                if self.monte_carlo:
+                    result_files = await self.run_monte_carlo(experiment_file)
+                    # unseeded samples differ on every run, there is nothing to reuse
+                    if self.monte_carlo["seed"] is not None:
+                        self.result_store.store(fingerprint, result_files,
+                                                metadata={"experiment_file": experiment_file, "log_folder": self.log_folder,
+                                                          "summary": self.experimentLogger.summary()})
+                    self.register_run(experiment_file, fingerprint, started_at, files=result_files)
+                    self.run_manifest.mark_completed(experiment_file)
+                    continue
+
+                checkpoint = self.load_checkpoint()
+                self.server_obj = await server_manager.create(experiment_config= self.config, port = self.base_port)
+                self.gather_system_ids()
+                self.verify_checkpoint_support()
+                self.profile_phase("servers_started")
+                try:
+                    self.client_obj = await client_manager.create(internal_servers = self.server_obj.internal_servers, 
+                                                                  external_servers = self.server_obj.remote_servers, 
+                                                                  node_ids= self.system_node_ids,
+                                                                  connection_pool= self.connection_pool)
+                except ClientConnectionError as e:
+                    # move on to the next experiment, this one stays incomplete in the run manifest
+                    logger.error(f"Skipping experiment {self.experiment_name}: {e}")
+                    for failure in e.failures:
+                        print(f"Connection failed: {failure.server_name} ({failure.url}) after {failure.attempts} attempt(s): {failure.error}")
+                    await self.server_obj.close()
+                    continue
+                self.profile_phase("clients_connected")
             
-            await self.run_experiment()
-            await self.server_obj.close()
-            await self.client_obj.close()
+                try:
+                    await self.run_experiment(checkpoint=checkpoint)
+                finally:
+                    self.close_signal_bus()
+                self.profile_phase("simulated")
+                await self.server_obj.close()
+                await self.client_obj.close()
+                self.server_obj = self.client_obj = self.plan = None
+
+                self.checkpoint_handler.clear()
+                self.result_store.store(fingerprint, self.experimentLogger.result_files,
+                                        metadata={"experiment_file": experiment_file, "log_folder": self.log_folder,
+                                                  "summary": self.experimentLogger.summary()})
+                self.register_run(experiment_file, fingerprint, started_at)
+                self.run_manifest.mark_completed(experiment_file)
+        finally:
+            # pooled external clients are kept open until the whole run ends
+            await self.connection_pool.close()
+            if self.telemetry is not None:
+                await self.telemetry.close()
+            if self.memory_profiler is not None:
+                self.memory_profiler.finish()
@@ -0,0 +1,72 @@
+import math
+import numpy as np
+
+class StepSizeController:
+    """
+    Adaptive communication step size based on the extrapolation error of the coupled signals.
+
+    After every step the new values are compared with the linear extrapolation of the two
+    previous communication points. The scaled error
+        err = max(|x - x_extrapolated| / (tolerance + relative_tolerance * |x|))
+    grows the step while the signals are smooth (err < 1) and shrinks it around transients.
+    Steps already taken are not repeated, the controller only chooses the next step.
+    Step sizes are multiples of min_step and stay within [min_step, max_step].
+    """
+    def __init__(self, tolerance: float, min_step: float, max_step: float, initial_step: float,
+                 relative_tolerance: float = 0.0, safety: float = 0.9,
+                 max_growth: float = 2.0, max_shrink: float = 0.2) -> None:
+        if min_step <= 0 or max_step < min_step:
+            raise ValueError("adaptive_step requires 0 < min_step <= max_step")
+        self.tolerance          = tolerance
+        self.relative_tolerance = relative_tolerance
+        self.min_step   = min_step
+        self.max_step   = max_step
+        self.safety     = safety
+        self.max_growth = max_growth
+        self.max_shrink = max_shrink
+        self.step       = self._bound(initial_step)
+        self.history: list[tuple[float, np.ndarray]] = [] # last two (time, values)
+        self.last_error = None
+
+    def _bound(self, step: float) -> float:
+        step = min(max(step, self.min_step), self.max_step)
+        # keep the communication points on the min_step grid
+        return max(math.floor(step / self.min_step + 1e-9), 1) * self.min_step
+
+    def error(self, time: float, values: np.ndarray) -> float | None:
+        if len(self.history) < 2 or values.size == 0:
+            return None
+        (t0, x0), (t1, x1) = self.history
+        if x0.shape != values.shape or t1 <= t0:
+            return None
+        extrapolated = x1 + (x1 - x0) * ((time - t1) / (t1 - t0))
+        scale = self.tolerance + self.relative_tolerance * np.abs(values)
+        return float(np.max(np.abs(values - extrapolated) / scale))
+
+    def update(self, time: float, values) -> float:
+        """
+        Takes the coupled signals at the new communication point, returns the next step size
+        """
+        values = np.asarray(values, dtype=float)
+        error = self.error(time, values)
+        self.last_error = error
+        if error is not None:
+            if error == 0:
+                factor = self.max_growth
+            else:
+                factor = min(self.max_growth, max(self.max_shrink, self.safety * error ** -0.5))
+            self.step = self._bound(self.step * factor)
+        self.history = (self.history + [(time, values)])[-2:]
+        return self.step
+
+    def get_state(self) -> dict:
+        return {
+            "step": self.step,
+            "history": [(time, values.tolist()) for time, values in self.history],
+            "last_error": self.last_error,
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.step       = state["step"]
+        self.history    = [(time, np.asarray(values, dtype=float)) for time, values in state["history"]]
+        self.last_error = state["last_error"]
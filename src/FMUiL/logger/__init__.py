@@ -1,3 +1,15 @@
-from .experiment_logger import ExperimentLogger
+from FMUiL.utils.lazy import lazy_exports
 
-__all__ = ["ExperimentLogger"]
\ No newline at end of file
+_EXPORTS = {
+    "ExperimentLogger":    ".experiment_logger",
+    "ResultStore":         ".result_store",
+    "ResultsIndex":        ".results_index",
+    "TelemetryPublisher":  ".telemetry",
+    "ProgressReporter":    ".telemetry",
+    "TrajectoryHistory":   ".history",
+    "MemoryProfiler":      ".memory_profiler",
+    "StreamingStatistics": ".streaming_stats",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
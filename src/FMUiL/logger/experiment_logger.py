@@ -1,13 +1,25 @@
+import json
 import os
+from functools import cached_property
+
+from FMUiL.logger.streaming_stats import StreamingStatistics
 
 # TODO: Make this dynamic
 DEFAULT_LOGS = {"Evaluation":"experiment_name, evaluation_name, evaluation_function, measured_value, experiment_result, system_timestamp\n",
-                "Values":"Experiment_name, System, Variable, Value, Time\n"}
+                "Values":"Experiment_name, System, Variable, Value, Time\n",
+                "Status":"experiment_name, stop_reason, stop_time\n"}
+SUMMARY_FILE = "Summary.json"
 
 class ExperimentLogger:
     def __init__(self, system: "SimulationHandler") -> None:
         self.system = system     
         self.log_file = self.generate_logfiles(system.log_folder) 
+        self.summary_file = os.path.join(os.path.dirname(self.log_file[0]), SUMMARY_FILE)
+        # criterion → evaluations, passed, failed, first_failure (see ResultsIndex), time_in_violation, last_evaluation
+        self.criteria_stats = {}
+        self.statistics  = StreamingStatistics(performance=self.system.experiment.get("performance"))
+        self.stop_reason = None
+        self.stop_time   = None
     
     @property
     def experiment_name(self):
@@ -23,17 +35,26 @@ class ExperimentLogger:
     
     @property
     def logging(self):
-        return self.system.experiment["logging"]
+        # the logged variables of the experiment and the sensitivities
+        return self.system.logged_values
     
     @property
     def config(self):
         return self.system.config
     
-    @property
+    @cached_property
     def logged_values(self):
+        # split once, the logger lives for a single experiment
         logged_values = [(num, part) for num, part in (item.split(".") for item in self.logging)]
         return logged_values
 
+    @cached_property
+    def evaluation_functions(self):
+        return {
+            criterea: f"{equation['target_obj']}.{equation['target_var']} {equation['operator']} {equation['value']}"
+            for criterea, equation in self.evaluation_equations.items()
+        }
+
     def generate_logfiles(self, folder_path, logs_with_headers=DEFAULT_LOGS):
         # Subfolder for the experiment
         experiment_folder = os.path.join(folder_path, self.experiment_name)
@@ -49,15 +70,52 @@ class ExperimentLogger:
         return file_paths
     
     def log_result(self, criterea, measured_value, evaluation_result, simulation_time):
+        if isinstance(measured_value, list):
+            # ensemble, one row per instance: criterion[i]
+            for instance, (value, result) in enumerate(zip(measured_value, evaluation_result)):
+                self._log_result(f"{criterea}[{instance}]", self.evaluation_functions[criterea], value, result, simulation_time)
+        else:
+            self._log_result(criterea, self.evaluation_functions[criterea], measured_value, evaluation_result, simulation_time)
+
+    def _log_result(self, criterea, evaluation_function, measured_value, evaluation_result, simulation_time):
+        stats = self.criteria_stats.setdefault(criterea, {"evaluations": 0, "passed": 0, "failed": 0, "first_failure": None,
+                                                          "time_in_violation": 0.0, "last_evaluation": None})
+        # a result holds until the next evaluation
+        self._add_violation(stats, float(simulation_time))
+        stats["last_evaluation"] = [float(simulation_time), bool(evaluation_result)]
+        stats["evaluations"] += 1
+        if evaluation_result:
+            stats["passed"] += 1
+        else:
+            stats["failed"] += 1
+            if stats["first_failure"] is None:
+                stats["first_failure"] = float(simulation_time)
         system_output = f"{self.config['experiment']['experiment_name']},\
             {criterea},\
-            {self.evaluation_equations[criterea]['target_obj']}.{self.evaluation_equations[criterea]['target_var']} {self.evaluation_equations[criterea]['operator']} {self.evaluation_equations[criterea]['value']},\
+            {evaluation_function},\
             {measured_value},\
             {evaluation_result},\
             {simulation_time}\n"
         self.write_to_log(output= system_output, filepath= self.log_file[0])
 
+    @staticmethod
+    def _add_violation(stats: dict, until: float) -> None:
+        if stats.get("last_evaluation") is None:
+            return
+        last_time, last_passed = stats["last_evaluation"]
+        if not last_passed and until > last_time:
+            stats["time_in_violation"] += until - last_time
+
     async def log_value(self, fmu, variable, value, sim_time):
+        if isinstance(value, list):
+            # ensemble, one row per instance: System[i]
+            for instance, instance_value in enumerate(value):
+                self._log_value(f"{fmu}[{instance}]", variable, instance_value, sim_time)
+        else:
+            self._log_value(fmu, variable, value, sim_time)
+
+    def _log_value(self, fmu, variable, value, sim_time):
+        self.statistics.update(f"{fmu}.{variable}", float(sim_time), value)
         system_output = f"{self.config['experiment']['experiment_name']},\
             {fmu},\
             {variable},\
@@ -65,6 +123,90 @@ class ExperimentLogger:
             {sim_time}\n"
         self.write_to_log(output= system_output, filepath= self.log_file[1])
     
+    def log_stop(self, reason, sim_time):
+        # why and when the experiment stopped: "stop_time" or the early exit rule
+        self.stop_reason = reason
+        self.stop_time   = float(sim_time)
+        for stats in self.criteria_stats.values():
+            self._add_violation(stats, self.stop_time)
+            if stats.get("last_evaluation") is not None:
+                stats["last_evaluation"][0] = self.stop_time
+        system_output = f"{self.config['experiment']['experiment_name']},\
+            {reason},\
+            {sim_time}\n"
+        self.write_to_log(output= system_output, filepath= self.log_file[2])
+        self.write_summary()
+
+    def write_summary(self) -> None:
+        """Writes the streaming statistics, control performance and criteria counts to Summary.json"""
+        summary = {
+            "experiment_name": self.experiment_name,
+            "stop_reason": self.stop_reason,
+            "stop_time": self.stop_time,
+            "criteria": {
+                criterea: {key: value for key, value in stats.items() if key != "last_evaluation"}
+                for criterea, stats in self.criteria_stats.items()
+            },
+            **self.statistics.summary(),
+        }
+        with open(self.summary_file, "w") as file:
+            json.dump(summary, file, indent=2)
+
+    @property
+    def result_files(self) -> list[str]:
+        """The log files and the summary when it was written"""
+        return self.log_file + ([self.summary_file] if os.path.exists(self.summary_file) else [])
+
+    def summary(self) -> dict:
+        """What the results index keeps of the experiment, also stored with the results (see write_summary for the statistics)"""
+        return {"stop_reason": self.stop_reason, "stop_time": self.stop_time, "criteria": self.criteria_stats}
+
+    def load_summary(self, summary: dict) -> None:
+        self.stop_reason    = summary["stop_reason"]
+        self.stop_time      = summary["stop_time"]
+        self.criteria_stats = summary["criteria"]
+
+    def register_run(self, index: "ResultsIndex", files: list[str] | None = None, **run) -> None:
+        """
+        Adds the experiment to the results index, files defaults to the log files.
+        run holds the other columns: experiment_file, log_folder, fingerprint, started_at, finished_at, reused
+        """
+        files = self.result_files if files is None else files
+        index.register(
+            run={
+                **run,
+                "experiment_name": self.experiment_name,
+                "folder": os.path.abspath(os.path.dirname(self.log_file[0])),
+                "stop_reason": self.stop_reason,
+                "stop_time": self.stop_time,
+                "files": [os.path.abspath(file) for file in files],
+            },
+            criteria=self.criteria_stats,
+        )
+
+    def get_offsets(self) -> list[int]:
+        # current size of every log file, used by the checkpoints
+        return [os.path.getsize(file_path) for file_path in self.log_file]
+
+    def truncate(self, offsets: list[int] | None = None) -> None:
+        """
+        Drops everything written after the given offsets.
+        Without offsets only the headers are kept and the statistics start over.
+        """
+        if offsets is None:
+            self.criteria_stats = {}
+            self.statistics     = StreamingStatistics(performance=self.system.experiment.get("performance"))
+            if os.path.exists(self.summary_file):
+                os.remove(self.summary_file)
+        for index, file_path in enumerate(self.log_file):
+            if offsets is None:
+                with open(file_path, "rb") as file:
+                    offset = len(file.readline())
+            else:
+                offset = offsets[index]
+            with open(file_path, "r+b") as file:
+                file.truncate(offset)
+
     def write_to_log(self, output, filepath, mode = "a"):
         with open(filepath, mode) as file:            
             file.write(output)
\ No newline at end of file
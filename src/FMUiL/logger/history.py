@@ -0,0 +1,132 @@
+import math
+import numpy as np
+
+class TrajectoryHistory:
+    """
+    Recent values of the logged variables in preallocated ring buffers, one column
+    per variable on a shared time axis. The oldest communication points are
+    overwritten once capacity is reached, so memory stays bounded on runs of any length.
+    Values that are not numbers (strings) are stored as NaN.
+
+    Queries return values in chronological order:
+    - latest(variable)                    → (time, value)
+    - window(variable, duration)          → (times, values) of the last duration seconds
+    - since(variable, start)              → (times, values) from the last point at or before start
+    - resample(variable, start, stop, step) → (times, values) on a regular grid
+    - rows(variables, before)             → [time, *values] of every stored point
+    """
+    def __init__(self, variables: list[str], capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.variables = list(variables)
+        self.index     = {variable: column for column, variable in enumerate(self.variables)}
+        self.capacity  = capacity
+        self.times  = np.full(capacity, np.nan)
+        self.values = np.full((capacity, len(self.variables)), np.nan)
+        self.count  = 0 # points appended so far
+
+    @classmethod
+    def for_horizon(cls, variables: list[str], horizon: float, step: float) -> "TrajectoryHistory":
+        """Enough capacity for horizon seconds at the smallest communication step"""
+        return cls(variables, capacity=math.ceil(horizon / step) + 1)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, time: float, values) -> None:
+        position = self.count % self.capacity
+        self.times[position]  = time
+        self.values[position] = [value if isinstance(value, (int, float, np.number)) else np.nan for value in values]
+        self.count += 1
+
+    def clear(self) -> None:
+        self.times[:]  = np.nan
+        self.values[:] = np.nan
+        self.count = 0
+
+    def get_state(self) -> dict:
+        positions = self._ordered()
+        return {
+            "variables": self.variables,
+            "count": self.count,
+            "times": self.times[positions].tolist(),
+            "values": self.values[positions].tolist(),
+        }
+
+    def set_state(self, state: dict) -> None:
+        if state["variables"] != self.variables:
+            raise ValueError("The stored history has different variables")
+        self.clear()
+        times  = np.asarray(state["times"], dtype=float)
+        values = np.asarray(state["values"], dtype=float).reshape(len(times), len(self.variables))
+        # the newest points that fit go back to their ring positions
+        points = min(len(times), self.capacity)
+        self.count = state["count"]
+        positions  = np.arange(self.count - points, self.count) % self.capacity
+        self.times[positions]  = times[len(times) - points:]
+        self.values[positions] = values[len(times) - points:]
+
+    def _ordered(self, last: int | None = None) -> np.ndarray:
+        # positions of the last stored points (all by default) from oldest to newest
+        last = len(self) if last is None else min(last, len(self))
+        return np.arange(self.count - last, self.count) % self.capacity
+
+    def _points_since(self, time: float) -> int:
+        # number of stored points at or after time, binary searched in both ring segments
+        if not self.count:
+            return 0
+        newest = (self.count - 1) % self.capacity
+        points = newest + 1 - int(np.searchsorted(self.times[:newest + 1], time))
+        if points == newest + 1 and len(self) > newest + 1:
+            older = self.times[newest + 1:]
+            points += len(older) - int(np.searchsorted(older, time))
+        return points
+
+    def _column(self, variable: str) -> int:
+        try:
+            return self.index[variable]
+        except KeyError:
+            raise KeyError(f"'{variable}' is not kept in the history, only logged and evaluated variables are")
+
+    def latest(self, variable: str) -> tuple[float, float]:
+        if not self.count:
+            raise LookupError("The history is empty")
+        position = (self.count - 1) % self.capacity
+        return float(self.times[position]), float(self.values[position, self._column(variable)])
+
+    def window(self, variable: str, duration: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """All stored points, or the ones of the last duration seconds"""
+        column = self._column(variable)
+        last = None
+        if duration is not None and self.count:
+            last = self._points_since(self.times[(self.count - 1) % self.capacity] - duration)
+        order = self._ordered(last)
+        return self.times[order], self.values[order, column]
+
+    def since(self, variable: str, start: float) -> tuple[np.ndarray, np.ndarray]:
+        """Points from the last one at or before start to the newest, empty if the history does not reach back to start"""
+        column = self._column(variable)
+        after = self._points_since(start + 1e-9)
+        if after >= len(self):
+            return np.empty(0), np.empty(0)
+        order = self._ordered(after + 1)
+        return self.times[order], self.values[order, column]
+
+    def rows(self, variables: list[str], before: float | None = None) -> list[list[float]]:
+        """[time, *values of the variables] of the stored points, only the ones before a time if given"""
+        columns = [self._column(variable) for variable in variables]
+        order = self._ordered()
+        if before is not None:
+            order = order[:len(order) - self._points_since(before)]
+        return [[time, *values] for time, values in zip(self.times[order].tolist(), self.values[np.ix_(order, columns)].tolist())]
+
+    def resample(self, variable: str, start: float, stop: float, step: float, interpolation: str = "linear") -> tuple[np.ndarray, np.ndarray]:
+        """Values on the grid start, start + step, ... <= stop, held constant outside the stored points"""
+        times, values = self.window(variable)
+        grid = np.arange(start, stop + step / 2, step)
+        if not len(times):
+            return grid, np.full(len(grid), np.nan)
+        if interpolation == "hold":
+            positions = np.clip(np.searchsorted(times, grid + 1e-9, side="right") - 1, 0, len(times) - 1)
+            return grid, values[positions]
+        return grid, np.interp(grid, times, values)
@@ -0,0 +1,152 @@
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+MEMORY_PROFILE_FILE = "MemoryProfile.json"
+MIB = 2 ** 20
+
+# allocations of the profiler and the import machinery are not of interest
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+def current_rss() -> int | None:
+    """Resident set size of the process in bytes, None if it cannot be read"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil # optional, e.g. on Windows
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+class MemoryProfiler:
+    """
+    Opt-in memory instrumentation of a run ("fmuil run --profile-memory").
+
+    Every experiment records the RSS at the phase boundaries begin, servers_started
+    (FMUs loaded and servers set up), clients_connected, simulated (after the simulation
+    loop) and teardown, and the traced Python memory (tracemalloc) with its peak from
+    servers_started on. The top allocation sites are reported for the loop and for what
+    is still allocated after teardown. Sites that retain memory after the teardown of
+    consecutive experiments are flagged as leaks. The profile is written to
+    MemoryProfile.json after every experiment.
+
+    Tracing is suspended while the FMUs are loaded and the servers set up: asyncua builds
+    the address space of every server in a worker thread, where tracemalloc slows the
+    allocations down by a factor of about fifty. That phase is measured by the RSS, which
+    also covers the native memory of the FMUs. Tracing restarts with empty traces, so
+    the traced memory at teardown is what the experiment retained.
+
+    An experiment ends when the next one begins or the run finishes, so cached, failed
+    and Monte Carlo experiments are measured as well (by the RSS only).
+    """
+    def __init__(self, output_file: str, top: int = 10, frames: int = 1, leak_threshold: float = MIB) -> None:
+        self.output_file    = output_file
+        self.top            = top
+        self.frames         = frames         # traceback depth of the allocation sites
+        self.leak_threshold = leak_threshold # bytes retained after teardown that flag an experiment
+        self.experiments: list[dict] = []
+        self.growing_sites: dict[str, dict] = {} # site → retained bytes of consecutive experiments
+        self._current = None
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def _top_sites(self, snapshot: tracemalloc.Snapshot) -> list[dict]:
+        # traces start empty at servers_started, everything in the snapshot was allocated since
+        return [
+            {"site": str(stat.traceback), "size": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.top]
+        ]
+
+    def begin(self, experiment: str) -> None:
+        self.end()
+        tracemalloc.stop()
+        gc.collect()
+        self._current = {"experiment": experiment, "started_at": time.time(), "phases": []}
+        self.phase("begin")
+
+    def phase(self, name: str) -> None:
+        """Records the memory at the end of a phase, the peak is the one since the previous phase"""
+        if self._current is None:
+            return
+        traced = peak = None
+        if tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self._current["phases"].append({"phase": name, "traced": traced, "traced_peak": peak, "rss": current_rss()})
+        if name == "simulated" and tracemalloc.is_tracing():
+            self._current["loop_sites"] = self._top_sites(self._snapshot())
+        if name == "servers_started":
+            tracemalloc.start(self.frames)
+
+    def end(self) -> None:
+        """Records the teardown of the current experiment and writes the profile"""
+        if self._current is None:
+            return
+        gc.collect()
+        self.phase("teardown")
+        current, self._current = self._current, None
+        first, last = current["phases"][0], current["phases"][-1]
+        current["retained"] = last["traced"]
+        current["rss_delta"] = None if first["rss"] is None or last["rss"] is None else last["rss"] - first["rss"]
+        current["peak"] = max((phase["traced_peak"] for phase in current["phases"] if phase["traced_peak"] is not None), default=None)
+        if tracemalloc.is_tracing():
+            teardown = self._snapshot()
+            current["retained_sites"] = self._top_sites(teardown)
+            self._track_growth(teardown.statistics("lineno"))
+            tracemalloc.stop()
+        current["leak_suspect"] = current["retained"] is not None and current["retained"] > self.leak_threshold
+        self.experiments.append(current)
+        self.report(current)
+        self.write()
+
+    def _track_growth(self, stats: list) -> None:
+        """Keeps the sites that retained memory in every traced experiment since they first did"""
+        retained = {str(stat.traceback): stat.size for stat in stats}
+        self.growing_sites = {
+            site: {"growth": [*self.growing_sites.get(site, {}).get("growth", []), size]}
+            for site, size in retained.items()
+        }
+
+    def leaks(self) -> list[dict]:
+        """Sites that retained memory after at least two consecutive experiments, largest first"""
+        leaks = [
+            {"site": site, "total_growth": sum(entry["growth"]), "growth": entry["growth"]}
+            for site, entry in self.growing_sites.items() if len(entry["growth"]) >= 2
+        ]
+        return sorted(leaks, key=lambda leak: leak["total_growth"], reverse=True)[:self.top]
+
+    def report(self, experiment: dict) -> None:
+        parts = []
+        if experiment["retained"] is not None:
+            parts.append(f"retained {experiment['retained'] / MIB:.2f} MiB, peak {experiment['peak'] / MIB:.2f} MiB")
+        if experiment["rss_delta"] is not None:
+            parts.append(f"RSS {experiment['rss_delta'] / MIB:+.2f} MiB")
+        print(f"Memory of {experiment['experiment']}: {', '.join(parts) or 'not measured'}")
+        if experiment["leak_suspect"]:
+            print("  Possible leak, still allocated after teardown:")
+            for site in experiment["retained_sites"][:3]:
+                print(f"    {site['site']}: {site['size'] / 1024:.1f} KiB")
+
+    def write(self) -> None:
+        profile = {"experiments": self.experiments, "leaks": self.leaks()}
+        tmp_file = f"{self.output_file}.tmp"
+        with open(tmp_file, "w") as file:
+            json.dump(profile, file, indent=2)
+        os.replace(tmp_file, self.output_file)
+
+    def finish(self) -> None:
+        self.end()
+        for leak in self.leaks()[:3]:
+            print(f"Memory grows across experiments at {leak['site']} ({leak['total_growth'] / 1024:+.1f} KiB)")
+        print(f"Memory profile written to {self.output_file}")
@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import tempfile
+
+from FMUiL import __version__
+from FMUiL.utils.hashing import content_hash, file_hash
+
+DEFAULT_STORE = os.path.join(".fmuil_cache", "results")
+ENTRY_FILE    = "entry.json"
+
+class ResultStore:
+    """
+    Local store of experiment results keyed by a fingerprint of everything that
+    determines them: the validated experiment config, the FMU file contents, the
+    external server configs, the replayed logs and the FMUiL version.
+
+    An entry holds the log files of one experiment (Values.csv, Evaluation.csv, ...).
+    Restoring an entry copies the files into the new log folder, so log files edited
+    in place do not change the stored entry.
+    """
+    def __init__(self, root: str = DEFAULT_STORE) -> None:
+        self.root = root
+        self._file_hashes: dict[tuple, str] = {} # (path, size, mtime) → hash, FMUs are shared by experiments
+
+    def _file_hash(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._file_hashes:
+            self._file_hashes[key] = file_hash(file_path)
+        return self._file_hashes[key]
+
+    def fingerprint(self, config: dict) -> str:
+        """config is the validated SimulationConfig as a dict"""
+        from FMUiL.handlers.config_handler import ExternalServerHandler
+        identity = {
+            "version": __version__,
+            "experiment": config["experiment"],
+            "fmu_files": [self._file_hash(fmu_file) for fmu_file in config["fmu_files"]],
+            "external_servers": [
+                ExternalServerHandler(server_file).dump_dict() for server_file in config.get("external_servers") or []
+            ],
+            "replay": {
+                name: {**source, "file": self._file_hash(source["file"])} for name, source in (config.get("replay") or {}).items()
+            },
+        }
+        return content_hash(json.dumps(identity, sort_keys=True, default=str).encode())
+
+    def entry_folder(self, fingerprint: str) -> str:
+        return os.path.join(self.root, fingerprint)
+
+    def contains(self, fingerprint: str) -> bool:
+        # the entry file is written last, a missing one means an incomplete entry
+        return os.path.exists(os.path.join(self.entry_folder(fingerprint), ENTRY_FILE))
+
+    def store(self, fingerprint: str, log_files: list[str], metadata: dict | None = None) -> None:
+        """Copies the log files of a finished experiment into the store"""
+        os.makedirs(self.root, exist_ok=True)
+        tmp_folder = tempfile.mkdtemp(dir=self.root, prefix=".tmp_")
+        try:
+            for log_file in log_files:
+                shutil.copy2(log_file, tmp_folder)
+            with open(os.path.join(tmp_folder, ENTRY_FILE), "w") as file:
+                json.dump({"files": [os.path.basename(f) for f in log_files], **(metadata or {})}, file, indent=2)
+            target = self.entry_folder(fingerprint)
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(tmp_folder, target)
+        except BaseException:
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+            raise
+
+    def metadata(self, fingerprint: str) -> dict:
+        with open(os.path.join(self.entry_folder(fingerprint), ENTRY_FILE)) as file:
+            return json.load(file)
+
+    def restore(self, fingerprint: str, experiment_folder: str) -> list[str]:
+        """Copies the stored log files into experiment_folder, returns the restored files"""
+        entry_folder = self.entry_folder(fingerprint)
+        with open(os.path.join(entry_folder, ENTRY_FILE)) as file:
+            entry = json.load(file)
+        os.makedirs(experiment_folder, exist_ok=True)
+        restored = []
+        for file_name in entry["files"]:
+            source = os.path.join(entry_folder, file_name)
+            target = os.path.join(experiment_folder, file_name)
+            if os.path.exists(target):
+                os.remove(target)
+            shutil.copy2(source, target)
+            restored.append(target)
+        return restored
@@ -0,0 +1,163 @@
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from FMUiL import __version__
+
+DEFAULT_INDEX = os.path.join(".fmuil_cache", "results.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id              INTEGER PRIMARY KEY,
+    experiment_name TEXT NOT NULL,
+    experiment_file TEXT,
+    log_folder      TEXT,
+    folder          TEXT,
+    fingerprint     TEXT,
+    version         TEXT,
+    started_at      REAL,
+    finished_at     REAL,
+    stop_reason     TEXT,
+    stop_time       REAL,
+    passed          INTEGER,
+    reused          INTEGER,
+    files           TEXT
+);
+CREATE TABLE IF NOT EXISTS criteria (
+    run_id        INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    criterion     TEXT NOT NULL,
+    evaluations   INTEGER,
+    passed        INTEGER,
+    failed        INTEGER,
+    first_failure REAL,
+    PRIMARY KEY (run_id, criterion)
+);
+CREATE INDEX IF NOT EXISTS runs_started    ON runs(started_at);
+CREATE INDEX IF NOT EXISTS runs_experiment ON runs(experiment_name, started_at);
+CREATE INDEX IF NOT EXISTS criteria_failed ON criteria(criterion, failed);
+"""
+
+DURATION_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def parse_since(text: str, now: float | None = None) -> float:
+    """
+    Unix time of a duration back from now ("30m", "12h", "7d", "2w")
+    or of an ISO date ("2025-01-31", "2025-01-31T12:00")
+    """
+    match = DURATION_PATTERN.match(text.strip())
+    if match:
+        return (now or time.time()) - float(match.group(1)) * DURATION_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(text.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"'{text}' is neither a duration (e.g. 7d, 12h) nor an ISO date") from None
+
+class ResultsIndex:
+    """
+    Local SQLite index of the finished experiments of all runs: one row per experiment
+    in runs (fingerprint, timings, stop reason and the log files) and one row per
+    evaluation criterion in criteria (pass/fail counts and the first failure time).
+    The trajectories stay in the log files, the index points to them.
+    """
+    def __init__(self, path: str = DEFAULT_INDEX) -> None:
+        self.path = path
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def register(self, run: dict, criteria: dict[str, dict]) -> int:
+        """
+        Adds a finished experiment, run has the columns of runs and criteria the
+        evaluations, passed, failed and first_failure of every criterion. Returns the run id.
+        """
+        connection = self.connect()
+        try:
+            with connection:
+                cursor = connection.execute(
+                    """INSERT INTO runs (experiment_name, experiment_file, log_folder, folder, fingerprint, version,
+                                         started_at, finished_at, stop_reason, stop_time, passed, reused, files)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        run["experiment_name"], run.get("experiment_file"), run.get("log_folder"), run.get("folder"),
+                        run.get("fingerprint"), __version__, run.get("started_at"), run.get("finished_at"),
+                        run.get("stop_reason"), run.get("stop_time"),
+                        int(all(stats["failed"] == 0 for stats in criteria.values())),
+                        int(run.get("reused", False)), json.dumps(run.get("files") or []),
+                    ),
+                )
+                run_id = cursor.lastrowid
+                connection.executemany(
+                    "INSERT INTO criteria (run_id, criterion, evaluations, passed, failed, first_failure) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (run_id, name, stats["evaluations"], stats["passed"], stats["failed"], stats["first_failure"])
+                        for name, stats in criteria.items()
+                    ],
+                )
+            return run_id
+        finally:
+            connection.close()
+
+    def query(self, experiment: str | None = None, criterion: str | None = None, failed: bool | None = None,
+              since: float | None = None, until: float | None = None, limit: int | None = 50) -> list[dict]:
+        """
+        Runs matching all given filters, newest first. With criterion every row also has
+        the counts of that criterion and failed filters on it, otherwise on the whole run.
+        """
+        select = "SELECT runs.*"
+        joins, conditions, parameters = "", [], []
+        if criterion is not None:
+            select += ", criteria.criterion, criteria.evaluations, criteria.passed AS criterion_passed, criteria.failed, criteria.first_failure"
+            joins = "JOIN criteria ON criteria.run_id = runs.id AND criteria.criterion = ?"
+            parameters.append(criterion)
+            if failed is not None:
+                conditions.append("criteria.failed > 0" if failed else "criteria.failed = 0")
+        elif failed is not None:
+            conditions.append("runs.passed = ?")
+            parameters.append(0 if failed else 1)
+        if experiment is not None:
+            conditions.append("runs.experiment_name = ?")
+            parameters.append(experiment)
+        if since is not None:
+            conditions.append("runs.started_at >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("runs.started_at < ?")
+            parameters.append(until)
+
+        sql = f"{select} FROM runs {joins}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY runs.started_at DESC, runs.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+
+        connection = self.connect()
+        try:
+            rows = [dict(row) for row in connection.execute(sql, parameters)]
+        finally:
+            connection.close()
+        for row in rows:
+            row["passed"] = bool(row["passed"])
+            row["reused"] = bool(row["reused"])
+            row["files"]  = json.loads(row["files"] or "[]")
+        return rows
+
+    def criteria(self, run_id: int) -> dict[str, dict]:
+        connection = self.connect()
+        try:
+            return {
+                row["criterion"]: {key: row[key] for key in ("evaluations", "passed", "failed", "first_failure")}
+                for row in connection.execute("SELECT * FROM criteria WHERE run_id = ? ORDER BY criterion", (run_id,))
+            }
+        finally:
+            connection.close()
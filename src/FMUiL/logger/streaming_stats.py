@@ -0,0 +1,205 @@
+import math
+import re
+
+# ensemble instances are logged as System[i].variable
+INSTANCE_PATTERN = re.compile(r"^(?P<system>[^\[\]]+)\[(?P<instance>\d+)\]\.(?P<variable>.+)$")
+
+class RunningStatistics:
+    """
+    Constant-memory aggregates of one logged variable: min, max, mean and variance
+    over the samples (Welford) and the time-weighted average (trapezoidal integral)
+    """
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum", "integral", "first_time", "last_time", "last")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean  = 0.0
+        self.m2    = 0.0
+        self.minimum  = math.inf
+        self.maximum  = -math.inf
+        self.integral = 0.0
+        self.first_time = None
+        self.last_time  = None
+        self.last       = None
+
+    def update(self, time: float, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2   += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if self.last_time is None:
+            self.first_time = time
+        elif time > self.last_time:
+            self.integral += (self.last + value) / 2 * (time - self.last_time)
+        self.last_time = time
+        self.last      = value
+
+    def get_state(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def set_state(self, state: dict) -> None:
+        for slot in self.__slots__:
+            setattr(self, slot, state[slot])
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def summary(self) -> dict:
+        duration = (self.last_time - self.first_time) if self.count else 0.0
+        return {
+            "count": self.count,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None,
+            "mean": self.mean if self.count else None,
+            "variance": self.variance,
+            "std": math.sqrt(self.variance),
+            "time_average": self.integral / duration if duration > 0 else self.last,
+            "last": self.last,
+        }
+
+class ControlPerformance:
+    """
+    Control performance of a variable that follows a setpoint, e = setpoint - value:
+    - iae, ise, itae: integrals of |e|, e² and t·|e| (trapezoidal)
+    - overshoot: largest excursion past the setpoint in the direction of the step from the
+      first value, also in percent of the step
+    - settling_time: time from which |e| stays within settling_band · |step|
+    """
+    __slots__ = ("settling_band", "iae", "ise", "itae", "initial", "setpoint", "peak",
+                 "settled_since", "last_time", "last_error")
+
+    def __init__(self, settling_band: float = 0.02) -> None:
+        self.settling_band = settling_band
+        self.iae  = 0.0
+        self.ise  = 0.0
+        self.itae = 0.0
+        self.initial  = None
+        self.setpoint = None
+        self.peak     = -math.inf # largest value - setpoint in the step direction
+        self.settled_since = None
+        self.last_time  = None
+        self.last_error = None
+
+    def update(self, time: float, value: float, setpoint: float) -> None:
+        error = setpoint - value
+        if self.last_time is None:
+            self.initial = value
+        elif time > self.last_time:
+            dt = time - self.last_time
+            self.iae  += (abs(self.last_error) + abs(error)) / 2 * dt
+            self.ise  += (self.last_error ** 2 + error ** 2) / 2 * dt
+            self.itae += (self.last_time * abs(self.last_error) + time * abs(error)) / 2 * dt
+        self.setpoint = setpoint
+        step = setpoint - self.initial
+        direction = 1.0 if step >= 0 else -1.0
+        self.peak = max(self.peak, (value - setpoint) * direction)
+        if abs(error) <= self.settling_band * abs(step):
+            if self.settled_since is None:
+                self.settled_since = time
+        else:
+            self.settled_since = None
+        self.last_time  = time
+        self.last_error = error
+
+    def get_state(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def set_state(self, state: dict) -> None:
+        for slot in self.__slots__:
+            setattr(self, slot, state[slot])
+
+    def summary(self) -> dict:
+        step = abs(self.setpoint - self.initial) if self.last_time is not None else 0.0
+        overshoot = max(self.peak, 0.0) if self.last_time is not None else None
+        return {
+            "setpoint": self.setpoint,
+            "iae": self.iae,
+            "ise": self.ise,
+            "itae": self.itae,
+            "overshoot": overshoot,
+            "overshoot_percent": overshoot / step * 100 if overshoot is not None and step > 0 else None,
+            "settling_time": self.settled_since,
+        }
+
+class StreamingStatistics:
+    """
+    Aggregates of every logged variable, updated while the values are logged, and the
+    control performance of the variables listed in performance:
+    {"FMU.variable": {"setpoint": number or logged "FMU.variable", "settling_band": 0.02}}.
+    Performance settings of an ensemble variable apply to every instance.
+    """
+    def __init__(self, performance: dict[str, dict] | None = None) -> None:
+        self.performance_config = performance or {}
+        self.variables:   dict[str, RunningStatistics]  = {}
+        self.performance: dict[str, ControlPerformance] = {}
+
+    def _performance_settings(self, name: str) -> tuple[dict | None, str | None]:
+        """Settings of the variable and the name of its setpoint variable (if any)"""
+        if name in self.performance_config:
+            settings = self.performance_config[name]
+            setpoint = settings["setpoint"]
+            return settings, setpoint if isinstance(setpoint, str) else None
+        match = INSTANCE_PATTERN.match(name)
+        if match is None:
+            return None, None
+        settings = self.performance_config.get(f"{match['system']}.{match['variable']}")
+        if settings is None:
+            return None, None
+        setpoint = settings["setpoint"]
+        if not isinstance(setpoint, str):
+            return settings, None
+        # the setpoint of the same instance when it comes from the ensemble as well
+        system, _, variable = setpoint.partition(".")
+        instance_setpoint = f"{system}[{match['instance']}].{variable}"
+        return settings, instance_setpoint if instance_setpoint in self.variables else setpoint
+
+    def update(self, name: str, time: float, value) -> None:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return # not a number, e.g. a string of an external server
+        statistics = self.variables.get(name)
+        if statistics is None:
+            statistics = self.variables[name] = RunningStatistics()
+        statistics.update(time, value)
+
+        if not self.performance_config:
+            return
+        settings, setpoint_variable = self._performance_settings(name)
+        if settings is None:
+            return
+        if setpoint_variable is None:
+            setpoint = float(settings["setpoint"])
+        elif setpoint_variable in self.variables:
+            setpoint = self.variables[setpoint_variable].last
+        else:
+            return # the setpoint has not been logged yet
+        performance = self.performance.get(name)
+        if performance is None:
+            performance = self.performance[name] = ControlPerformance(settling_band=settings["settling_band"])
+        performance.update(time, value, setpoint)
+
+    def summary(self) -> dict:
+        return {
+            "variables":   {name: statistics.summary() for name, statistics in self.variables.items()},
+            "performance": {name: performance.summary() for name, performance in self.performance.items()},
+        }
+
+    def get_state(self) -> dict:
+        return {
+            "variables":   {name: statistics.get_state() for name, statistics in self.variables.items()},
+            "performance": {name: performance.get_state() for name, performance in self.performance.items()},
+        }
+
+    def set_state(self, state: dict) -> None:
+        self.variables   = {}
+        self.performance = {}
+        for name, values in state["variables"].items():
+            statistics = self.variables[name] = RunningStatistics()
+            statistics.set_state(values)
+        for name, values in state["performance"].items():
+            performance = self.performance[name] = ControlPerformance()
+            performance.set_state(values)
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+class ProgressReporter:
+    """
+    Console progress of a running experiment, printed at most once per interval
+    (wall-clock seconds) on a single line: simulation time, steps per second,
+    real-time factor, ETA and the pass/fail counts of the evaluation criteria.
+    """
+    def __init__(self, stop_time: float, start_time: float = 0.0, interval: float = 1.0, stream=None) -> None:
+        self.stop_time  = stop_time
+        self.start_time = start_time
+        self.interval   = interval
+        self.stream     = stream or sys.stdout
+        self.steps  = 0
+        self.passed = 0
+        self.failed = 0
+        self.started_at  = time.monotonic()
+        self.last_report = self.started_at
+
+    def update(self, sim_time: float, results: list[bool] | None = None) -> None:
+        self.steps += 1
+        if results:
+            passed = sum(results)
+            self.passed += passed
+            self.failed += len(results) - passed
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.stream.write("\r" + self.status(sim_time, now))
+            self.stream.flush()
+
+    def status(self, sim_time: float, now: float | None = None) -> str:
+        elapsed = max((now or time.monotonic()) - self.started_at, 1e-9)
+        simulated = sim_time - self.start_time
+        real_time_factor = simulated / elapsed
+        eta = (self.stop_time - sim_time) / real_time_factor if real_time_factor > 0 else float("inf")
+        eta_text = time.strftime("%H:%M:%S", time.gmtime(eta)) if eta != float("inf") else "--:--:--"
+        return (f"t={sim_time:.2f}/{self.stop_time:g} s | {self.steps / elapsed:.0f} steps/s | "
+                f"RTF {real_time_factor:.1f}x | ETA {eta_text} | pass {self.passed} fail {self.failed}")
+
+    def finish(self, sim_time: float) -> None:
+        self.stream.write("\r" + self.status(sim_time) + "\n")
+        self.stream.flush()
+
+class TelemetrySubscriber:
+    """A connected client with a bounded frame queue, the oldest frames are dropped when it falls behind"""
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int) -> None:
+        self.writer  = writer
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.task    = asyncio.create_task(self._send())
+
+    def push(self, frame: bytes) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+    async def _send(self) -> None:
+        try:
+            while True:
+                frame = await self.queue.get()
+                self.writer.write(frame)
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.writer.close()
+
+class TelemetryPublisher:
+    """
+    Streams logged values and per-step metrics of the running experiments to
+    subscribers on a local socket ("unix:/path/to.sock" or "host:port").
+
+    Frames are JSON lines:
+    - {"type": "start", "experiment", "columns"} when an experiment starts (and on connect)
+    - {"type": "history", "experiment", "rows"} on connect during an experiment, the points
+      kept in the TrajectoryHistory that were already sent to the other subscribers
+    - {"type": "data", "experiment", "rows", "metrics", "dropped"} batched at most every
+      batch_interval seconds, a row is [time, *column values], metrics has one entry per step
+      and dropped counts the frames dropped for slow subscribers so far
+    - {"type": "end", "experiment", "reason", "time"} when an experiment stops
+    The simulation never waits for slow subscribers, their oldest frames are dropped instead.
+    """
+    def __init__(self, address: str, batch_interval: float = 0.2, max_batch: int = 1000, queue_size: int = 256) -> None:
+        self.address        = address
+        self.batch_interval = batch_interval
+        self.max_batch      = max_batch
+        self.queue_size     = queue_size
+        self.server      = None
+        self.subscribers: list[TelemetrySubscriber] = []
+        self.start_frame = None
+        self.experiment  = None
+        self.columns: list[str] = []
+        self.history     = None # TrajectoryHistory of the running experiment
+        self.rows:    list[list] = []
+        self.metrics: list[dict] = []
+        self.last_flush = time.monotonic()
+
+    async def start(self) -> None:
+        if self.address.startswith("unix:"):
+            path = self.address[len("unix:"):]
+            if os.path.exists(path):
+                os.remove(path)
+            self.server = await asyncio.start_unix_server(self._connected, path=path)
+        else:
+            host, _, port = self.address.rpartition(":")
+            self.server = await asyncio.start_server(self._connected, host or "127.0.0.1", int(port))
+        print(f"Telemetry available on {self.address}")
+
+    async def _connected(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscriber = TelemetrySubscriber(writer, self.queue_size)
+        if self.start_frame is not None:
+            subscriber.push(self.start_frame)
+            if self.history is not None and len(self.history):
+                # late subscribers catch up from the history, the pending rows follow with the next batch
+                rows = self.history.rows(self.columns, before=self.rows[0][0] if self.rows else None)
+                subscriber.push(self._encode({"type": "history", "experiment": self.experiment, "rows": rows}))
+        self.subscribers.append(subscriber)
+
+    @staticmethod
+    def _encode(frame: dict) -> bytes:
+        return json.dumps(frame, separators=(",", ":"), default=float).encode() + b"\n"
+
+    def _publish(self, frame: dict) -> bytes:
+        encoded = self._encode(frame)
+        self.subscribers = [s for s in self.subscribers if not s.task.done()]
+        for subscriber in self.subscribers:
+            subscriber.push(encoded)
+        return encoded
+
+    def begin(self, experiment: str, columns: list[str], history=None) -> None:
+        self.experiment = experiment
+        self.columns    = list(columns)
+        self.history    = history
+        self.rows, self.metrics = [], []
+        self.start_frame = self._publish({"type": "start", "experiment": experiment, "columns": columns})
+
+    def record(self, sim_time: float, values: list, metrics: dict) -> None:
+        """Adds the values and metrics of one step, sent with the next batch"""
+        self.rows.append([sim_time, *values])
+        self.metrics.append(metrics)
+        if len(self.rows) >= self.max_batch or time.monotonic() - self.last_flush >= self.batch_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self.last_flush = time.monotonic()
+        if not self.rows:
+            return
+        if self.subscribers:
+            dropped = sum(subscriber.dropped for subscriber in self.subscribers)
+            self._publish({"type": "data", "experiment": self.experiment, "rows": self.rows,
+                           "metrics": self.metrics, "dropped": dropped})
+        self.rows, self.metrics = [], []
+
+    def end(self, reason: str, sim_time: float) -> None:
+        self.flush()
+        self._publish({"type": "end", "experiment": self.experiment, "reason": reason, "time": sim_time})
+        self.start_frame = None
+        self.history     = None
+
+    async def close(self) -> None:
+        if self.server is None:
+            return
+        self.server.close()
+        # let the subscribers receive what is queued
+        for subscriber in self.subscribers:
+            try:
+                await asyncio.wait_for(self._drain(subscriber), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            subscriber.task.cancel()
+        await asyncio.gather(*(s.task for s in self.subscribers), return_exceptions=True)
+        self.subscribers.clear()
+        if self.address.startswith("unix:") and os.path.exists(self.address[len("unix:"):]):
+            os.remove(self.address[len("unix:"):])
+
+    @staticmethod
+    async def _drain(subscriber: TelemetrySubscriber) -> None:
+        while not subscriber.queue.empty() and not subscriber.task.done():
+            await asyncio.sleep(0.01)
@@ -1,5 +1,8 @@
-from typing import List, Literal, Dict, Optional
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from decimal import Decimal, localcontext
+from typing import List, Literal, Dict, Optional, Union
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
+
+STEP_PRECISION = Decimal("0.0001") # timestep precision of the internal servers
 
 class CustomVariable(BaseModel):
     id: Optional[int] = Field(
@@ -31,6 +34,90 @@ class InitialModelConfig(BaseModel):
     model_config = ConfigDict(extra="allow")  # accept arbitrary signal/param fields
     timestep: float = Field(description="Individual FMUs timestep")
 
+# Deadband for change detection of published outputs
+class Deadband(BaseModel):
+    absolute: float = Field(default=0.0, ge=0, description="Publish when the value changes by more than this")
+    relative: float = Field(default=0.0, ge=0, description="Publish when the value changes by more than this fraction of the last published value")
+
+# Adaptive communication step
+class AdaptiveStepConfig(BaseModel):
+    tolerance: float = Field(gt=0, description="Absolute tolerance on the extrapolation error of the coupled signals")
+    relative_tolerance: float = Field(default=0.0, ge=0, description="Relative tolerance on the extrapolation error of the coupled signals")
+    min_step: float = Field(gt=0, description="Smallest communication step in seconds, steps are multiples of it")
+    max_step: float = Field(gt=0, description="Largest communication step in seconds")
+
+    @field_validator("min_step", "max_step")
+    @classmethod
+    def check_precision(cls, step, info):
+        # the servers quantize timesteps to PRECISION_STR (see InternalServerSetup), off-grid steps would drift.
+        # The servers lower the global decimal precision, the check needs the default one
+        with localcontext(prec=28):
+            off_grid = Decimal(str(step)) % STEP_PRECISION != 0
+        if off_grid:
+            raise ValueError(f"{info.field_name} must be a multiple of {STEP_PRECISION} seconds")
+        return step
+
+# Early exit
+class SteadyStateExit(BaseModel):
+    band: float = Field(gt=0, description="Largest change of every monitored signal within the window")
+    window: float = Field(gt=0, description="Seconds the signals have to stay within the band")
+    signals: Optional[List[str]] = Field(default=None, description="Monitored logged variables, e.g., WaterTankSystem.PV_WaterLevel_out. All logged variables if not set")
+
+class EarlyExitConfig(BaseModel):
+    on_first_failure: bool = Field(default=False, description="Stop when an evaluation criterion fails")
+    all_passed_for: Optional[float] = Field(default=None, gt=0, description="Stop when all evaluation criteria have passed for this many seconds")
+    steady_state: Optional[SteadyStateExit] = Field(default=None, description="Stop when the monitored signals have settled")
+
+# Control performance
+class PerformanceConfig(BaseModel):
+    setpoint: Union[float, str] = Field(description="Reference of the variable, a number or a logged 'FMU.variable'")
+    settling_band: float = Field(default=0.02, gt=0, description="Settled when the error stays within this fraction of the step from the first value")
+
+# Sensitivities
+class SensitivityConfig(BaseModel):
+    outputs: List[str] = Field(min_length=1, description="Real outputs of the FMU")
+    with_respect_to: List[str] = Field(min_length=1, description="Real inputs and (tunable) parameters of the FMU")
+    method: Literal["auto", "directional", "finite_difference"] = Field(
+        default="auto",
+        description="finite_difference (perturbed FMU states, sensitivities along the trajectory, also auto) or directional (getDirectionalDerivative, inputs only, direct feedthrough partials logged as partial(output)/partial(variable))"
+        )
+    relative_step: float = Field(default=1e-4, gt=0, description="Finite difference perturbation relative to the value at the start, at least relative_step")
+    central: bool = Field(default=False, description="Central instead of forward differences, two perturbed states per variable")
+
+# Monte Carlo realizations
+class ParameterDistribution(BaseModel):
+    distribution: Literal["normal", "uniform", "lognormal", "triangular", "choice"] = Field(description="Distribution the value is drawn from")
+    mean: Optional[float] = Field(default=None, description="Mean of normal, mean of the underlying normal of lognormal")
+    std: Optional[float] = Field(default=None, ge=0, description="Standard deviation of normal, of the underlying normal of lognormal")
+    low: Optional[float] = Field(default=None, description="Lower bound of uniform and triangular")
+    high: Optional[float] = Field(default=None, description="Upper bound of uniform and triangular")
+    mode: Optional[float] = Field(default=None, description="Most likely value of triangular")
+    values: Optional[List[float]] = Field(default=None, description="Values of choice, drawn with equal probability")
+
+    @model_validator(mode="after")
+    def check_arguments(self):
+        required = {
+            "normal": ["mean", "std"], "lognormal": ["mean", "std"], "uniform": ["low", "high"],
+            "triangular": ["low", "mode", "high"], "choice": ["values"],
+        }[self.distribution]
+        missing = [name for name in required if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"'{self.distribution}' distribution needs {missing}")
+        if self.low is not None and self.high is not None and self.low > self.high:
+            raise ValueError("low must not be greater than high")
+        if self.values is not None and not self.values:
+            raise ValueError("values must not be empty")
+        return self
+
+class MonteCarloConfig(BaseModel):
+    realizations: int = Field(gt=0, description="Number of realizations")
+    parameters: Dict[str, ParameterDistribution] = Field(description="Sampled initial values keyed by 'FMU.variable', applied on top of initial_system_state")
+    seed: Optional[int] = Field(default=None, description="Seed of the sampling, results are only reused (see ResultStore) when set")
+    workers: Optional[int] = Field(default=None, gt=0, description="Processes running realizations, number of CPUs if not set")
+    confidence: float = Field(default=0.95, gt=0, lt=1, description="Confidence level of the reported intervals")
+    percentiles: List[float] = Field(default=[5.0, 50.0, 95.0], description="Reported percentiles of the measured values")
+    keep_logs: bool = Field(default=False, description="Keep Values.csv, Evaluation.csv and Status.csv of every realization")
+
 # Evaluation section
 class EvaluationCriteria(BaseModel):
     condition: str = Field(description="The condition to be evaluated, e.g., WaterTankSystem.PV_WaterLevel_out < 11.1")
@@ -42,6 +129,33 @@ class ExperimentConfig(BaseModel):
     timestep: float = Field(description="Communication timestep in seconds, e.g., when FMU's exchange data")
     timing: Literal["simulation_time", "real_time"] = Field(description="simulation_time performs simulations as fast as possible, real_time simulates in real time")
     stop_time: float = Field(description="stop time for the simulation in seconds")
+    adaptive_step: Optional[AdaptiveStepConfig] = Field(default=None, description="Adapts the communication step to the coupled signals, timestep is used as the initial step. Fixed step if not set")
+    early_exit: Optional[EarlyExitConfig] = Field(default=None, description="Rules to stop the experiment before stop_time, runs until stop_time if not set")
+    performance: Optional[Dict[str, PerformanceConfig]] = Field(
+        default=None,
+        description=(
+            "Logged variables following a setpoint, keyed by 'FMU.variable'. IAE, ISE, ITAE, overshoot and settling time\n"
+            "are written to Summary.json. Example: {WaterTankSystem.PV_WaterLevel_out: {setpoint: TankLevel_PI.SP_in}}"
+            )
+        )
+    sensitivity: Optional[Dict[str, SensitivityConfig]] = Field(
+        default=None,
+        description=(
+            "Sensitivities of FMU outputs computed along the trajectory, keyed by FMU name. They are logged as\n"
+            "'FMU.d(output)/d(variable)'. Example: {TankLevel_PI: {outputs: [CV_PumpCtrl_out], with_respect_to: [Kp, Ki]}}"
+            )
+        )
+    history_horizon: float = Field(default=60.0, gt=0, description="Seconds of simulation time of the logged and evaluated variables kept in memory (at least the steady_state window), see SimulationHandler.history")
+    ensemble: Optional[Dict[str, int]] = Field(
+        default=None,
+        description=(
+            "Instances of an FMU run side by side in one server, keyed by FMU name, e.g. {WaterTankSystem: 8}.\n"
+            "Its variables hold one value per instance, initial_system_state takes one value for all instances or a list per instance"
+            )
+        )
+    monte_carlo: Optional[MonteCarloConfig] = Field(default=None, description="Runs realizations with sampled initial values and reports aggregated statistics instead of a single run")
+    run_ahead_steps: int = Field(default=100, ge=1, description="FMUs without connected inputs are simulated this many communication steps ahead at once in simulation_time mode. 1 disables running ahead")
+    checkpoint_interval: Optional[float] = Field(default=None, gt=0, description="Simulation time in seconds between on-disk checkpoints, used by 'fmuil resume'. Disabled if not set")
     initial_system_state: Dict[str, InitialModelConfig] = Field(
         description=
             (
@@ -63,12 +177,47 @@ class ExperimentConfig(BaseModel):
     system_loop: Optional[List[Edge]] = Field(description="Defines how fmus and opc objects are connected")
     evaluation: Optional[dict[str, EvaluationCriteria]] = Field(description= "Evaluation criteria for the system. Each key identifies the test criterion name.")
     logging: List[str] = Field(description="List of simulation variable names to be logged. Example: WaterTankSystem.PV_WaterLevel_out")
+    deadbands: Optional[Dict[str, Deadband]] = Field(
+        default=None,
+        description=(
+            "Deadbands for publishing FMU outputs, keyed by 'FMU.variable' or by 'FMU' for all of its outputs.\n"
+            "Outputs are written to the OPC UA server only when they change by more than the deadband.\n"
+            "Outputs read by the experiment (system_loop, logging, evaluation, start_evaluating_conditions) "
+            "are always written exactly, deadbands only apply to outputs published for other clients.\n"
+            "Example: {WaterTankSystem: {absolute: 0.01}}"
+            )
+        )
+    publish: Optional[Dict[str, Union[Literal["all"], List[str]]]] = Field(
+        default=None,
+        description=(
+            "Variables published as OPC UA nodes per FMU, in addition to the ones referenced by the experiment.\n"
+            "Use 'all' to publish every input, output and parameter of the FMU. Example: {WaterTankSystem: [A, a]}"
+            )
+        )
+
+    @field_validator("ensemble")
+    @classmethod
+    def check_ensemble(cls, ensemble):
+        for fmu, instances in (ensemble or {}).items():
+            if instances < 1:
+                raise ValueError(f"ensemble of '{fmu}' needs at least one instance")
+        return ensemble
+
+# Replayed systems
+class ReplaySourceConfig(BaseModel):
+    file: str = Field(description="Recorded Values.csv log, example: logs/2025_01_01_12_00_00/baseline/Values.csv")
+    system: Optional[str] = Field(default=None, description="Recorded system name, defaults to the name of the replay source")
+    experiment: Optional[str] = Field(default=None, description="Recorded experiment name, needed when the log holds several experiments")
+    variables: Optional[List[str]] = Field(default=None, description="Replayed variables, all recorded variables of the system if not set")
+    interpolation: Literal["linear", "hold"] = Field(default="linear", description="Interpolation between recorded points")
+    timestep: Optional[float] = Field(default=None, gt=0, description="Internal timestep of the replay, defaults to the experiment timestep")
 
 # Top-level config
 class SimulationConfig(BaseModel):
     model_config = ConfigDict(populate_by_name=True, extra="ignore")
     fmu_files: List[str] = Field(description="List of relative FMU filepaths, example: fmus/WaterTankSystem.fmu")
     external_servers: List[str] = Field(description="List of relative filepaths to external server configuration file, example: servers/example_server.yaml")
+    replay: Optional[Dict[str, ReplaySourceConfig]] = Field(default=None, description="Systems replayed from recorded logs, usable in system_loop like an FMU")
     experiment: ExperimentConfig = Field(description="The experiment section in your configuration file")
 
 
@@ -1,3 +1,10 @@
-from .operations import ops
+from .lazy import lazy_exports
 
-__all__ = ["ops"]
\ No newline at end of file
+_EXPORTS = {
+    "ops":          ".operations",
+    "content_hash": ".hashing",
+    "file_hash":    ".hashing",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,21 @@
+import importlib
+
+def lazy_exports(package: str, exports: dict[str, str]):
+    """
+    Module __getattr__ and __dir__ of a package whose names (name → relative submodule)
+    are imported on first access, so that e.g. 'fmuil --help' does not load asyncua,
+    fmpy and numpy. Use as: __getattr__, __dir__ = lazy_exports(__name__, exports)
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*namespace, *exports})
+
+    return __getattr__, __dir__
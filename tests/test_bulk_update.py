@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from asyncua import ua
+
+from FMUiL.communications.server_setup import InternalServerSetup
+from FMUiL.handlers.execution_plan import SERVER_OBJECT
+from FMUiL.handlers.fmu_handler import FmuHandler
+
+class FakeSlave:
+    """The setters of an fmpy slave"""
+    def __init__(self) -> None:
+        self.calls = []
+
+    def setReal(self, references, values):
+        self.calls.append(("Real", references, values))
+
+    def setInteger(self, references, values):
+        self.calls.append(("Integer", references, values))
+
+    def setBoolean(self, references, values):
+        self.calls.append(("Boolean", references, values))
+
+class FakeNode:
+    def __init__(self, written: dict, node_id) -> None:
+        self.written, self.node_id = written, node_id
+
+    async def set_value(self, value) -> None:
+        self.written[self.node_id] = value
+
+def server() -> InternalServerSetup:
+    model = SimpleNamespace(
+        fmu_inputs     = {"u": {"id": 1, "type": "Real"}, "u_alias": {"id": 1, "type": "Real"},
+                          "mode": {"id": 1, "type": "Enumeration"}},
+        fmu_parameters = {"Kp": {"id": 2, "type": "Real"}, "enabled": {"id": 3, "type": "Boolean"},
+                          "n": {"id": 4, "type": "Integer"}},
+        fmu = FakeSlave(),
+    )
+    model.settable_names = FmuHandler.settable_names.func(model)
+    setup = InternalServerSetup()
+    setup.fmu = model
+    setup.written = {}
+    setup.server  = SimpleNamespace(get_node=lambda node_id: FakeNode(setup.written, node_id))
+    setup.server_variable_ids = {"u": "node_u", "u_alias": "node_alias", "Kp": "node_Kp", "mode": "node_mode"}
+    return setup
+
+def test_aliases_keep_all_names():
+    names = server().fmu.settable_names
+    assert names["Real"] == {1: ["u", "u_alias"], 2: ["Kp"]}
+    assert names["Integer"] == {1: ["mode"], 4: ["n"]}
+    assert names["Boolean"] == {3: ["enabled"]}
+
+def test_layout_groups_by_type_and_keeps_the_positions():
+    layout = server().bulk_layout(["Kp", "enabled", "u", "mode", "n"])
+    assert layout == {"Real": ([2, 1], [0, 2]), "Integer": ([1, 4], [3, 4]), "Boolean": ([3], [1])}
+    with pytest.raises(KeyError):
+        server().bulk_layout(["y"])
+
+def test_arguments_follow_the_update_bulk_signature():
+    setup = server()
+    layout = setup.bulk_layout(["Kp", "enabled", "u", "mode", "n"])
+    arguments = setup.bulk_arguments(layout, [1.6, 1, 0.5, 2.4, 7])
+    assert [argument.VariantType for argument in arguments] == [
+        ua.VariantType.UInt32, ua.VariantType.Double,
+        ua.VariantType.UInt32, ua.VariantType.Int32,
+        ua.VariantType.UInt32, ua.VariantType.Boolean,
+    ]
+    assert [argument.Value for argument in arguments] == [[2, 1], [1.6, 0.5], [1, 4], [2, 7], [3], [True]]
+
+def test_update_bulk_sets_the_fmu_and_every_alias_node():
+    setup = server()
+    layout = setup.bulk_layout(["u", "mode"])
+    asyncio.run(setup.update_bulk(SERVER_OBJECT, *setup.bulk_arguments(layout, [0.25, 3])))
+    assert setup.fmu.fmu.calls == [("Real", [1], [0.25]), ("Integer", [1], [3])]
+    assert setup.written == {"node_u": 0.25, "node_alias": 0.25, "node_mode": 3.0}
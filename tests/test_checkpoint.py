@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from FMUiL.handlers.checkpoint_handler import CheckpointHandler, CHECKPOINT_FILE, CHECKPOINT_VERSION
+from FMUiL.handlers.early_exit import EarlyExitMonitor
+from FMUiL.handlers.step_controller import StepSizeController
+from FMUiL.logger.history import TrajectoryHistory
+from FMUiL.logger.streaming_stats import StreamingStatistics
+
+def test_save_and_load_round_trip(tmp_path):
+    handler = CheckpointHandler(str(tmp_path))
+    assert handler.load() is None
+    checkpoint = {
+        "experiment_file": "exp.yaml",
+        "simulation_time": 5.0,
+        "fmu_states": {"Tank": {"fmu_state": b"\x00\x01state\xff", "fmu_time": "5.0000",
+                                "output_buffer": [("5.5000", [1.0, 2.0], [])], "sensitivity": [b"copy"]}},
+        "log_offsets": [10, 20, 30],
+    }
+    handler.save(checkpoint)
+    # the temporary file was swapped in place
+    assert os.listdir(tmp_path) == [CHECKPOINT_FILE]
+    loaded = handler.load()
+    assert loaded["version"] == CHECKPOINT_VERSION
+    assert loaded["fmu_states"]["Tank"]["fmu_state"] == b"\x00\x01state\xff"
+    assert loaded["fmu_states"]["Tank"]["sensitivity"] == [b"copy"]
+    assert loaded["fmu_states"]["Tank"]["output_buffer"] == [["5.5000", [1.0, 2.0], []]]
+    assert loaded["log_offsets"] == [10, 20, 30]
+
+    handler.clear()
+    assert handler.load() is None
+
+def test_save_keeps_the_previous_checkpoint_on_failure(tmp_path):
+    handler = CheckpointHandler(str(tmp_path))
+    handler.save({"simulation_time": 1.0})
+    with pytest.raises(TypeError):
+        handler.save({"simulation_time": 2.0, "live": object()}) # only plain data is stored
+    assert os.listdir(tmp_path) == [CHECKPOINT_FILE]
+    assert handler.load()["simulation_time"] == 1.0
+
+def test_other_versions_are_rejected(tmp_path):
+    with open(tmp_path / CHECKPOINT_FILE, "w") as file:
+        json.dump({"version": CHECKPOINT_VERSION + 1, "simulation_time": 1.0}, file)
+    with pytest.raises(ValueError, match="version"):
+        CheckpointHandler(str(tmp_path)).load()
+
+def through_json(state):
+    return json.loads(json.dumps(state))
+
+def test_history_state_round_trip():
+    history = TrajectoryHistory(["a", "b"], 4)
+    for time in range(6):
+        history.append(float(time), [float(time), "text"])
+    restored = TrajectoryHistory(["a", "b"], 4)
+    restored.set_state(through_json(history.get_state()))
+    assert len(restored) == 4 and restored.count == 6
+    times, values = restored.window("a")
+    assert list(times) == [2.0, 3.0, 4.0, 5.0] and list(values) == list(times)
+    assert np.isnan(restored.latest("b")[1])
+    # points appended after the restore continue the ring
+    restored.append(6.0, [6.0, 0.0])
+    assert list(restored.window("a")[0]) == [3.0, 4.0, 5.0, 6.0]
+    with pytest.raises(ValueError):
+        TrajectoryHistory(["a"], 4).set_state(history.get_state())
+
+def test_controller_monitor_and_statistics_state_round_trip():
+    controller = StepSizeController(tolerance=0.1, min_step=0.1, max_step=1.0, initial_step=0.1)
+    for time, value in [(0.0, 0.0), (0.1, 0.1), (0.2, 0.2)]:
+        controller.update(time, [value])
+    restored = StepSizeController(tolerance=0.1, min_step=0.1, max_step=1.0, initial_step=0.1)
+    restored.set_state(through_json(controller.get_state()))
+    assert restored.update(0.4, [0.4]) == controller.update(0.4, [0.4])
+
+    monitor = EarlyExitMonitor(all_passed_for=2.0)
+    monitor.record_results([True], 1.0)
+    restored = EarlyExitMonitor(all_passed_for=2.0)
+    restored.set_state(through_json(monitor.get_state()))
+    assert restored.check(3.0) == "all_passed"
+
+    statistics = StreamingStatistics(performance={"Tank.level": {"setpoint": 1.0, "settling_band": 0.1}})
+    for time in range(3):
+        statistics.update("Tank.level", float(time), time / 2)
+    restored = StreamingStatistics(performance={"Tank.level": {"setpoint": 1.0, "settling_band": 0.1}})
+    restored.set_state(through_json(statistics.get_state()))
+    assert restored.summary() == statistics.summary()
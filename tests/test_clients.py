@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from FMUiL.communications import clients
+from FMUiL.communications.clients import client_manager, ClientConnectionError, ConnectionFailure
+
+class FlakyClient:
+    """Client that fails the first connects of every url"""
+    failures: dict[str, int] = {}
+    disconnects = 0
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+    async def connect(self) -> None:
+        if self.failures.get(self.url, 0) > 0:
+            self.failures[self.url] -= 1
+            raise ConnectionRefusedError()
+
+    async def disconnect(self) -> None:
+        FlakyClient.disconnects += 1
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(clients, "Client", FlakyClient)
+    monkeypatch.setattr(clients.asyncio, "sleep", sleep)
+    FlakyClient.disconnects = 0
+    return delays
+
+def test_connect_retries_with_exponential_backoff(sleeps):
+    FlakyClient.failures = {"opc.tcp://a": 2}
+    client = asyncio.run(client_manager.connect_client("a", "opc.tcp://a"))
+    assert isinstance(client, FlakyClient)
+    assert sleeps == [0.5, 1.0]
+    assert FlakyClient.disconnects == 2 # every failed attempt is cleaned up
+
+def test_connect_gives_up_after_the_last_attempt(sleeps):
+    FlakyClient.failures = {"opc.tcp://a": 5}
+    failure = asyncio.run(client_manager.connect_client("a", "opc.tcp://a"))
+    assert failure == ConnectionFailure(server_name="a", url="opc.tcp://a", attempts=3, error="ConnectionRefusedError")
+    assert sleeps == [0.5, 1.0] # no wait after the last attempt
+
+def test_all_failures_are_reported_together(sleeps):
+    FlakyClient.failures = {"opc.tcp://a": 5, "opc.tcp://c": 5}
+    manager = client_manager()
+    connected = {}
+    with pytest.raises(ClientConnectionError) as error:
+        asyncio.run(manager._connect_all({"a": "opc.tcp://a", "b": "opc.tcp://b", "c": "opc.tcp://c"}, connected))
+    assert [failure.server_name for failure in error.value.failures] == ["a", "c"]
+    assert list(connected) == ["b"]
+    assert "a at opc.tcp://a after 3 attempt(s)" in str(error.value)
@@ -0,0 +1,73 @@
+import asyncio
+
+from asyncua import Client
+
+from FMUiL.communications.connection_pool import ConnectionPool
+
+URL = "opc.tcp://localhost:4840"
+
+def server(*variables: str, url: str = URL) -> dict:
+    return {"url": url, "objects": {"obj": {variable: {"name": f"ns=1;s={variable}"} for variable in variables}}}
+
+class FakeConnector:
+    """connect and resolve_node_ids of client_manager, without a server"""
+    def __init__(self, configs: dict) -> None:
+        self.configs  = configs
+        self.connects = 0
+        self.resolves = 0
+
+    async def connect(self, server_name: str, url: str) -> Client:
+        self.connects += 1
+        return Client(url=url)
+
+    def resolve(self, server_name: str) -> dict:
+        self.resolves += 1
+        return {variable: server_name for obj in self.configs[server_name]["objects"].values() for variable in obj}
+
+async def healthy(self, client) -> bool:
+    return True
+
+def acquire(pool: ConnectionPool, connector: FakeConnector, name: str):
+    return asyncio.run(pool.acquire(name, connector.configs[name], connector.connect, connector.resolve))
+
+def test_configs_sharing_an_endpoint_share_the_client_but_not_the_node_ids(monkeypatch):
+    monkeypatch.setattr(ConnectionPool, "_is_healthy", healthy)
+    connector = FakeConnector({"a": server("x"), "b": server("y")})
+    pool = ConnectionPool()
+    a = acquire(pool, connector, "a")
+    a.variant_types["x"] = "Double"
+    b = acquire(pool, connector, "b")
+    assert connector.connects == 1
+    assert a.client is b.client
+    assert a.node_ids == {"x": "a"} and b.node_ids == {"y": "b"}
+    assert b.variant_types == {}
+
+    again = acquire(pool, connector, "a")
+    assert again is a
+    assert again.variant_types == {"x": "Double"}
+    assert connector.resolves == 2
+
+def test_changed_config_resolves_the_node_ids_again(monkeypatch):
+    monkeypatch.setattr(ConnectionPool, "_is_healthy", healthy)
+    connector = FakeConnector({"a": server("x")})
+    pool = ConnectionPool()
+    acquire(pool, connector, "a")
+    connector.configs["a"] = server("x", "z")
+    connection = acquire(pool, connector, "a")
+    assert connection.node_ids == {"x": "a", "z": "a"}
+    assert connector.resolves == 2 and connector.connects == 1
+
+def test_broken_client_is_replaced_for_every_server(monkeypatch):
+    connector = FakeConnector({"a": server("x"), "b": server("y")})
+    pool = ConnectionPool()
+    monkeypatch.setattr(ConnectionPool, "_is_healthy", healthy)
+    first = acquire(pool, connector, "a").client
+
+    async def broken(self, client) -> bool:
+        return False
+    monkeypatch.setattr(ConnectionPool, "_is_healthy", broken)
+    b = acquire(pool, connector, "b")
+    monkeypatch.setattr(ConnectionPool, "_is_healthy", healthy)
+    a = acquire(pool, connector, "a")
+    assert connector.connects == 2
+    assert a.client is b.client is not first
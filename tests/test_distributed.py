@@ -0,0 +1,112 @@
+import asyncio
+import os
+
+import pytest
+
+from FMUiL.distributed.protocol import (
+    DEFAULT_WORKER_PORT, ProtocolError, content_hash, expect_message, parse_address, read_message, send_message,
+)
+from FMUiL.distributed.worker import Worker
+
+TOKEN = "secret"
+
+class BufferWriter:
+    """The part of asyncio.StreamWriter used by send_message"""
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+def messages(data: bytes) -> list[tuple[dict, bytes]]:
+    async def read_all():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        result = []
+        while True:
+            try:
+                result.append(await read_message(reader))
+            except ConnectionError:
+                return result
+    return asyncio.run(read_all())
+
+def framed(*items: tuple[dict, bytes]) -> bytes:
+    writer = BufferWriter()
+    async def write_all():
+        for message, payload in items:
+            await send_message(writer, message, payload)
+    asyncio.run(write_all())
+    return bytes(writer.data)
+
+@pytest.fixture
+def worker(tmp_path) -> Worker:
+    return Worker(host="127.0.0.1", port=0, capacity=1, base_port=7500, work_dir=str(tmp_path), token=TOKEN)
+
+########### Protocol ###########
+def test_messages_keep_their_payloads_apart():
+    payload = b"binary\ncontent\x00"
+    data = framed(({"type": "file", "hash": "abc"}, payload), ({"type": "hello"}, b""))
+    assert messages(data) == [({"type": "file", "hash": "abc"}, payload), ({"type": "hello"}, b"")]
+
+def test_malformed_header_is_a_protocol_error():
+    with pytest.raises(ProtocolError, match="Malformed"):
+        messages(b"not json\n")
+
+def test_expect_message_raises_on_errors_and_other_types():
+    async def expect(data: bytes, message_type: str):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await expect_message(reader, message_type)
+    with pytest.raises(ProtocolError, match="rejected"):
+        asyncio.run(expect(framed(({"type": "error", "message": "rejected"}, b"")), "info"))
+    with pytest.raises(ProtocolError, match="Expected 'info'"):
+        asyncio.run(expect(framed(({"type": "hello"}, b"")), "info"))
+
+def test_parse_address():
+    assert parse_address("host:9000") == ("host", 9000)
+    assert parse_address("host") == ("host", DEFAULT_WORKER_PORT)
+
+########### Worker ###########
+def test_cached_files_stay_in_the_file_folder(worker):
+    digest = content_hash(b"fmu")
+    assert worker.cached_file(digest, ".fmu") == os.path.join(worker.file_dir, f"{digest}.fmu")
+    for file_hash, suffix in ((digest, "/../../escape.py"), (digest, ".py"), ("../" + digest, ".fmu"), (digest[:-1], ".fmu")):
+        with pytest.raises(ProtocolError):
+            worker.cached_file(file_hash, suffix)
+
+def test_localize_rejects_files_that_were_not_sent(worker):
+    digest = content_hash(b"fmu")
+    config = worker.localize({"fmu_files": [digest], "external_servers": []}, {digest: ".fmu"})
+    assert config["fmu_files"] == [worker.cached_file(digest, ".fmu")]
+    with pytest.raises(ProtocolError, match="was not sent"):
+        worker.localize({"fmu_files": [content_hash(b"other")]}, {digest: ".fmu"})
+
+def handle(worker: Worker, message: dict) -> list[tuple[dict, bytes]]:
+    request = framed((message, b""))
+    async def connection():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        reader.feed_eof()
+        writer = BufferWriter()
+        await worker.handle_connection(reader, writer)
+        assert writer.closed
+        return bytes(writer.data)
+    return messages(asyncio.run(connection()))
+
+def test_requests_need_the_token(worker):
+    assert handle(worker, {"type": "hello", "token": TOKEN}) == [({"type": "info", "capacity": 1, "running": 0}, b"")]
+    for message in ({"type": "hello"}, {"type": "hello", "token": "wrong"}, {"type": "run", "token": None, "job_id": "x"}):
+        assert handle(worker, message) == [({"type": "error", "message": "Invalid worker token"}, b"")]
+
+def test_worker_without_a_token_generates_one(tmp_path):
+    worker = Worker(host="127.0.0.1", port=0, capacity=1, base_port=7500, work_dir=str(tmp_path))
+    assert worker.generated_token and len(worker.token) >= 32
@@ -0,0 +1,50 @@
+import pytest
+
+from FMUiL.handlers.early_exit import EarlyExitMonitor
+from FMUiL.logger.history import TrajectoryHistory
+
+def test_first_failure():
+    monitor = EarlyExitMonitor(on_first_failure=True)
+    monitor.record_results(None, 1.0)
+    assert monitor.check(1.0) is None
+    monitor.record_results([True, False], 2.0)
+    assert monitor.check(2.0) == "first_failure"
+
+def test_all_passed_for_restarts_on_a_failure():
+    monitor = EarlyExitMonitor(all_passed_for=2.0)
+    for time, results in ((1.0, [True]), (2.0, [False]), (3.0, [True]), (4.0, [True])):
+        monitor.record_results(results, time)
+        assert monitor.check(time) is None
+    monitor.record_results([True], 5.0)
+    assert monitor.check(5.0) == "all_passed"
+
+def steady_run(levels: list[float], window: float = 2.0) -> tuple[float | None, EarlyExitMonitor]:
+    monitor = EarlyExitMonitor(steady_state={"band": 0.1, "window": window, "signals": None})
+    monitor.columns = ["Tank.level"]
+    history = TrajectoryHistory.for_horizon(["Tank.level", "Tank.mode"], horizon=window, step=0.5)
+    for step, level in enumerate(levels):
+        time = step * 0.5
+        history.append(time, [level, "on"])
+        if monitor.check(time, history):
+            return time, monitor
+    return None, monitor
+
+def test_steady_state_needs_a_whole_window_within_band():
+    time, monitor = steady_run([1.0, 1.02, 1.04, 1.06, 1.08])
+    assert time == 2.0 and monitor.reason == "steady_state"
+    time, _ = steady_run([0.0, 0.5, 1.0, 1.0, 1.05, 1.0, 1.0, 1.0])
+    assert time == 3.0 # settled from t=1.0
+    assert steady_run([0.0, 0.2, 0.4, 0.6, 0.8, 1.0, 1.2])[0] is None
+
+def test_string_signals_never_settle():
+    monitor = EarlyExitMonitor(steady_state={"band": 0.1, "window": 1.0, "signals": None})
+    monitor.columns = ["Tank.mode"]
+    history = TrajectoryHistory(["Tank.mode"], 8)
+    for time in range(5):
+        history.append(float(time), ["on"])
+    assert monitor.check(4.0, history) is None
+
+def test_steady_state_without_history_or_columns():
+    monitor = EarlyExitMonitor(steady_state={"band": 0.1, "window": 1.0, "signals": None})
+    assert monitor.check(10.0) is None
+    assert monitor.check(10.0, TrajectoryHistory(["a"], 4)) is None
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from FMUiL.handlers.execution_plan import ExecutionPlan
+
+class FakeClient:
+    def get_node(self, node_id):
+        return node_id
+
+def system(logged, conditions, criteria, instances=None):
+    instances = instances or {}
+    clients = SimpleNamespace(internal_clients={}, get_client=lambda client_name: FakeClient(), variant_types={})
+    return SimpleNamespace(
+        client_obj       = clients,
+        system_node_ids  = {name: {var: f"{name}.{var}" for var in ("h", "q", "u", "e")} for name in ("Tank", "PI")},
+        server_obj       = SimpleNamespace(internal_servers={
+            name: SimpleNamespace(instances=instances.get(name, 1)) for name in ("Tank", "PI")
+        }),
+        free_running     = [],
+        connections      = [],
+        direct_routes    = [],
+        experimentLogger = SimpleNamespace(logged_values=logged),
+        reading_condition_dict  = conditions,
+        evaluation_equation_dic = criteria,
+    )
+
+def parsed(target: str, enabled: bool = True) -> dict:
+    system_name, _, variable = target.partition(".")
+    return {"target_obj": system_name, "target_var": variable, "operator": "<", "value": 1.0, "enabled": enabled}
+
+def test_evaluated_variables_that_are_not_logged_are_watched_once():
+    plan = ExecutionPlan.build(system(
+        logged=[("Tank", "h")],
+        conditions={"start": parsed("PI.u")},
+        criteria={"e1": parsed("Tank.h"), "e2": parsed("PI.u"), "e3": parsed("Tank.q"), "off": parsed("PI.e", enabled=False)},
+    ))
+    assert [(probe.system, probe.variable) for probe in plan.watched] == [("PI", "u"), ("Tank", "q")]
+    assert plan.conditions[0].watched == 0
+    assert [criterion.watched for criterion in plan.criteria] == [None, 0, 1]
+    assert plan.history_columns == ["Tank.h", "PI.u", "Tank.q"]
+
+def test_watched_ensemble_variables_have_a_column_per_instance():
+    plan = ExecutionPlan.build(system(logged=[], conditions={}, criteria={"e1": parsed("PI.u")}, instances={"PI": 2}))
+    assert plan.history_columns == ["PI[0].u", "PI[1].u"]
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from FMUiL.logger.history import TrajectoryHistory
+
+def filled(points: int, capacity: int = 4) -> TrajectoryHistory:
+    history = TrajectoryHistory(["a", "b"], capacity)
+    for time in range(points):
+        history.append(float(time), [float(time), 10.0 * time])
+    return history
+
+def test_capacity_for_a_horizon():
+    assert TrajectoryHistory.for_horizon(["a"], horizon=10.0, step=0.5).capacity == 21
+    with pytest.raises(ValueError):
+        TrajectoryHistory(["a"], 0)
+
+@pytest.mark.parametrize("points", [0, 1, 3, 4, 5, 11])
+def test_window_returns_the_newest_points_in_order(points):
+    history = filled(points)
+    times, values = history.window("b")
+    expected = np.arange(max(points - 4, 0), points, dtype=float)
+    assert list(times) == list(expected)
+    assert list(values) == list(10.0 * expected)
+    assert len(history) == min(points, 4)
+
+@pytest.mark.parametrize("points", [3, 4, 6, 7])
+def test_window_of_a_duration(points):
+    history = filled(points)
+    times, _ = history.window("a", 1.5)
+    assert list(times) == [points - 2.0, points - 1.0]
+    times, _ = history.window("a", 2.0)
+    assert list(times) == [points - 3.0, points - 2.0, points - 1.0]
+
+def test_since_needs_a_point_at_or_before_start():
+    history = filled(7) # keeps 3 .. 6
+    assert list(history.since("a", 4.5)[0]) == [4.0, 5.0, 6.0]
+    assert list(history.since("a", 3.0)[0]) == [3.0, 4.0, 5.0, 6.0]
+    assert len(history.since("a", 2.5)[0]) == 0
+    assert list(history.since("a", 6.0)[0]) == [6.0]
+
+def test_latest_and_unknown_variables():
+    history = filled(6)
+    assert history.latest("b") == (5.0, 50.0)
+    with pytest.raises(KeyError):
+        history.latest("c")
+    history.clear()
+    with pytest.raises(LookupError):
+        history.latest("a")
+
+def test_non_numeric_values_are_stored_as_nan():
+    history = TrajectoryHistory(["a", "b", "c"], 2)
+    history.append(0.0, [1.0, "on", None])
+    history.append(1.0, [2, True, np.float32(0.5)])
+    _, values = history.window("b")
+    assert np.isnan(values[0]) and values[1] == 1.0
+    assert np.isnan(history.window("c")[1][0])
+    assert history.latest("a") == (1.0, 2.0)
+
+def test_resample():
+    history = filled(3, capacity=8)
+    grid, values = history.resample("a", 0.0, 2.0, 0.5)
+    assert list(grid) == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert list(values) == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert list(history.resample("a", 0.0, 2.0, 0.5, "hold")[1]) == [0.0, 0.0, 1.0, 1.0, 2.0]
+
+def test_rows_of_selected_variables_before_a_time():
+    history = filled(6)
+    assert history.rows(["b", "a"]) == [[2.0, 20.0, 2.0], [3.0, 30.0, 3.0], [4.0, 40.0, 4.0], [5.0, 50.0, 5.0]]
+    assert history.rows(["a"], before=4.0) == [[2.0, 2.0], [3.0, 3.0]]
+    assert history.rows(["a"], before=1.0) == []
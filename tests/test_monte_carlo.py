@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from FMUiL.handlers.monte_carlo import MonteCarloStatistics, OutcomeCollector, draw_samples
+
+PARAMETERS = {
+    "A.normal":     {"distribution": "normal", "mean": 1.0, "std": 0.5},
+    "A.lognormal":  {"distribution": "lognormal", "mean": 0.0, "std": 0.1},
+    "A.uniform":    {"distribution": "uniform", "low": 2.0, "high": 3.0},
+    "A.triangular": {"distribution": "triangular", "low": 0.0, "mode": 1.0, "high": 4.0},
+    "A.choice":     {"distribution": "choice", "values": [1.0, 5.0]},
+}
+
+def test_samples_are_reproducible_and_within_their_distributions():
+    samples = draw_samples(PARAMETERS, 500, seed=3)
+    assert samples == draw_samples(PARAMETERS, 500, seed=3)
+    assert samples != draw_samples(PARAMETERS, 500, seed=4)
+    assert len(samples) == 500 and set(samples[0]) == set(PARAMETERS)
+    column = lambda name: np.array([sample[name] for sample in samples])
+    assert column("A.normal").mean() == pytest.approx(1.0, abs=0.1)
+    assert column("A.lognormal").min() > 0
+    assert 2.0 <= column("A.uniform").min() and column("A.uniform").max() <= 3.0
+    assert 0.0 <= column("A.triangular").min() and column("A.triangular").max() <= 4.0
+    assert set(column("A.choice")) == {1.0, 5.0}
+    assert all(type(value) is float for value in samples[0].values())
+
+def test_wilson_interval():
+    statistics = MonteCarloStatistics([], confidence=0.95)
+    low, high = statistics.interval(8, 10)
+    assert low == pytest.approx(0.4902, abs=1e-4) and high == pytest.approx(0.9433, abs=1e-4)
+    assert statistics.interval(0, 40) == [pytest.approx(0.0, abs=1e-12), pytest.approx(0.0876, abs=1e-4)]
+    assert statistics.interval(40, 40)[1] == pytest.approx(1.0)
+    assert all(np.isnan(statistics.interval(0, 0)))
+
+def test_outcomes_are_aggregated_per_criterion():
+    collector = OutcomeCollector()
+    collector.record("eval", 2.0, True)
+    collector.record("eval", 5.0, False)
+    collector.record("eval", 1.0, True)
+    collector.record("ensemble", [1.0, 3.0], [True, False])
+    assert collector.criteria["eval"] == {"passed": False, "final": 1.0, "min": 1.0, "max": 5.0}
+    assert collector.criteria["ensemble[0]"]["passed"] and not collector.criteria["ensemble[1]"]["passed"]
+    assert not collector.passed
+
+    statistics = MonteCarloStatistics(["eval"], percentiles=[50.0])
+    statistics.add({"passed": False, "stop_reason": "stop_time", "criteria": collector.criteria})
+    statistics.add({"passed": True, "stop_reason": "all_passed", "criteria": {"eval": {"passed": True, "final": 3.0, "min": 0.0, "max": 3.0}}})
+    statistics.add({"error": "RuntimeError()"})
+    summary = statistics.summary()
+    assert (summary["realizations"], summary["completed"], summary["errors"]) == (3, 2, 1)
+    assert summary["pass_rate"]["value"] == 0.5
+    assert summary["stop_reasons"] == {"stop_time": 1, "all_passed": 1}
+    assert summary["criteria"]["eval"]["final"]["mean"] == 2.0
+    assert summary["criteria"]["eval"]["final"]["percentiles"] == {"p50": 2.0}
@@ -0,0 +1,40 @@
+from FMUiL.communications.publication import PublicationPolicy
+
+VARIABLES = ["h", "q_in", "q_out", "A", "a", "b"]
+
+def experiment(**sections) -> dict:
+    return {"experiment": {
+        "system_loop": [{"from": "PI.u", "to": "Tank.q_in"}],
+        "logging": ["Tank.h"],
+        "evaluation": {"eval_1": {"condition": "Tank.q_out < 11.1", "enabled": True}},
+        "start_evaluating_conditions": {"start": "PI.u > 0.01"},
+        "initial_system_state": {"Tank": {"timestep": 0.1, "A": 20}},
+        **sections,
+    }}
+
+def test_only_referenced_variables_are_published_in_order():
+    policy = PublicationPolicy.from_experiment_config(experiment())
+    assert policy.published("Tank", VARIABLES) == ["h", "q_in", "q_out", "A"]
+    assert policy.published("PI", ["u", "Kp"]) == ["u"]
+    assert policy.published("Other", VARIABLES) == []
+
+def test_publish_section_adds_variables_or_publishes_all():
+    policy = PublicationPolicy.from_experiment_config(experiment(publish={"Tank": ["b"], "PI": "all"}))
+    assert policy.published("Tank", VARIABLES) == ["h", "q_in", "q_out", "A", "b"]
+    assert policy.published("PI", ["u", "Kp"]) == ["u", "Kp"]
+
+def test_deadbands_per_output_override_the_fmu():
+    policy = PublicationPolicy.from_experiment_config(experiment(publish={"Tank": "all"}, deadbands={
+        "Tank":   {"absolute": 0.1},
+        "Tank.b": {"absolute": 0.01, "relative": 0.001},
+    }))
+    assert policy.deadband("Tank", "b") == (0.01, 0.001)
+    assert policy.deadband("Tank", "a") == (0.1, 0.0)
+    assert policy.deadband("PI", "u") == (0.0, 0.0)
+
+def test_outputs_read_by_the_experiment_have_no_deadband():
+    policy = PublicationPolicy.from_experiment_config(experiment(deadbands={"Tank": {"absolute": 0.1}, "PI.u": {"absolute": 1.0}}))
+    # logged, evaluated and connected values stay exact
+    assert policy.deadband("Tank", "h") == (0.0, 0.0)
+    assert policy.deadband("Tank", "q_out") == (0.0, 0.0)
+    assert policy.deadband("PI", "u") == (0.0, 0.0)
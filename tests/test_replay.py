@@ -0,0 +1,47 @@
+import pytest
+
+from FMUiL.handlers.replay_handler import TraceReader
+
+HEADER = "Experiment_name, System, Variable, Value, Time\n"
+
+def row(experiment: str, system: str, variable: str, value, time: float) -> str:
+    return f"{experiment},            {system},            {variable},            {value},            {time}\n"
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "Values.csv"
+    path.write_text(HEADER + "".join([
+        row("base", "Tank", "level", 0.0, 0.0),
+        row("base", "Pump", "speed", 5.0, 0.0),
+        row("base", "Tank", "mode", "on", 0.0),
+        row("base", "Tank", "level", 1.0, 1.0),
+        row("base", "Tank", "level", 2.0, 2.0),
+        row("base", "Tank", "level", 3.0, 2.0), # repeated time, the last value wins
+    ]))
+    return str(path)
+
+def test_only_numeric_rows_of_the_system_are_read(log):
+    reader = TraceReader(log, "Tank")
+    assert reader.variables == ["level"]
+    assert list(reader.times["level"]) == [0.0, 1.0, 2.0]
+    assert list(reader.values["level"]) == [0.0, 1.0, 3.0]
+
+def test_linear_and_hold_sampling(log):
+    reader = TraceReader(log, "Tank")
+    assert reader.sample("level", 0.5) == pytest.approx(0.5)
+    assert reader.sample("level", 1.5, "hold") == 1.0
+    assert reader.sample("level", 1.0, "hold") == 1.0
+    assert reader.sample("level", -1.0) == 0.0 and reader.sample("level", 9.0) == 3.0
+
+def test_missing_systems_and_variables_are_rejected(log):
+    with pytest.raises(ValueError, match="No recorded values"):
+        TraceReader(log, "Valve")
+    with pytest.raises(ValueError, match="not recorded"):
+        TraceReader(log, "Pump", variables=["speed", "current"])
+
+def test_several_experiments_need_a_selection(tmp_path, log):
+    with open(log, "a") as file:
+        file.write(row("other", "Tank", "level", 10.0, 0.0))
+    with pytest.raises(ValueError, match="several experiments"):
+        TraceReader(log, "Tank")
+    assert list(TraceReader(log, "Tank", experiment="other").values["level"]) == [10.0]
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from FMUiL.logger.result_store import ResultStore
+
+@pytest.fixture
+def files(tmp_path):
+    fmu = tmp_path / "model.fmu"
+    fmu.write_bytes(b"model")
+    log = tmp_path / "Values.csv"
+    log.write_text("time,value\n0,1\n")
+    return fmu, log
+
+def config(fmu, stop_time: float = 10.0) -> dict:
+    return {"experiment": {"experiment_name": "e", "stop_time": stop_time}, "fmu_files": [str(fmu)], "external_servers": []}
+
+def test_fingerprint_follows_the_config_and_the_fmu_contents(tmp_path, files):
+    fmu, _ = files
+    store = ResultStore(str(tmp_path / "store"))
+    fingerprint = store.fingerprint(config(fmu))
+    assert store.fingerprint(config(fmu)) == fingerprint
+    assert store.fingerprint(config(fmu, stop_time=20.0)) != fingerprint
+
+    moved = tmp_path / "moved.fmu"
+    moved.write_bytes(b"model")
+    assert store.fingerprint(config(moved)) == fingerprint # the contents count, not the path
+
+    fmu.write_bytes(b"changed model")
+    os.utime(fmu, ns=(0, 0))
+    assert store.fingerprint(config(fmu)) != fingerprint
+
+def test_restored_files_are_independent_copies(tmp_path, files):
+    _, log = files
+    store = ResultStore(str(tmp_path / "store"))
+    assert not store.contains("abc")
+    store.store("abc", [str(log)], {"status": "passed"})
+    assert store.contains("abc")
+    assert store.metadata("abc") == {"files": ["Values.csv"], "status": "passed"}
+
+    restored = store.restore("abc", str(tmp_path / "logs"))
+    assert restored == [str(tmp_path / "logs" / "Values.csv")]
+    with open(restored[0], "a") as file:
+        file.write("1,2\n")
+    assert (tmp_path / "store" / "abc" / "Values.csv").read_text() == "time,value\n0,1\n"
+    assert store.restore("abc", str(tmp_path / "logs")) == restored
+    assert open(restored[0]).read() == "time,value\n0,1\n"
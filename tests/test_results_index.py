@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from FMUiL.logger.results_index import ResultsIndex, parse_since
+
+NOW = 1_000_000.0
+
+@pytest.mark.parametrize("text, seconds", [("30s", 30), ("30m", 1800), ("12h", 43200), ("7d", 604800), ("2w", 1209600), ("1.5h", 5400)])
+def test_durations(text, seconds):
+    assert parse_since(text, now=NOW) == NOW - seconds
+    assert parse_since(f" {text} ", now=NOW) == NOW - seconds
+
+def test_iso_dates():
+    assert parse_since("2025-01-31") == datetime(2025, 1, 31).timestamp()
+    assert parse_since("2025-01-31T12:00") == datetime(2025, 1, 31, 12).timestamp()
+
+@pytest.mark.parametrize("text", ["7x", "d7", "-1d", "yesterday", ""])
+def test_invalid_since(text):
+    with pytest.raises(ValueError, match="neither a duration"):
+        parse_since(text, now=NOW)
+
+def criterion(failed: int, first_failure: float | None = None) -> dict:
+    return {"evaluations": 10, "passed": 10 - failed, "failed": failed, "first_failure": first_failure}
+
+def test_query_filters(tmp_path):
+    index = ResultsIndex(str(tmp_path / "results.sqlite"))
+    first = index.register({"experiment_name": "tank", "started_at": 1.0, "files": ["Values.csv"]}, {"eval_1": criterion(0)})
+    second = index.register({"experiment_name": "tank", "started_at": 2.0}, {"eval_1": criterion(2, 3.5), "eval_2": criterion(0)})
+    index.register({"experiment_name": "pump", "started_at": 3.0, "reused": True}, {})
+
+    assert [row["id"] for row in index.query()] == [3, second, first]
+    assert [row["id"] for row in index.query(experiment="tank", failed=True)] == [second]
+    assert [row["id"] for row in index.query(criterion="eval_2", failed=False)] == [second]
+    rows = index.query(criterion="eval_1", failed=True)
+    assert [(row["id"], row["first_failure"]) for row in rows] == [(second, 3.5)]
+    assert [row["id"] for row in index.query(since=1.5, until=3.0)] == [second]
+    assert index.query(limit=1)[0]["reused"] is True
+    assert index.query(experiment="tank")[-1]["files"] == ["Values.csv"]
+    assert index.criteria(second) == {"eval_1": criterion(2, 3.5), "eval_2": criterion(0)}
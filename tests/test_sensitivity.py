@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+
+import pytest
+
+from FMUiL.handlers.sensitivity import SensitivityAnalysis, sensitivity_variables
+
+class LinearSlave:
+    """
+    FMU2Slave of dx/dt = k·u, y = x + 2·u (value references y=0, u=1, k=2),
+    so after t seconds with constant inputs dy/dk = t·u and dy/du = t·k + 2
+    """
+    def __init__(self, u: float = 3.0, k: float = 0.5) -> None:
+        self.state = {"x": 0.0, "u": u, "k": k}
+        self.freed = 0
+
+    def getReal(self, references):
+        values = {0: self.state["x"] + 2 * self.state["u"], 1: self.state["u"], 2: self.state["k"]}
+        return [values[reference] for reference in references]
+
+    def setReal(self, references, values):
+        for reference, value in zip(references, values):
+            self.state[{1: "u", 2: "k"}[reference]] = float(value)
+
+    def doStep(self, currentCommunicationPoint, communicationStepSize):
+        self.state["x"] += communicationStepSize * self.state["k"] * self.state["u"]
+
+    def getDirectionalDerivative(self, unknowns, knowns, seed):
+        return [2.0 * seed[0] if knowns == [1] else 0.0 for _ in unknowns]
+
+    def getFMUstate(self):
+        return dict(self.state)
+
+    def setFMUstate(self, state):
+        self.state = dict(state)
+
+    def freeFMUstate(self, state):
+        self.freed += 1
+
+    def serializeFMUstate(self, state):
+        return repr(state).encode()
+
+    def deSerializeFMUstate(self, data):
+        return eval(data.decode())
+
+def fmu_handler(directional: bool = True, fmu=None, variability: str = "tunable") -> SimpleNamespace:
+    real = lambda id: {"id": id, "type": "Real"}
+    return SimpleNamespace(
+        fmu            = fmu,
+        fmu_name       = "PI",
+        fmu_outputs    = {"y": real(0)},
+        fmu_inputs     = {"u": real(1)},
+        fmu_parameters = {"Kp": {**real(2), "variability": variability}},
+        model_description = SimpleNamespace(coSimulation=SimpleNamespace(
+            providesDirectionalDerivative=directional, canGetAndSetFMUstate=True,
+        )),
+    )
+
+def test_auto_always_uses_finite_differences():
+    analysis = SensitivityAnalysis(fmu_handler(), outputs=["y"], with_respect_to=["u"], method="auto")
+    assert analysis.method == "finite_difference"
+    assert analysis.names == ["d(y)/d(u)"]
+
+def test_directional_is_opt_in_and_named_as_a_partial():
+    analysis = SensitivityAnalysis(fmu_handler(), outputs=["y"], with_respect_to=["u"], method="directional")
+    assert analysis.names == ["partial(y)/partial(u)"]
+    with pytest.raises(ValueError, match="only taken with respect to inputs"):
+        SensitivityAnalysis(fmu_handler(), outputs=["y"], with_respect_to=["Kp"], method="directional")
+    with pytest.raises(ValueError, match="does not provide"):
+        SensitivityAnalysis(fmu_handler(directional=False), outputs=["y"], with_respect_to=["u"], method="directional")
+
+def test_logged_columns_follow_the_method():
+    sensitivity = {
+        "PI":   {"outputs": ["y"], "with_respect_to": ["u", "Kp"], "method": "auto"},
+        "Tank": {"outputs": ["h"], "with_respect_to": ["q"], "method": "directional"},
+    }
+    assert sensitivity_variables(sensitivity) == ["PI.d(y)/d(u)", "PI.d(y)/d(Kp)", "Tank.partial(h)/partial(q)"]
+    assert sensitivity_variables(None) == []
+
+def test_fixed_parameters_are_rejected():
+    with pytest.raises(ValueError, match="fixed parameter"):
+        SensitivityAnalysis(fmu_handler(variability="fixed"), outputs=["y"], with_respect_to=["Kp"])
+    SensitivityAnalysis(fmu_handler(), outputs=["y"], with_respect_to=["u", "Kp"])
+
+def run(analysis: SensitivityAnalysis, slave: LinearSlave, steps: int, step_size: float = 0.1):
+    analysis.start()
+    values = [analysis.update().tolist()]
+    for step in range(steps):
+        analysis.step_copies(current_time=step * step_size, step_size=step_size)
+        slave.doStep(currentCommunicationPoint=step * step_size, communicationStepSize=step_size)
+        values.append(analysis.update().tolist())
+    return values
+
+@pytest.mark.parametrize("central", [False, True])
+def test_finite_differences_of_a_linear_model(central):
+    slave = LinearSlave(u=3.0, k=0.5)
+    analysis = SensitivityAnalysis(fmu_handler(fmu=slave), outputs=["y"], with_respect_to=["Kp", "u"], central=central)
+    assert analysis.names == ["d(y)/d(Kp)", "d(y)/d(u)"]
+    values = run(analysis, slave, steps=4)
+    for step, (d_k, d_u) in enumerate(values):
+        time = 0.1 * step
+        assert d_k == pytest.approx(time * 3.0, abs=1e-6)
+        assert d_u == pytest.approx(time * 0.5 + 2.0, abs=1e-6)
+    # the copies leave the nominal trajectory untouched
+    assert slave.state == {"x": pytest.approx(0.4 * 0.5 * 3.0), "u": 3.0, "k": 0.5}
+    assert len(analysis.copies) == (4 if central else 2)
+
+def test_perturbed_copies_follow_the_nominal_inputs():
+    slave = LinearSlave(u=3.0, k=0.5)
+    analysis = SensitivityAnalysis(fmu_handler(fmu=slave), outputs=["y"], with_respect_to=["Kp"])
+    analysis.start()
+    analysis.step_copies(current_time=0.0, step_size=0.1)
+    slave.doStep(currentCommunicationPoint=0.0, communicationStepSize=0.1)
+    slave.setReal([1], [1.0]) # the input changes between the steps
+    analysis.step_copies(current_time=0.1, step_size=0.1)
+    slave.doStep(currentCommunicationPoint=0.1, communicationStepSize=0.1)
+    assert analysis.update()[0] == pytest.approx(0.1 * 3.0 + 0.1 * 1.0, abs=1e-6)
+
+def test_directional_derivatives_and_checkpoints():
+    slave = LinearSlave()
+    analysis = SensitivityAnalysis(fmu_handler(fmu=slave), outputs=["y"], with_respect_to=["u"], method="directional")
+    assert run(analysis, slave, steps=2) == [[2.0], [2.0], [2.0]]
+    assert analysis.get_state() == [] # no copies to store
+
+    analysis = SensitivityAnalysis(fmu_handler(fmu=slave), outputs=["y"], with_respect_to=["Kp"])
+    run(analysis, slave, steps=2)
+    stored, perturbed = analysis.get_state(), analysis.perturbed_outputs[0, 1.0]
+    run(analysis, slave, steps=0) # new copies from the current state
+    assert analysis.perturbed_outputs[0, 1.0] != pytest.approx(perturbed)
+    analysis.set_state(stored)
+    assert analysis.perturbed_outputs[0, 1.0] == pytest.approx(perturbed)
@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from FMUiL.communications import servers as servers_module
+from FMUiL.communications.server_setup import InternalServerSetup
+
+class FakeFmu:
+    def __init__(self, name: str) -> None:
+        self.fmu_name = name
+        self.closed   = False
+
+    def close(self) -> None:
+        self.closed = True
+
+class FakeServer:
+    """An InternalServerSetup whose main loop starts or fails, e.g. on a port in use"""
+    def __init__(self, name: str, fails: bool) -> None:
+        self.fmu    = FakeFmu(name)
+        self.fails  = fails
+        self.server = SimpleNamespace(stop=self.stop)
+        self.server_started = asyncio.Event()
+
+    async def stop(self) -> None:
+        pass
+
+    async def main_loop(self) -> None:
+        if self.fails:
+            raise OSError("address already in use")
+        self.server_started.set()
+        await asyncio.Event().wait()
+
+def manager(fmu_files: list[str]) -> servers_module.server_manager:
+    self = servers_module.server_manager()
+    self.fmu_files = fmu_files
+    self.replay_sources = {}
+    self.timestep  = 0.1
+    self.ensemble  = None
+    self.publication_policy = None
+    self._tasks = []
+    self.internal_servers = {}
+    self.base_port = 7000
+    return self
+
+def test_a_failed_server_closes_every_fmu(monkeypatch):
+    created = {}
+
+    async def server_init(fmu, port, publication_policy=None, ensemble=None):
+        created[fmu] = FakeServer(fmu, fails=fmu == "broken.fmu")
+        return created[fmu]
+
+    monkeypatch.setattr(InternalServerSetup, "async_server_init", server_init)
+    servers = manager(["tank.fmu", "broken.fmu", "pid.fmu"])
+    with pytest.raises(OSError):
+        asyncio.run(servers.initialize_fmu_opc_servers())
+    assert sorted(created) == ["broken.fmu", "pid.fmu", "tank.fmu"]
+    assert all(server.fmu.closed for server in created.values())
+    assert servers.internal_servers == {}
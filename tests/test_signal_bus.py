@@ -0,0 +1,35 @@
+import numpy as np
+
+from FMUiL.communications.signal_bus import SignalBus
+
+def test_writes_of_a_step_are_read_after_the_swap():
+    bus = SignalBus(["Tank.level", "PI.control", "PI.error"])
+    try:
+        assert bus.step == 0 and list(bus.read([0, 1, 2])) == [0.0, 0.0, 0.0]
+        # step 0: the servers write into the back buffer, readers still see the front buffer
+        bus.write([bus.slot("Tank.level")], [1.5])
+        bus.write([bus.slot("PI.control"), bus.slot("PI.error")], np.array([2.5, -0.5]))
+        assert list(bus.read([0, 1, 2])) == [0.0, 0.0, 0.0]
+        bus.advance()
+        assert bus.step == 1
+        assert list(bus.read([2, 0])) == [-0.5, 1.5]
+        # step 1 writes into the other buffer, the values of step 0 stay readable
+        bus.write([0], [3.0])
+        assert bus.read([0])[0] == 1.5
+        bus.advance()
+        assert bus.read([0])[0] == 3.0
+        bus.reset()
+        assert bus.step == 0 and list(bus.read([0, 1, 2])) == [0.0, 0.0, 0.0]
+    finally:
+        bus.close()
+
+def test_attached_bus_shares_the_memory():
+    bus = SignalBus(["a", "b"])
+    attached = SignalBus.attach(bus.name, ["a", "b"])
+    try:
+        attached.write([1], [4.0])
+        attached.advance()
+        assert bus.step == 1 and bus.read([1])[0] == 4.0
+    finally:
+        attached.close()
+        bus.close()
@@ -0,0 +1,42 @@
+import pytest
+from pydantic import ValidationError
+
+from FMUiL.handlers.step_controller import StepSizeController
+from FMUiL.schemas.schema import AdaptiveStepConfig
+
+def controller(**kwargs) -> StepSizeController:
+    settings = dict(tolerance=1e-3, min_step=0.1, max_step=1.6, initial_step=0.1)
+    return StepSizeController(**{**settings, **kwargs})
+
+def test_initial_step_is_bounded_to_the_min_step_grid():
+    assert controller(initial_step=0.35).step == pytest.approx(0.3)
+    assert controller(initial_step=0.01).step == pytest.approx(0.1)
+    assert controller(initial_step=10.0).step == pytest.approx(1.6)
+
+def test_invalid_bounds_are_rejected():
+    with pytest.raises(ValueError):
+        controller(min_step=0.2, max_step=0.1)
+
+def test_linear_signals_grow_the_step_up_to_max_step():
+    step_controller = controller()
+    time, steps = 0.0, []
+    for _ in range(8):
+        steps.append(step_controller.update(time, [2.0 * time, 1.0]))
+        time += step_controller.step
+    assert steps[:2] == [pytest.approx(0.1)] * 2 # no error without two previous points
+    assert steps[2:] == [pytest.approx(s) for s in (0.2, 0.4, 0.8, 1.6, 1.6, 1.6)]
+    assert step_controller.last_error == 0
+
+def test_transient_shrinks_the_step():
+    step_controller = controller(initial_step=0.8)
+    step_controller.update(0.0, [0.0])
+    step_controller.update(0.8, [0.0])
+    step = step_controller.update(1.6, [1.0])
+    assert step_controller.last_error == pytest.approx(1000.0)
+    assert step == pytest.approx(0.1) # max_shrink, then bounded by min_step
+
+def test_adaptive_step_config_needs_steps_on_the_server_precision():
+    AdaptiveStepConfig(tolerance=1e-3, min_step=0.0005, max_step=0.3)
+    for steps in ({"min_step": 0.00015, "max_step": 1.0}, {"min_step": 0.1, "max_step": 0.10005}):
+        with pytest.raises(ValidationError, match="multiple of 0.0001"):
+            AdaptiveStepConfig(tolerance=1e-3, **steps)
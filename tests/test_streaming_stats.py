@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from FMUiL.logger.streaming_stats import ControlPerformance, RunningStatistics, StreamingStatistics
+
+def test_running_statistics_match_numpy():
+    rng = np.random.default_rng(1)
+    values = rng.normal(3.0, 2.0, 1000)
+    statistics = RunningStatistics()
+    for time, value in enumerate(values):
+        statistics.update(float(time), float(value))
+    summary = statistics.summary()
+    assert summary["count"] == 1000
+    assert summary["mean"] == pytest.approx(values.mean())
+    assert summary["variance"] == pytest.approx(values.var(ddof=1))
+    assert (summary["min"], summary["max"]) == (values.min(), values.max())
+    assert summary["time_average"] == pytest.approx(np.trapezoid(values) / 999)
+    assert summary["last"] == values[-1]
+
+def test_time_average_weights_uneven_steps():
+    statistics = RunningStatistics()
+    for time, value in ((0.0, 0.0), (1.0, 2.0), (4.0, 2.0)):
+        statistics.update(time, value)
+    assert statistics.summary()["time_average"] == pytest.approx((1.0 + 6.0) / 4.0)
+    assert statistics.summary()["mean"] == pytest.approx(4.0 / 3.0)
+
+def test_empty_and_single_sample():
+    assert RunningStatistics().summary()["mean"] is None
+    statistics = RunningStatistics()
+    statistics.update(1.0, 5.0)
+    assert statistics.summary()["time_average"] == 5.0 and statistics.summary()["std"] == 0.0
+
+def test_control_performance_of_a_step_response():
+    performance = ControlPerformance(settling_band=0.05)
+    for time, value in ((0.0, 0.0), (1.0, 0.8), (2.0, 1.2), (3.0, 1.02), (4.0, 0.99), (5.0, 1.0)):
+        performance.update(time, value, 1.0)
+    summary = performance.summary()
+    errors = np.array([1.0, 0.2, -0.2, -0.02, 0.01, 0.0])
+    assert summary["iae"] == pytest.approx(np.trapezoid(np.abs(errors)))
+    assert summary["ise"] == pytest.approx(np.trapezoid(errors ** 2))
+    assert summary["itae"] == pytest.approx(np.trapezoid(np.arange(6) * np.abs(errors)))
+    assert summary["overshoot"] == pytest.approx(0.2)
+    assert summary["overshoot_percent"] == pytest.approx(20.0)
+    assert summary["settling_time"] == 3.0
+
+def test_downward_step_overshoot():
+    performance = ControlPerformance()
+    for time, value in ((0.0, 10.0), (1.0, 4.0), (2.0, 5.0)):
+        performance.update(time, value, 5.0)
+    assert performance.summary()["overshoot"] == pytest.approx(1.0)
+
+def test_streaming_statistics_with_setpoints():
+    statistics = StreamingStatistics({
+        "Tank.level":   {"setpoint": "PI.sp", "settling_band": 0.02},
+        "Tank.flow":    {"setpoint": 2.0, "settling_band": 0.02},
+    })
+    statistics.update("Tank.level", 0.0, 0.0) # setpoint not logged yet
+    statistics.update("PI.sp", 0.0, 1.0)
+    statistics.update("Tank.level", 1.0, 1.0)
+    statistics.update("Tank.flow", 1.0, 2.0)
+    statistics.update("Tank.mode", 1.0, "on") # strings are skipped
+    summary = statistics.summary()
+    assert set(summary["variables"]) == {"Tank.level", "PI.sp", "Tank.flow"}
+    assert summary["performance"]["Tank.level"]["setpoint"] == 1.0
+    assert summary["performance"]["Tank.flow"]["iae"] == 0.0
+
+def test_ensemble_instances_use_the_setpoint_of_their_instance():
+    statistics = StreamingStatistics({"Tank.level": {"setpoint": "PI.sp", "settling_band": 0.02}})
+    statistics.update("PI[0].sp", 0.0, 1.0)
+    statistics.update("PI[1].sp", 0.0, 2.0)
+    statistics.update("Tank[0].level", 0.0, 0.0)
+    statistics.update("Tank[1].level", 0.0, 0.0)
+    performance = statistics.summary()["performance"]
+    assert performance["Tank[0].level"]["setpoint"] == 1.0
+    assert performance["Tank[1].level"]["setpoint"] == 2.0